@@ -0,0 +1,71 @@
+"""
+Micro-benchmark de l'extraction de l'expérience.
+Compare l'implémentation historique (un re.findall par pattern, non compilé)
+à l'expression régulière combinée de extract_experience, sur des textes longs.
+
+Usage:
+    python scripts/bench_experience.py
+    python scripts/bench_experience.py --taille 200000 --repeat 50
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+# Ajoute le dossier src au chemin de recherche de Python
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.ingestion.extractor import EXPERIENCE_PATTERNS, extract_experience
+from aag.utils.io import load_json
+
+
+def extract_experience_legacy(cleaned_text):
+    """Implémentation historique : cinq parcours du texte."""
+    max_years = 0
+    for pattern in EXPERIENCE_PATTERNS:
+        matches = re.findall(pattern, cleaned_text)
+        for match in matches:
+            years = int(match)
+            if years > max_years and years < 50:  # Sanity check
+                max_years = years
+    return max_years
+
+
+def build_text(json_dir, size):
+    """Construit un texte long en répétant les extraits des profils existants."""
+    extraits = []
+    for filename in sorted(os.listdir(json_dir)):
+        if filename.endswith(".json"):
+            extraits.append(load_json(os.path.join(json_dir, filename)).get("texte_source", ""))
+    corpus = " ".join(extraits) or "mécanicien avec 5 ans d'expérience"
+    return (corpus + " ") * (size // len(corpus) + 1)
+
+
+def timeit(func, text, repeat):
+    """Durée moyenne d'un appel (secondes) et résultat."""
+    result = func(text)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extract_experience")
+    parser.add_argument("--taille", type=int, default=100000, help="Longueur du texte (caractères)")
+    parser.add_argument("--repeat", type=int, default=20, help="Nombre d'appels mesurés")
+    args = parser.parse_args()
+
+    text = build_text("data/samples_json/", args.taille)
+    legacy_time, legacy_result = timeit(extract_experience_legacy, text, args.repeat)
+    new_time, new_result = timeit(extract_experience, text, args.repeat)
+
+    print(f"Texte: {len(text)} caractères | {args.repeat} appels")
+    print(f"  Historique (5 x re.findall) : {legacy_time * 1000:8.2f} ms  -> {legacy_result} ans")
+    print(f"  Combiné (1 parcours)        : {new_time * 1000:8.2f} ms  -> {new_result} ans")
+    print(f"  Gain : x{legacy_time / new_time:.2f} | Résultats identiques : {legacy_result == new_result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark de la recherche de mots-clés : recherche de sous-chaîne (`in`,
+un parcours du texte par mot-clé, en C) contre l'automate d'Aho-Corasick
+(un seul parcours du texte, caractère par caractère en Python).
+
+Le coût de la recherche par sous-chaîne croît avec le nombre de mots-clés,
+celui de l'automate non. Le benchmark mesure aussi le dictionnaire réel de
+l'extracteur (compétences et villes), recherché par l'automate.
+
+Usage:
+    python scripts/bench_matcher.py
+    python scripts/bench_matcher.py --taille 8000 --repeat 200
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+# Ajoute le dossier src au chemin de recherche de Python
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.ingestion.extractor import SKILLS_DB, VILLES_CIBLES
+from aag.ingestion.matcher import KeywordMatcher
+from aag.ingestion.text_cleaner import clean_text
+from aag.utils.io import load_json
+
+TAILLES_DICTIONNAIRE = [25, 50, 100, 200, 400, 800, 1600, 3200]
+
+
+def parse_args():
+    """Lit les options de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Recherche par sous-chaîne contre automate")
+    parser.add_argument("--taille", type=int, default=3000, help="Longueur du texte (caractères, ~ un CV)")
+    parser.add_argument("--repeat", type=int, default=100, help="Nombre de recherches mesurées")
+    return parser.parse_args()
+
+
+def build_text(json_dir, size):
+    """Texte de CV nettoyé, obtenu en répétant les extraits des profils d'exemple."""
+    extraits = []
+    if os.path.exists(json_dir):
+        for filename in sorted(os.listdir(json_dir)):
+            if filename.endswith(".json"):
+                extraits.append(load_json(os.path.join(json_dir, filename)).get("texte_source", ""))
+    corpus = clean_text(" ".join(extraits)) or "mecanicien freinage a marseille depuis 5 ans"
+    return ((corpus + " ") * (size // len(corpus) + 1))[:size]
+
+
+def build_keywords(count, rng):
+    """
+    Dictionnaire réel (compétences et villes) complété de mots aléatoires
+    jusqu'à count mots-clés (count <= 0 : dictionnaire réel seul).
+    """
+    keywords = [(k, c) for c, words in SKILLS_DB.items() for k in words]
+    keywords += [(ville, "ville") for ville in VILLES_CIBLES]
+    if count <= 0:
+        return keywords
+    while len(keywords) < count:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12)))
+        keywords.append((word, "synthetique"))
+    return keywords[:count]
+
+
+def timeit(func, text, repeat):
+    """Durée moyenne d'un appel (microsecondes)."""
+    func(text)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    """Point d'entrée du benchmark."""
+    args = parse_args()
+    text = build_text("data/samples_json", args.taille)
+    rng = random.Random(0)
+
+    print(f"Texte de {len(text)} caractères, {args.repeat} recherches par mesure")
+    print(f"{'mots-clés':>10} | {'sous-chaîne (µs)':>17} | {'automate (µs)':>14} | plus rapide")
+    crossover = None
+    for count in TAILLES_DICTIONNAIRE:
+        keywords = build_keywords(count, rng)
+        matcher = KeywordMatcher(keywords)
+        scan = timeit(lambda t: {v for k, v in keywords if k in t}, text, args.repeat)
+        automaton = timeit(lambda t: {v for _, _, v in matcher.iter_matches(t)}, text, args.repeat)
+        winner = "sous-chaîne" if scan <= automaton else "automate"
+        if winner == "automate" and crossover is None:
+            crossover = count
+        print(f"{count:>10} | {scan:>17.1f} | {automaton:>14.1f} | {winner}")
+
+    keywords = build_keywords(0, rng)
+    matcher = KeywordMatcher(keywords)
+    automaton = timeit(lambda t: {v for _, _, v in matcher.iter_matches(t)}, text, args.repeat)
+    print(f"\nDictionnaire de l'extracteur : {len(keywords)} mots-clés, automate {automaton:.1f} µs")
+    if crossover is None:
+        print(f"La recherche par sous-chaîne reste plus rapide jusqu'à {TAILLES_DICTIONNAIRE[-1]} mots-clés")
+    else:
+        print(f"L'automate devient plus rapide à partir de ~{crossover} mots-clés")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark mémoire des représentations d'un profil.
+Compare, pour un grand nombre de profils, les dictionnaires JSON tels que
+chargés depuis data/samples_json, les objets Profil et les CompactProfil
+(compétences en masque de bits, ville internée, __slots__).
+
+Usage:
+    python scripts/bench_models_memory.py
+    python scripts/bench_models_memory.py --profils 100000 --texte-source
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Ajoute le dossier src au chemin de recherche de Python
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.models.compact import CompactProfil
+from aag.models.profil import Profil
+from aag.utils.io import load_json
+
+
+def parse_args():
+    """Lit les options de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Mémoire par profil selon le modèle")
+    parser.add_argument("--profils", type=int, default=1_000_000, help="Nombre de profils")
+    parser.add_argument(
+        "--texte-source", action="store_true",
+        help="Garde l'extrait texte_source (500 caractères) dans chaque profil"
+    )
+    return parser.parse_args()
+
+
+def load_samples(json_dir, keep_text):
+    """Profils d'exemple, sérialisés en JSON (un document par profil)."""
+    samples = []
+    for filename in sorted(os.listdir(json_dir)):
+        if filename.endswith(".json"):
+            profil = load_json(os.path.join(json_dir, filename))
+            profil["fichier_source"] = filename
+            if not keep_text:
+                profil.pop("texte_source", None)
+            samples.append(profil)
+    return samples
+
+
+def json_documents(samples, count):
+    """
+    Documents JSON distincts (nom et fichier numérotés), comme autant de
+    fichiers différents à charger.
+    """
+    for i in range(count):
+        profil = dict(samples[i % len(samples)])
+        profil["nom"] = f"{profil['nom']} {i}"
+        profil["fichier_source"] = f"CV_{i}.json"
+        yield json.dumps(profil)
+
+
+def measure(label, documents, build):
+    """Mémoire retenue par la liste des profils construits."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    profils = [build(json.loads(document)) for document in documents]
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(profils)
+    print(f"{label:<14} {size / count:>8.0f} octets/profil | {size / 1e6:>8.1f} Mo | {elapsed:.1f} s")
+    return size
+
+
+def main():
+    """Point d'entrée du benchmark."""
+    args = parse_args()
+    samples = load_samples("data/samples_json/", args.texte_source)
+    if not samples:
+        print("Aucun profil dans data/samples_json/. Lancez d'abord: python scripts/run_ingestion.py")
+        return
+
+    print(f"{args.profils} profils (texte_source {'inclus' if args.texte_source else 'exclu'})\n")
+    documents = list(json_documents(samples, args.profils))
+
+    reference = measure("dict JSON", documents, lambda data: data)
+    measure("Profil", documents, Profil.from_dict)
+    compact = measure("CompactProfil", documents, CompactProfil.from_dict)
+    print(f"\nGain CompactProfil / dict : x{reference / compact:.1f}")
+
+
+if __name__ == "__main__":
+    main()
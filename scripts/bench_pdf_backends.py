@@ -0,0 +1,129 @@
+"""
+Benchmark des moteurs d'extraction PDF.
+Compare, sur un corpus de CV, la vitesse (pages/s), la mémoire maximale et
+l'accord des profils extraits avec le moteur de référence PyPDF2, pour choisir
+le moteur le plus rapide qui ne change pas les profils.
+
+Usage:
+    python scripts/bench_pdf_backends.py
+    python scripts/bench_pdf_backends.py chemin/vers/cvs --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Ajoute le dossier src au chemin de recherche de Python
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.ingestion.extractor import extract_profile_data
+from aag.ingestion.pdf_reader import available_backends, iter_pdf_pages
+
+
+# Moteur de référence pour la comparaison des profils
+REFERENCE_BACKEND = "pypdf2"
+
+
+def _peak_rss_mb():
+    """Mémoire résidente maximale du processus courant (Mo), ou None."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en Ko ailleurs
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_backend(backend, pdf_paths, repeat):
+    """
+    Mesure un moteur sur le corpus. Exécuté dans un processus neuf pour que
+    la mémoire maximale mesurée ne concerne que ce moteur.
+
+    Returns:
+        Dictionnaire {"pages", "duree", "rss_mb", "erreurs", "profils"}
+    """
+    pages = 0
+    errors = 0
+    texts = {}
+
+    # Passe de chauffe non chronométrée (import du moteur, caches)
+    try:
+        list(iter_pdf_pages(pdf_paths[0], max_pages=None, backend=backend))
+    except Exception:
+        pass
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for pdf_path in pdf_paths:
+            try:
+                contents = list(iter_pdf_pages(pdf_path, max_pages=None, backend=backend))
+            except Exception:
+                errors += 1
+                continue
+            pages += len(contents)
+            texts[pdf_path] = "".join(c + "\n" for c in contents)
+    elapsed = time.perf_counter() - start
+
+    # L'extraction des profils n'est pas chronométrée : seule la lecture PDF diffère
+    profiles = {path: extract_profile_data(text) for path, text in texts.items()}
+
+    return {
+        "pages": pages,
+        "duree": elapsed,
+        "rss_mb": _peak_rss_mb(),
+        "erreurs": errors // repeat,
+        "profils": profiles,
+    }
+
+
+def _same_fields(a, b):
+    """Compare deux profils hors extrait de texte (texte_source)."""
+    if a is None or b is None:
+        return a is b
+    return {k: v for k, v in a.items() if k != "texte_source"} == \
+        {k: v for k, v in b.items() if k != "texte_source"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des moteurs d'extraction PDF")
+    parser.add_argument("corpus", nargs="?", default="data/samples_cvs/", help="Dossier de PDF")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de passes sur le corpus")
+    args = parser.parse_args()
+
+    pdf_paths = sorted(
+        os.path.join(args.corpus, f) for f in os.listdir(args.corpus) if f.lower().endswith(".pdf")
+    )
+    if not pdf_paths:
+        print(f"Aucun PDF trouvé dans {args.corpus}")
+        return
+
+    backends = available_backends()
+    print(f"Corpus: {len(pdf_paths)} PDF x {args.repeat} passe(s) | Moteurs: {', '.join(backends)}\n")
+
+    results = {}
+    for backend in backends:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results[backend] = executor.submit(run_backend, backend, pdf_paths, args.repeat).result()
+
+    reference = results.get(REFERENCE_BACKEND) or results[backends[0]]
+    ref_profiles = reference["profils"]
+
+    print(f"{'Moteur':<10} {'Pages/s':>10} {'RSS max (Mo)':>13} {'Erreurs':>8} {'Profils identiques':>19} {'Hors texte_source':>18}")
+    print("-" * 82)
+    for backend, res in results.items():
+        pages_per_s = res["pages"] / res["duree"] if res["duree"] > 0 else 0.0
+        rss = f"{res['rss_mb']:.1f}" if res["rss_mb"] is not None else "n/d"
+        identical = sum(1 for p in pdf_paths if res["profils"].get(p) == ref_profiles.get(p))
+        same_fields = sum(1 for p in pdf_paths if _same_fields(res["profils"].get(p), ref_profiles.get(p)))
+        print(
+            f"{backend:<10} {pages_per_s:>10.1f} {rss:>13} {res['erreurs']:>8} "
+            f"{identical:>10}/{len(pdf_paths):<8} {same_fields:>9}/{len(pdf_paths):<8}"
+        )
+
+    print(f"\nRéférence pour l'accord des profils : {REFERENCE_BACKEND if REFERENCE_BACKEND in results else backends[0]}")
+
+
+if __name__ == "__main__":
+    main()
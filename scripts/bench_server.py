@@ -0,0 +1,175 @@
+"""
+Test de charge du service HTTP de matching.
+Plusieurs clients envoient des requêtes /rank (ou /score) en parallèle, sur
+des connexions persistantes, et la latence de chaque requête est mesurée.
+
+Sans --url, un service est démarré dans ce processus : sur les profils de
+data/samples_json, ou sur un corpus généré de --profils profils (copies
+des profils d'exemple réparties sur les villes cibles).
+
+Usage:
+    python scripts/bench_server.py
+    python scripts/bench_server.py --profils 100000 --clients 8 --requetes 5000
+    python scripts/bench_server.py --url http://127.0.0.1:8765 --route score
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+# Ajoute le dossier src au chemin de recherche de Python
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.config import JSON_DIR
+from aag.service.server import MatchingService, create_server
+from aag.storage.profile_store import append_profiles, load_json_dir
+
+VILLES = ["Marseille", "Lyon", "Toulouse", "Aix-En-Provence", "Aubagne", "Vitrolles", "Toulon", "Nice", "Paris", "Bordeaux"]
+COMPETENCES = ["electrique", "moteur", "freinage", "pneus", "climatisation", "carrosserie", "vul"]
+
+
+def parse_args():
+    """Lit les options de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Latence du service HTTP de matching")
+    parser.add_argument("--url", default=None, help="Service déjà lancé (défaut : service démarré localement)")
+    parser.add_argument("--profils", type=int, default=0, help="Taille du corpus généré (défaut : data/samples_json)")
+    parser.add_argument("--route", choices=["rank", "score"], default="rank", help="Route testée")
+    parser.add_argument("--clients", type=int, default=4, help="Nombre de clients simultanés")
+    parser.add_argument("--requetes", type=int, default=2000, help="Nombre total de requêtes")
+    parser.add_argument("--top", type=int, default=10, help="top_k des requêtes /rank")
+    return parser.parse_args()
+
+
+def build_corpus(count, directory):
+    """Écrit un store de count profils générés à partir des profils d'exemple."""
+    samples = load_json_dir(JSON_DIR)
+    if not samples:
+        samples = [{"nom": "Profil", "ville": "Marseille", "competences": ["moteur"], "experience_annees": 5}]
+    rng = random.Random(0)
+    store_path = os.path.join(directory, "profiles.jsonl")
+    batch = []
+    for i in range(count):
+        profil = dict(samples[i % len(samples)])
+        profil["ville"] = rng.choice(VILLES)
+        profil["experience_annees"] = rng.randint(0, 20)
+        profil["fichier_source"] = f"CV_{i:07d}.pdf"
+        batch.append(profil)
+        if len(batch) == 10000:
+            append_profiles(batch, store_path)
+            batch = []
+    append_profiles(batch, store_path)
+    return store_path
+
+
+def request_bodies(route, count, top_k, fichiers):
+    """Corps des requêtes, avec des besoins variés (ville, compétence, poids)."""
+    rng = random.Random(1)
+    bodies = []
+    for _ in range(count):
+        besoin = {
+            "ville_cible": rng.choice(VILLES),
+            "competence_requise": rng.choice(COMPETENCES),
+            "experience_min": rng.randint(0, 10),
+            "poids_ville": rng.choice([30, 40, 50, 60]),
+            "poids_competence": 30,
+            "poids_experience": 20,
+        }
+        if route == "rank":
+            body = {"besoin": besoin, "top_k": top_k}
+        else:
+            body = {"besoin": besoin, "fichier": rng.choice(fichiers)}
+        bodies.append(json.dumps(body).encode("utf-8"))
+    return bodies
+
+
+def run_client(host, port, route, bodies, latencies, errors):
+    """Envoie les requêtes d'un client sur une connexion persistante."""
+    conn = http.client.HTTPConnection(host, port)
+    headers = {"Content-Type": "application/json"}
+    for body in bodies:
+        start = time.perf_counter()
+        conn.request("POST", f"/{route}", body, headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            errors.append(response.status)
+    conn.close()
+
+
+def percentile(values, p):
+    """Percentile p (0-100) d'une liste de valeurs."""
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1] if len(values) > 1 else values[0]
+
+
+def main():
+    """Point d'entrée du test de charge."""
+    args = parse_args()
+    tmp = None
+    server = None
+
+    try:
+        if args.url:
+            url = urlparse(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            if args.profils:
+                tmp = tempfile.mkdtemp()
+                start = time.perf_counter()
+                store_path = build_corpus(args.profils, tmp)
+                print(f"Corpus généré: {args.profils} profil(s) en {time.perf_counter() - start:.1f} s")
+                service = MatchingService(os.path.join(tmp, "profiles.snap"), store_path, os.path.join(tmp, "json"))
+            else:
+                service = MatchingService()
+            server = create_server(service, "127.0.0.1", 0)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            host, port = server.server_address[:2]
+
+        # Identifiants de profils du corpus pour /score
+        conn = http.client.HTTPConnection(host, port)
+        conn.request("POST", "/rank", json.dumps({"besoin": {"ville_cible": VILLES[0]}, "top_k": 100}))
+        response = json.loads(conn.getresponse().read())
+        conn.close()
+        fichiers = [r["fichier"] for r in response["resultats"]] or ["inconnu.pdf"]
+        print(f"Service: http://{host}:{port} - {response['total']} profil(s)")
+
+        bodies = request_bodies(args.route, args.requetes, args.top, fichiers)
+        clients = max(1, args.clients)
+        latencies = []
+        errors = []
+        threads = [
+            threading.Thread(target=run_client, args=(host, port, args.route, bodies[i::clients], latencies, errors))
+            for i in range(clients)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        ms = [latency * 1000 for latency in latencies]
+        print(f"\n/{args.route} - {len(ms)} requête(s), {clients} client(s), {len(errors)} erreur(s)")
+        print(f"  Débit : {len(ms) / elapsed:.0f} requêtes/s")
+        print(f"  p50   : {percentile(ms, 50):.2f} ms")
+        print(f"  p90   : {percentile(ms, 90):.2f} ms")
+        print(f"  p99   : {percentile(ms, 99):.2f} ms")
+        print(f"  max   : {max(ms):.2f} ms")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if tmp is not None:
+            shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Construit le référentiel binaire des communes françaises (data/gazetteer.bin).
+
+Source attendue : la "Base officielle des codes postaux" de La Poste
+(data.gouv.fr), au format CSV. Les colonnes du nom de la commune et du code
+postal sont détectées automatiquement ("nom_de_la_commune" / "Nom_commune",
+"code_postal") ou peuvent être indiquées explicitement.
+
+Usage:
+    python scripts/build_gazetteer.py base_officielle_codes_postaux.csv
+    python scripts/build_gazetteer.py communes.csv --col-nom nom --col-cp cp --sep ,
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+# Ajoute le dossier src au chemin de recherche de Python
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.config import GAZETTEER_PATH
+from aag.ingestion.gazetteer import Gazetteer
+
+
+# Noms de colonnes reconnus (en minuscules, sans "#" initial)
+COLONNES_NOM = ["nom_de_la_commune", "nom_commune", "nom"]
+COLONNES_CP = ["code_postal", "codepostal", "cp"]
+
+
+def _find_column(fieldnames, candidates, explicit):
+    """Retrouve le nom réel d'une colonne dans l'en-tête du CSV."""
+    normalized = {name.lstrip("#").strip().lower(): name for name in fieldnames}
+    if explicit:
+        if explicit.lower() not in normalized:
+            raise SystemExit(f"Colonne introuvable : {explicit} (colonnes : {', '.join(fieldnames)})")
+        return normalized[explicit.lower()]
+    for candidate in candidates:
+        if candidate in normalized:
+            return normalized[candidate]
+    raise SystemExit(f"Aucune colonne parmi {candidates} (colonnes : {', '.join(fieldnames)})")
+
+
+def read_rows(csv_path, sep, col_nom, col_cp):
+    """Lit les couples (nom_commune, code_postal) du CSV."""
+    with open(csv_path, 'r', encoding='utf-8-sig', errors='replace', newline='') as f:
+        reader = csv.DictReader(f, delimiter=sep)
+        name_column = _find_column(reader.fieldnames, COLONNES_NOM, col_nom)
+        code_column = _find_column(reader.fieldnames, COLONNES_CP, col_cp)
+        for row in reader:
+            code = (row.get(code_column) or "").strip()
+            yield row.get(name_column) or "", code if code.isdigit() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit le référentiel des communes")
+    parser.add_argument("csv", help="Fichier CSV des communes / codes postaux")
+    parser.add_argument("-o", "--output", default=GAZETTEER_PATH, help="Fichier binaire produit")
+    parser.add_argument("--sep", default=";", help="Séparateur du CSV (défaut : ;)")
+    parser.add_argument("--col-nom", help="Colonne du nom de la commune")
+    parser.add_argument("--col-cp", help="Colonne du code postal")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    gazetteer = Gazetteer.from_rows(read_rows(args.csv, args.sep, args.col_nom, args.col_cp))
+    gazetteer.save(args.output)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Gazetteer.load(args.output)
+    load_time = time.perf_counter() - start
+
+    print(f"{len(gazetteer)} communes, {len(gazetteer.codes)} codes postaux")
+    print(f"Fichier: {args.output} ({os.path.getsize(args.output) / 1024:.0f} Ko)")
+    print(f"Construction: {build_time:.2f} s | Chargement: {load_time * 1000:.1f} ms")
+    print("Pensez à relancer l'ingestion : les profils seront réextraits avec le nouveau référentiel.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,34 @@
 """
 Script de démonstration du matching Gomécanicien.
 Charge les profils extraits et les compare au besoin opérationnel.
+
+Usage:
+    python scripts/run_demo.py            # Classement complet
+    python scripts/run_demo.py --top 5    # Les 5 meilleurs candidats seulement
 """
+import argparse
 import os
 import sys
 
 # Ajoute le dossier src au chemin de recherche de Python
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
+from aag.config import PROFILE_STORE_PATH
 from aag.scoring.scorer import calculate_match, rank_candidates
+from aag.storage.snapshot import load_snapshot_table
 from aag.utils.io import load_json
 
 
-def load_all_profiles(json_dir="data/samples_json/"):
-    """Charge tous les profils JSON du dossier."""
-    profils = []
-
-    if not os.path.exists(json_dir):
+def load_all_profiles(json_dir="data/samples_json/", store_path=PROFILE_STORE_PATH):
+    """
+    Charge tous les profils en table de scoring, depuis l'instantané binaire
+    (reconstruit à partir du store consolidé ou du dossier JSON s'ils ont changé).
+    """
+    if not os.path.exists(store_path) and not os.path.exists(json_dir):
         print(f"Erreur: Le dossier {json_dir} n'existe pas.")
-        return profils
-
-    for filename in os.listdir(json_dir):
-        if filename.endswith(".json"):
-            filepath = os.path.join(json_dir, filename)
-            try:
-                profil = load_json(filepath)
-                profils.append(profil)
-            except Exception as e:
-                print(f"Erreur lors du chargement de {filename}: {e}")
+        return []
 
-    return profils
+    return load_snapshot_table(store_path=store_path, json_dir=json_dir)
 
 
 def display_ranking(results, besoin):
@@ -58,8 +57,23 @@ def display_ranking(results, besoin):
             print(f"      - {j}")
 
 
-def run_matching_demo():
-    """Fonction principale de démonstration."""
+def parse_args():
+    """Lit les options de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Démonstration du matching Gomécanicien")
+    parser.add_argument(
+        "--top", type=int, default=None,
+        help="N'affiche que les N meilleurs candidats (défaut : tous)"
+    )
+    return parser.parse_args()
+
+
+def run_matching_demo(top_k=None):
+    """
+    Fonction principale de démonstration.
+
+    Args:
+        top_k: Nombre de candidats à classer et afficher (None = tous)
+    """
 
     print("\n" + "=" * 70)
     print("ASSISTANT D'ACQUISITION GOMECANICIEN - DEMO MATCHING")
@@ -92,7 +106,7 @@ def run_matching_demo():
     print(f"\n{len(profils)} profil(s) charge(s) pour analyse.")
 
     # 3. Calculer le matching
-    results = rank_candidates(profils, besoin)
+    results = rank_candidates(profils, besoin, top_k=top_k)
 
     # 4. Afficher le classement
     display_ranking(results, besoin)
@@ -112,4 +126,4 @@ def run_matching_demo():
 
 
 if __name__ == "__main__":
-    run_matching_demo()
+    run_matching_demo(parse_args().top)
@@ -1,73 +1,247 @@
 """
 Script principal d'ingestion des CV.
 Lit tous les PDF du dossier samples_cvs et génère les profils JSON.
+
+Usage:
+    python scripts/run_ingestion.py              # Traitement séquentiel
+    python scripts/run_ingestion.py --workers 4  # 4 processus en parallèle
+    python scripts/run_ingestion.py --workers 0  # Un processus par coeur
+    python scripts/run_ingestion.py --force      # Ignore le manifeste et retraite tout
+    python scripts/run_ingestion.py --reextract  # Régénère les JSON depuis le cache texte
+    python scripts/run_ingestion.py --isolated   # Chaque PDF dans un processus tuable
+    python scripts/run_ingestion.py --backend pypdf2  # Force le moteur d'extraction PDF
+    python scripts/run_ingestion.py --import-store    # Regroupe les JSON dans data/profiles.jsonl
+    python scripts/run_ingestion.py --reextract --search-index  # Indexe tous les CV pour la recherche
+
+Une fois le store ou la base de recherche créés, chaque ingestion y ajoute
+les profils produits.
 """
+import argparse
 import os
 import sys
+import time
 
 # Ajoute le dossier src au chemin de recherche de Python
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from aag.ingestion.extractor import run_extraction_pipeline
+from aag.config import (
+    DEFAULT_WORKERS, MANIFEST_PATH, PDF_MAX_RSS_MB, PDF_TIMEOUT, PROFILE_STORE_PATH,
+    QUARANTINE_PATH, SEARCH_DB_PATH, TEXT_CACHE_DIR
+)
+from aag.ingestion.batch import ingest_pdfs, reextract_profiles
+from aag.ingestion.pdf_reader import BACKENDS, get_backend_name
+from aag.ingestion.manifest import dictionaries_version, load_manifest, plan_ingestion, record_entry
+from aag.ingestion.persist import persist_profiles, save_profile
+from aag.ingestion.sandbox import add_to_quarantine, load_quarantine, save_quarantine
+from aag.storage.profile_store import import_json_dir
 from aag.utils.io import save_json
 from aag.utils.logger import logger
 
 
+def parse_args():
+    """Lit les options de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Ingestion des CV PDF en profils JSON")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=DEFAULT_WORKERS,
+        help="Nombre de processus (1 = séquentiel, 0 = un par coeur)"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Retraite tous les PDF, même ceux inchangés depuis la dernière ingestion"
+    )
+    parser.add_argument(
+        "--reextract", action="store_true",
+        help="Régénère tous les profils depuis le cache texte, sans relire les PDF"
+    )
+    parser.add_argument(
+        "--backend", choices=["auto"] + list(BACKENDS), default=None,
+        help="Moteur d'extraction PDF (défaut : AAG_PDF_BACKEND ou auto)"
+    )
+    parser.add_argument(
+        "--isolated", action="store_true",
+        help="Lit chaque PDF dans un processus dédié, tué en cas de dépassement"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=PDF_TIMEOUT,
+        help="Durée maximale de lecture d'un PDF en mode isolé (secondes)"
+    )
+    parser.add_argument(
+        "--max-rss", type=int, default=PDF_MAX_RSS_MB,
+        help="Mémoire maximale pour la lecture d'un PDF en mode isolé (Mo)"
+    )
+    parser.add_argument(
+        "--import-store", action="store_true",
+        help="Crée le store consolidé des profils à partir des fichiers JSON, sans ingestion"
+    )
+    parser.add_argument(
+        "--search-index", action="store_true",
+        help="Indexe les profils et le texte complet des CV dans la base de recherche SQLite"
+    )
+    return parser.parse_args()
+
+
+def print_persisted(stored, indexed):
+    """Affiche les profils ajoutés au store et à la base de recherche."""
+    if stored:
+        print(f"{stored} profil(s) ajouté(s) au store: {PROFILE_STORE_PATH}")
+    if indexed:
+        print(f"{indexed} profil(s) indexé(s) pour la recherche: {SEARCH_DB_PATH}")
+
+
+def run_reextraction(output_dir, workers=1, search_index=False):
+    """
+    Régénère tous les profils JSON connus du manifeste à partir du cache texte.
+    Aucun PDF n'est ouvert : seuls les dictionnaires d'extraction sont réappliqués.
+    """
+    version = dictionaries_version()
+    manifest = load_manifest(MANIFEST_PATH)
+    entries = manifest["fichiers"]
+
+    print(f"{'='*60}")
+    print(f"RÉ-EXTRACTION DEPUIS LE CACHE - {len(entries)} profil(s)")
+    print(f"{'='*60}\n")
+
+    start = time.perf_counter()
+    success_count = 0
+    missing = []
+    profiles = []
+    hashes = []
+
+    try:
+        for result in reextract_profiles(entries, TEXT_CACHE_DIR, workers=workers):
+            filename = result["fichier"]
+            if result["erreur"]:
+                missing.append(filename)
+                continue
+
+            profile = result["profil"]
+            profile["fichier_source"] = filename
+            save_json(profile, entries[filename]["json"], output_dir)
+            entries[filename]["version_dictionnaires"] = version
+            profiles.append(profile)
+            hashes.append(entries[filename]["hash"])
+            success_count += 1
+    finally:
+        print_persisted(*persist_profiles(manifest, MANIFEST_PATH, profiles, hashes, create_index=search_index))
+
+    elapsed = time.perf_counter() - start
+    throughput = success_count / elapsed if elapsed > 0 else 0.0
+
+    print(f"\nProfils régénérés: {success_count} | Débit: {throughput:.1f} CV/s")
+    if missing:
+        print(f"Absents du cache ({len(missing)}), à réingérer avec --force: {', '.join(missing)}")
+
+
 def main():
     """Point d'entrée principal du script d'ingestion."""
+    args = parse_args()
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
 
     # Dossiers de travail
     input_dir = "data/samples_cvs/"
+    output_dir = "data/samples_json/"
+
+    if args.import_store:
+        count = import_json_dir(output_dir, PROFILE_STORE_PATH)
+        print(f"{count} profil(s) importé(s) dans {PROFILE_STORE_PATH}")
+        return
+
+    if args.reextract:
+        run_reextraction(output_dir, workers, args.search_index)
+        return
 
     # Vérifie que le dossier existe
     if not os.path.exists(input_dir):
         print(f"Erreur: Le dossier {input_dir} n'existe pas.")
         return
 
-    # Liste tous les fichiers PDF
-    pdf_files = [f for f in os.listdir(input_dir) if f.lower().endswith(".pdf")]
+    # Liste tous les fichiers PDF (triés pour un ordre de sortie stable)
+    pdf_files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(".pdf"))
 
     if not pdf_files:
         print(f"Aucun CV trouvé dans {input_dir}. Ajoutez des fichiers PDF pour tester.")
         return
 
+    # Sélection des fichiers nouveaux ou modifiés grâce au manifeste
+    start = time.perf_counter()
+    version = dictionaries_version()
+    backend = get_backend_name(args.backend)
+    manifest = load_manifest(MANIFEST_PATH)
+    pdf_paths = [os.path.join(input_dir, f) for f in pdf_files]
+    to_process, unchanged = plan_ingestion(
+        pdf_paths, manifest, output_dir, version=version, force=args.force, backend=backend
+    )
+
+    # Les PDF en quarantaine ne sont retentés que s'ils ont changé (ou avec --force)
+    quarantine = load_quarantine(QUARANTINE_PATH)
+    skipped = {
+        path for path, content_hash in to_process
+        if not args.force and quarantine.get(os.path.basename(path), {}).get("hash") == content_hash
+    }
+    to_process = [(path, content_hash) for path, content_hash in to_process if path not in skipped]
+
     print(f"{'='*60}")
-    print(f"INGESTION DES CV - {len(pdf_files)} fichier(s) trouvé(s)")
+    print(f"INGESTION DES CV - {len(pdf_files)} fichier(s) trouvé(s) - {workers} worker(s) - moteur {backend}")
+    print(f"{len(to_process)} à traiter, {len(unchanged)} inchangé(s), {len(skipped)} en quarantaine")
     print(f"{'='*60}\n")
 
     # Compteurs
     success_count = 0
     profiles = []
-
-    # Traitement de chaque CV
-    for filename in pdf_files:
-        pdf_path = os.path.join(input_dir, filename)
-
-        print(f"\n--- Traitement: {filename} ---")
-
-        # Extraction du profil
-        profile = run_extraction_pipeline(pdf_path)
-
-        if profile:
-            # Ajoute le nom du fichier source
-            profile["fichier_source"] = filename
-
-            # Génère un nom de fichier JSON
-            json_filename = filename.replace(".pdf", ".json").replace(".PDF", ".json")
-
-            # Sauvegarde en JSON
-            save_json(profile, json_filename)
+    hashes = []
+    failures = []
+
+    # Traitement de chaque CV (les résultats arrivent dans l'ordre de pdf_files)
+    results = ingest_pdfs(
+        [path for path, _ in to_process], workers=workers,
+        hashes=[content_hash for _, content_hash in to_process], cache_dir=TEXT_CACHE_DIR,
+        isolated=args.isolated, timeout=args.timeout, max_rss_mb=args.max_rss, backend=backend
+    )
+    try:
+        for (pdf_path, content_hash), result in zip(to_process, results):
+            filename = result["fichier"]
+            profile = result["profil"]
+
+            print(f"\n--- Traitement: {filename} ---")
+
+            if result["quarantaine"]:
+                logger.error(f"Mise en quarantaine de {filename} : {result['quarantaine']}")
+                add_to_quarantine(quarantine, filename, result["quarantaine"], content_hash)
+                failures.append(filename)
+                continue
+
+            if result["erreur"]:
+                logger.error(f"Echec sur {filename} : {result['erreur']}")
+                failures.append(filename)
+                continue
+
+            quarantine.pop(filename, None)
+
+            # Sauvegarde en JSON (avec le nom du fichier source)
+            json_filename = save_profile(profile, filename, output_dir)
+            record_entry(manifest, pdf_path, content_hash, json_filename, version, backend)
 
             profiles.append(profile)
+            hashes.append(content_hash)
             success_count += 1
+    finally:
+        # Le manifeste est sauvegardé même si le lot est interrompu
+        save_quarantine(quarantine, QUARANTINE_PATH)
+        print_persisted(*persist_profiles(manifest, MANIFEST_PATH, profiles, hashes, create_index=args.search_index))
+
+    elapsed = time.perf_counter() - start
+    throughput = len(to_process) / elapsed if elapsed > 0 else 0.0
 
     # Résumé final
     print(f"\n{'='*60}")
     print(f"RÉSUMÉ DE L'INGESTION")
     print(f"{'='*60}")
-    print(f"Fichiers traités: {len(pdf_files)}")
+    print(f"Fichiers traités: {len(to_process)} (inchangés ignorés: {len(unchanged)})")
     print(f"Extractions réussies: {success_count}")
-    print(f"Fichiers JSON générés dans: data/samples_json/")
+    if failures:
+        print(f"Echecs ({len(failures)}): {', '.join(failures)}")
+    print(f"Durée: {elapsed:.2f} s | Débit: {throughput:.1f} CV/s")
+    print(f"Fichiers JSON générés dans: {output_dir}")
 
     # Affiche un aperçu des profils extraits
     if profiles:
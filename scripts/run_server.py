@@ -0,0 +1,49 @@
+"""
+Lance le service HTTP local de matching.
+Le corpus est chargé une fois au démarrage ; POST /reload le relit après
+une ingestion.
+
+Usage:
+    python scripts/run_server.py                   # http://127.0.0.1:8765
+    python scripts/run_server.py --port 9000
+
+Exemple de requête:
+    curl -s localhost:8765/rank -d '{"besoin": {"ville_cible": "Marseille", "competence_requise": "electrique"}, "top_k": 5}'
+"""
+import argparse
+import os
+import sys
+
+# Ajoute le dossier src au chemin de recherche de Python
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.config import SERVICE_HOST, SERVICE_PORT
+from aag.service.server import MatchingService, create_server
+
+
+def parse_args():
+    """Lit les options de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Service HTTP de matching")
+    parser.add_argument("--host", default=SERVICE_HOST, help=f"Adresse d'écoute (défaut : {SERVICE_HOST})")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help=f"Port d'écoute (défaut : {SERVICE_PORT})")
+    return parser.parse_args()
+
+
+def main():
+    """Point d'entrée du service."""
+    args = parse_args()
+    service = MatchingService()
+    server = create_server(service, args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"{service.count()} profil(s) chargé(s) - service à l'écoute sur http://{host}:{port}")
+    print("Routes: POST /rank, POST /score, POST /reload, GET /status (Ctrl+C pour arrêter)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nArrêt du service.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Recherche dans les CV indexés (base SQLite plein texte).
+
+Usage:
+    python scripts/search_profiles.py "hybride AND habilitation"
+    python scripts/search_profiles.py "electri*" --ville Marseille --competence vul --experience-min 3
+    python scripts/search_profiles.py --competence climatisation   # Filtres seuls
+
+La base est créée par: python scripts/run_ingestion.py --reextract --search-index
+"""
+import argparse
+import os
+import sys
+
+# Ajoute le dossier src au chemin de recherche de Python
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.config import SEARCH_DB_PATH
+from aag.storage.search_db import open_search_db, search_profiles
+
+
+def parse_args():
+    """Lit les options de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Recherche plein texte dans les CV")
+    parser.add_argument("query", nargs="?", default=None, help="Requête FTS5 (AND, OR, NOT, \"phrase\", préfixe*)")
+    parser.add_argument("--ville", default=None, help="Ville du profil")
+    parser.add_argument(
+        "--competence", action="append", default=[],
+        help="Compétence requise (option répétable : toutes sont requises)"
+    )
+    parser.add_argument("--experience-min", type=float, default=None, help="Années d'expérience minimales")
+    parser.add_argument("--limit", type=int, default=20, help="Nombre maximal de résultats")
+    return parser.parse_args()
+
+
+def main():
+    """Point d'entrée de la recherche."""
+    args = parse_args()
+    if not os.path.exists(SEARCH_DB_PATH):
+        print(f"Base de recherche absente: {SEARCH_DB_PATH}")
+        print("Lancez d'abord: python scripts/run_ingestion.py --reextract --search-index")
+        return
+
+    conn = open_search_db(SEARCH_DB_PATH)
+    try:
+        results = search_profiles(
+            conn, args.query, ville=args.ville, competences=args.competence,
+            experience_min=args.experience_min, limit=args.limit
+        )
+    except ValueError as e:
+        print(f"Erreur: {e}")
+        return
+    finally:
+        conn.close()
+
+    print(f"{len(results)} profil(s) trouvé(s)\n")
+    for p in results:
+        print(f"  • {p['nom']} | {p['ville']} | {p['experience_annees']} ans | {p['competences']} | {p.get('fichier_source', '')}")
+        if "extrait" in p:
+            print(f"      {p['extrait']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,13 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 CV_DIR = os.path.join(DATA_DIR, "samples_cvs")
 JSON_DIR = os.path.join(DATA_DIR, "samples_json")
 BESOIN_PATH = os.path.join(DATA_DIR, "besoin.json")
+MANIFEST_PATH = os.path.join(DATA_DIR, "manifest.json")
+TEXT_CACHE_DIR = os.path.join(DATA_DIR, "text_cache")
+QUARANTINE_PATH = os.path.join(DATA_DIR, "quarantine.json")
+GAZETTEER_PATH = os.path.join(DATA_DIR, "gazetteer.bin")
+PROFILE_STORE_PATH = os.path.join(DATA_DIR, "profiles.jsonl")
+PROFILE_SNAPSHOT_PATH = os.path.join(DATA_DIR, "profiles.snap")
+SEARCH_DB_PATH = os.path.join(DATA_DIR, "profiles.db")
 LOGS_DIR = os.path.join(BASE_DIR, "logs")
 
 # Parametres de scoring par defaut
@@ -23,3 +30,50 @@ DEFAULT_EXPERIENCE_MIN = 3
 # Seuils de recommandation
 SEUIL_RECOMMANDE = 80
 SEUIL_A_CONSIDERER = 50
+
+# Parametres d'ingestion
+# Nombre de processus par defaut (1 = sequentiel, 0 = un par coeur)
+DEFAULT_WORKERS = 1
+
+# Nombre de textes envoyes a la fois a un processus lors de l'extraction
+# par lots : borne la memoire et amortit les echanges entre processus
+EXTRACT_CHUNK_SIZE = 256
+
+# Moteur d'extraction PDF : "auto" (le plus rapide installe), "pymupdf",
+# "pypdf" ou "pypdf2" (solution de repli)
+PDF_BACKEND = os.environ.get("AAG_PDF_BACKEND", "auto")
+
+# Limites par document (un CV fait rarement plus de quelques pages)
+PDF_MAX_PAGES = 20
+PDF_MAX_BYTES = 20 * 1024 * 1024
+
+# Limites du mode de lecture isole (--isolated)
+PDF_TIMEOUT = 30        # secondes
+PDF_MAX_RSS_MB = 512    # Mo
+
+# Nombre de processus pour l'analyse des CV televerses dans l'application
+# (0 = un par coeur)
+UPLOAD_WORKERS = 0
+
+# Parametres de scoring
+# Nombre de profils evalues par bloc pour la matrice missions x profils
+# (memoire ~ nombre de missions x MATRIX_CHUNK_SIZE x 8 octets par tableau)
+MATRIX_CHUNK_SIZE = 20000
+
+# Parametres de l'interface
+# Intervalle minimal (secondes) entre deux verifications de nouveaux profils
+PROFILE_POLL_INTERVAL = 2
+
+# Intervalle (secondes) de rafraichissement de la progression d'une analyse
+# de CV televerses
+UPLOAD_POLL_INTERVAL = 1
+
+# Nombre de candidats affiches par page (classement, graphique, tableau)
+PAGE_SIZES = [10, 20, 50, 100]
+DEFAULT_PAGE_SIZE = 20
+
+# Parametres du service HTTP de matching (scripts/run_server.py)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+# Nombre de candidats retournes par /rank si la requete ne le precise pas
+SERVICE_TOP_K = 10
@@ -2,3 +2,5 @@
 from .pdf_reader import read_pdf
 from .text_cleaner import clean_text
 from .extractor import run_extraction_pipeline, extract_profile_data
+from .batch import extract_profiles_batch, ingest_pdfs, process_pdf, reextract_profiles
+from .background import IngestionJob
@@ -0,0 +1,164 @@
+"""
+Ingestion en tâche de fond de CV reçus en mémoire (téléversés dans
+l'application). Les PDF sont lus et analysés par un pool de processus :
+le processus appelant reste disponible et relève les profils au fur et à
+mesure de leur extraction, sans fichier temporaire.
+
+Les profils sont enregistrés par le lot lui-même (profil JSON, cache texte,
+manifeste, store et base de recherche, comme scripts/run_ingestion.py),
+dès leur extraction : ils sont conservés même si personne ne relève le
+lot (onglet de l'application fermé).
+"""
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait as wait_futures
+
+from .batch import process_pdf
+from .manifest import data_hash, dictionaries_version, load_manifest, record_entry
+from .pdf_reader import get_backend_name
+from .persist import persist_profiles, save_profile
+from .sandbox import get_process_context
+from aag.config import (
+    JSON_DIR, MANIFEST_PATH, PROFILE_STORE_PATH, SEARCH_DB_PATH, TEXT_CACHE_DIR, UPLOAD_WORKERS
+)
+from aag.utils.logger import logger
+
+# Les lots de plusieurs sessions partagent le manifeste : une seule mise à
+# jour (lecture, ajout, écriture) à la fois
+_PERSIST_LOCK = threading.Lock()
+
+
+class IngestionJob:
+    """
+    Lot de CV en cours d'analyse.
+
+    Le lot démarre dès sa création ; un thread du lot enregistre les
+    résultats à mesure que le pool les produit. poll() est non bloquant et
+    peut être appelé aussi souvent que nécessaire (par exemple à chaque
+    rafraîchissement de l'interface).
+    """
+
+    def __init__(self, uploads, output_dir=JSON_DIR, workers=UPLOAD_WORKERS, backend=None,
+                 cache_dir=TEXT_CACHE_DIR, manifest_path=MANIFEST_PATH, store_path=PROFILE_STORE_PATH,
+                 search_db_path=SEARCH_DB_PATH):
+        """
+        Args:
+            uploads: Liste de tuples (nom_fichier, contenu du PDF en bytes)
+            output_dir: Dossier des profils JSON
+            workers: Nombre de processus (0 = un par coeur)
+            backend: Moteur d'extraction PDF (voir pdf_reader.get_backend_name)
+            cache_dir: Dossier du cache texte
+            manifest_path: Chemin du manifeste
+            store_path: Chemin du store consolidé (ignoré s'il n'existe pas)
+            search_db_path: Chemin de la base de recherche (ignorée si absente)
+        """
+        workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.total = len(uploads)
+        self.done = 0
+        self.output_dir = output_dir
+        self.backend = get_backend_name(backend)
+        self.version = dictionaries_version()
+        self.cache_dir = cache_dir
+        self.manifest_path = manifest_path
+        self.store_path = store_path
+        self.search_db_path = search_db_path
+        self._results = []
+        self._lock = threading.Lock()
+        self._thread = None
+        if not uploads:
+            return
+
+        executor = ProcessPoolExecutor(
+            max_workers=min(workers, self.total), mp_context=get_process_context()
+        )
+        pending = {}
+        for filename, data in uploads:
+            content_hash = data_hash(data)
+            future = executor.submit(
+                process_pdf, data, content_hash, cache_dir, backend=self.backend, filename=filename
+            )
+            pending[future] = (filename, content_hash, len(data))
+        # Les tâches soumises s'exécutent jusqu'au bout ; les processus
+        # s'arrêtent une fois la file vidée
+        executor.shutdown(wait=False)
+
+        # Thread non démon : un arrêt du processus attend la fin de
+        # l'enregistrement du lot
+        self._thread = threading.Thread(target=self._run, args=(pending,), name="ingestion-job")
+        self._thread.start()
+
+    @property
+    def finished(self):
+        """Vrai quand tous les CV du lot ont été traités et enregistrés."""
+        return self.done == self.total
+
+    def poll(self):
+        """
+        Relève les CV traités et enregistrés depuis l'appel précédent,
+        sans attendre.
+
+        Returns:
+            Liste de résultats de process_pdf ({"fichier", "profil",
+            "erreur", "quarantaine"}), dans l'ordre de fin de traitement
+        """
+        with self._lock:
+            results, self._results = self._results, []
+        return results
+
+    def wait(self, timeout=None):
+        """
+        Attend la fin du lot.
+
+        Args:
+            timeout: Durée maximale d'attente (secondes, None = illimitée)
+
+        Returns:
+            Vrai si le lot est terminé
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.finished
+
+    def _run(self, pending):
+        """Enregistre les résultats par groupes, à mesure qu'ils arrivent."""
+        while pending:
+            completed, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+            batch = []
+            for future in completed:
+                filename, content_hash, size = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Pool interrompu (processus tué...) : process_pdf ne lève jamais
+                    result = {"fichier": filename, "profil": None, "erreur": str(e), "quarantaine": None}
+                batch.append((result, content_hash, size))
+            self._persist(batch)
+            with self._lock:
+                self._results.extend(result for result, _, _ in batch)
+                self.done += len(batch)
+
+    def _persist(self, batch):
+        """Enregistre les profils d'un groupe de résultats, comme run_ingestion."""
+        succeeded = [(result, content_hash, size) for result, content_hash, size in batch if result["profil"]]
+        if not succeeded:
+            return
+        try:
+            with _PERSIST_LOCK:
+                manifest = load_manifest(self.manifest_path)
+                profiles = []
+                hashes = []
+                for result, content_hash, size in succeeded:
+                    filename = result["fichier"]
+                    json_filename = save_profile(result["profil"], filename, self.output_dir)
+                    record_entry(manifest, filename, content_hash, json_filename, self.version, self.backend, size=size)
+                    profiles.append(result["profil"])
+                    hashes.append(content_hash)
+                persist_profiles(
+                    manifest, self.manifest_path, profiles, hashes, self.store_path,
+                    self.search_db_path, self.cache_dir
+                )
+        except Exception as e:
+            logger.error(f"Enregistrement des CV analysés impossible : {e}")
+            for result, _, _ in succeeded:
+                result["profil"] = None
+                result["erreur"] = f"Enregistrement impossible : {e}"
@@ -0,0 +1,197 @@
+"""
+Module d'ingestion par lots.
+Répartit la lecture des PDF et l'extraction des profils sur plusieurs processus.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+
+from .pdf_reader import read_pdf
+from .extractor import extract_profile_data
+from .sandbox import read_pdf_isolated
+from .text_cache import load_text, save_text
+from aag.config import EXTRACT_CHUNK_SIZE, PDF_MAX_RSS_MB, PDF_TIMEOUT
+from aag.utils.logger import logger
+
+
+def process_pdf(pdf_path, content_hash=None, cache_dir=None, isolated=False,
+                timeout=PDF_TIMEOUT, max_rss_mb=PDF_MAX_RSS_MB, backend=None, filename=None):
+    """
+    Traite un seul CV (lecture + extraction) sans jamais lever d'exception.
+    Une erreur sur un fichier n'interrompt donc pas le reste du lot.
+
+    Args:
+        pdf_path: Chemin vers le fichier PDF, ou contenu du PDF (bytes)
+        content_hash: Hash du PDF ; si fourni avec cache_dir, le texte brut
+            complet est sauvegardé dans le cache texte
+        cache_dir: Dossier du cache texte
+        isolated: Lire le PDF dans un processus dédié, tué au-delà de
+            timeout secondes ou de max_rss_mb Mo
+        timeout: Durée maximale de lecture en mode isolé (secondes)
+        max_rss_mb: Mémoire maximale en mode isolé (Mo)
+        backend: Moteur d'extraction PDF (voir pdf_reader.get_backend_name)
+        filename: Nom du fichier dans le résultat (par défaut, nom de
+            pdf_path ; à fournir quand pdf_path est le contenu du PDF)
+
+    Returns:
+        Dictionnaire {"fichier", "profil", "erreur", "quarantaine"}
+        ("quarantaine" contient la limite dépassée en mode isolé, sinon None)
+    """
+    filename = filename or os.path.basename(pdf_path)
+    try:
+        if isolated:
+            raw_text, reason = read_pdf_isolated(pdf_path, timeout, max_rss_mb, backend)
+            if reason:
+                return {"fichier": filename, "profil": None, "erreur": reason, "quarantaine": reason}
+        else:
+            raw_text = read_pdf(pdf_path, backend=backend)
+        if not raw_text:
+            return {"fichier": filename, "profil": None, "erreur": "Impossible de lire le PDF", "quarantaine": None}
+
+        if content_hash and cache_dir:
+            save_text(content_hash, raw_text, cache_dir)
+
+        profile = extract_profile_data(raw_text)
+    except Exception as e:
+        return {"fichier": filename, "profil": None, "erreur": str(e), "quarantaine": None}
+
+    logger.info(f"Profil extrait : {profile['nom']} | {profile['ville']} | {profile['experience_annees']} ans | {profile['competences']}")
+    return {"fichier": filename, "profil": profile, "erreur": None, "quarantaine": None}
+
+
+def ingest_pdfs(pdf_paths, workers=1, hashes=None, cache_dir=None, isolated=False,
+                timeout=PDF_TIMEOUT, max_rss_mb=PDF_MAX_RSS_MB, backend=None):
+    """
+    Traite une liste de CV, en parallèle si plusieurs workers sont demandés.
+
+    Args:
+        pdf_paths: Liste des chemins PDF
+        workers: Nombre de processus (1 = traitement séquentiel)
+        hashes: Liste des hash des PDF (même ordre que pdf_paths), pour
+            alimenter le cache texte
+        cache_dir: Dossier du cache texte
+        isolated: Lire chaque PDF dans un processus dédié et tuable
+            (voir process_pdf)
+        timeout: Durée maximale de lecture par PDF en mode isolé (secondes)
+        max_rss_mb: Mémoire maximale par PDF en mode isolé (Mo)
+        backend: Moteur d'extraction PDF (voir pdf_reader.get_backend_name)
+
+    Yields:
+        Résultats de process_pdf, dans le même ordre que pdf_paths
+    """
+    if hashes is None:
+        hashes = [None] * len(pdf_paths)
+
+    worker = partial(
+        process_pdf, cache_dir=cache_dir, isolated=isolated,
+        timeout=timeout, max_rss_mb=max_rss_mb, backend=backend
+    )
+
+    if workers <= 1 or len(pdf_paths) <= 1:
+        for pdf_path, content_hash in zip(pdf_paths, hashes):
+            yield worker(pdf_path, content_hash)
+        return
+
+    if isolated:
+        # Chaque lecture tourne déjà dans son propre processus : de simples
+        # threads suffisent pour en surveiller plusieurs à la fois
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(worker, pdf_paths, hashes)
+        return
+
+    # Des paquets de quelques fichiers limitent les échanges entre processus
+    chunksize = max(1, len(pdf_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(worker, pdf_paths, hashes, chunksize=chunksize)
+
+
+def _extract_chunk(chunk):
+    """
+    Extrait les profils d'un paquet de textes (exécuté dans un worker).
+
+    Returns:
+        Liste de tuples (source_id, profil ou None)
+    """
+    extract = extract_profile_data
+    return [(source_id, extract(raw_text)) for source_id, raw_text in chunk]
+
+
+def _iter_chunks(items, chunk_size):
+    """Découpe un itérable en listes d'au plus chunk_size éléments."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def extract_profiles_batch(items, chunk_size=EXTRACT_CHUNK_SIZE, workers=1):
+    """
+    Extrait les profils d'un grand nombre de textes, en flux.
+
+    Les textes sont lus par paquets de chunk_size : seuls quelques paquets
+    sont en mémoire à la fois, quelle que soit la taille de items. Avec
+    plusieurs workers, chaque processus reçoit un paquet entier, ce qui
+    amortit les échanges entre processus, et au plus 2 paquets par worker
+    sont en cours à un instant donné.
+
+    Args:
+        items: Itérable de tuples (source_id, texte_brut), éventuellement un générateur
+        chunk_size: Nombre de textes par paquet
+        workers: Nombre de processus (1 = traitement séquentiel)
+
+    Yields:
+        Tuples (source_id, profil), dans l'ordre de items
+        (profil vaut None pour un texte vide, comme extract_profile_data)
+    """
+    chunks = _iter_chunks(items, max(1, chunk_size))
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _extract_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_extract_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def reextract_profiles(entries, cache_dir, workers=1):
+    """
+    Reconstruit les profils depuis le cache texte, sans ouvrir aucun PDF.
+    Utile après une modification des dictionnaires d'extraction.
+
+    Args:
+        entries: Dictionnaire {nom_pdf: entrée du manifeste}
+        cache_dir: Dossier du cache texte
+        workers: Nombre de processus pour l'extraction (voir extract_profiles_batch)
+
+    Yields:
+        Dictionnaires {"fichier", "profil", "erreur"}, dans l'ordre des noms de fichiers
+    """
+    missing = set()
+
+    def cached_texts():
+        for filename in sorted(entries):
+            raw_text = load_text(entries[filename]["hash"], cache_dir)
+            if raw_text is None:
+                missing.add(filename)
+            yield filename, raw_text
+
+    # Un paquet est entièrement lu (et missing complété) avant que ses
+    # résultats ne soient produits
+    for filename, profile in extract_profiles_batch(cached_texts(), workers=workers):
+        if filename in missing:
+            yield {"fichier": filename, "profil": None, "erreur": "Texte absent du cache"}
+        elif profile is None:
+            yield {"fichier": filename, "profil": None, "erreur": "Texte vide"}
+        else:
+            yield {"fichier": filename, "profil": profile, "erreur": None}
@@ -3,8 +3,11 @@ Module d'extraction de profils Gomécanicien.
 Transforme le texte brut des CV en données structurées.
 """
 import re
+from .gazetteer import CONFIANCE_NOM_COURT, get_gazetteer
+from .matcher import KeywordMatcher
 from .pdf_reader import read_pdf
 from .text_cleaner import clean_text
+from aag.models.vocab import SKILLS_DB
 from aag.utils.logger import logger
 
 
@@ -12,17 +15,8 @@ from aag.utils.logger import logger
 # DICTIONNAIRES DE RECHERCHE (à enrichir par les étudiants)
 # =============================================================================
 
-# Catégories de compétences et leurs mots-clés associés
-SKILLS_DB = {
-    "moteur": ["moteur", "distribution", "culasse", "embrayage", "vidange", "courroie"],
-    "freinage": ["frein", "freinage", "disque", "plaquette", "abs", "étrier"],
-    "electrique": ["électrique", "electrique", "batterie", "alternateur", "démarreur",
-                   "hybride", "diagnostic", "valise", "injection"],
-    "pneus": ["pneu", "pneumatique", "parallélisme", "équilibrage", "géométrie"],
-    "climatisation": ["climatisation", "clim", "recharge"],
-    "carrosserie": ["carrosserie", "peinture", "débosselage"],
-    "vul": ["vul", "utilitaire", "véhicule utilitaire", "flotte"]
-}
+# Catégories de compétences et leurs mots-clés associés : SKILLS_DB
+# (aag/models/vocab.py), partagé avec les modèles et le scoring
 
 # Villes cibles pour Gomécano (zone PACA élargie)
 VILLES_CIBLES = [
@@ -32,23 +26,127 @@ VILLES_CIBLES = [
     "lyon", "toulouse", "paris", "bordeaux", "nantes"
 ]
 
+# Confiance d'une ville de VILLES_CIBLES trouvée dans le texte,
+# selon qu'un code postal de cette ville est aussi cité ou non
+CONFIANCE_VILLE_CIBLE_CP = 1.0
+CONFIANCE_VILLE_CIBLE = 0.8
+
+# Patterns pour trouver l'expérience
+EXPERIENCE_PATTERNS = [
+    r'(\d+)\s*ans?\s*d.exp[ée]rience',  # "5 ans d'expérience"
+    r'exp[ée]rience\s*:\s*(\d+)',         # "Expérience: 5"
+    r'(\d+)\s*ans?\s*en\s*m[ée]canique',  # "5 ans en mécanique"
+    r'(\d+)\s*ann[ée]es?',                # "5 années"
+    r'depuis\s*(\d+)\s*ans?',             # "depuis 5 ans"
+]
+
+
+def _build_keyword_matcher():
+    """Compile les mots-clés des compétences et des villes en un seul automate."""
+    keywords = [
+        (keyword, ("competence", category))
+        for category, category_keywords in SKILLS_DB.items()
+        for keyword in category_keywords
+    ]
+    keywords += [(ville, ("ville", rang)) for rang, ville in enumerate(VILLES_CIBLES)]
+    return KeywordMatcher(keywords)
+
+
+def _compile_experience_regex(patterns):
+    """
+    Combine les patterns d'expérience en une seule expression régulière.
+
+    Chaque pattern doit être de la forme <préfixe>(\\d+)<suite>. Les patterns
+    sans préfixe sont regroupés derrière un même groupe (\\d+), et les suites
+    sont placées en lookahead : seuls le préfixe et le nombre sont consommés,
+    si bien qu'une correspondance ne masque jamais le début d'une autre.
+    On retrouve ainsi exactement les nombres que trouveraient des re.findall
+    séparés, en un seul parcours du texte.
+    """
+    number = r'(\d+)'
+    suffixes = []
+    prefixed = []
+    for pattern in patterns:
+        if pattern.count(number) != 1:
+            raise ValueError(f"Pattern d'expérience invalide (un seul groupe (\\d+) attendu) : {pattern}")
+        prefix, suffix = pattern.split(number)
+        lookahead = f'(?={suffix})' if suffix else ''
+        if prefix:
+            prefixed.append(prefix + number + lookahead)
+        else:
+            suffixes.append(suffix)
+
+    # Le groupe (\d+) étant glouton, chaque correspondance démarre en début de
+    # nombre et consomme le nombre entier, comme avec re.findall
+    alternatives = []
+    if suffixes:
+        alternatives.append(number + '(?=' + '|'.join(suffixes) + ')')
+    return re.compile('|'.join(alternatives + prefixed))
+
+
+# Premier caractère non blanc (début de la première ligne du CV)
+_NON_BLANK = re.compile(r'\S')
+
+# Automates compilés une fois à l'import (voir reload_dictionaries)
+_KEYWORD_MATCHER = _build_keyword_matcher()
+_EXPERIENCE_REGEX = _compile_experience_regex(EXPERIENCE_PATTERNS)
+
+
+def reload_dictionaries():
+    """
+    Recompile les automates de recherche.
+    À appeler après toute modification de SKILLS_DB, VILLES_CIBLES ou
+    EXPERIENCE_PATTERNS en cours d'exécution.
+    """
+    global _KEYWORD_MATCHER, _EXPERIENCE_REGEX
+    _KEYWORD_MATCHER = _build_keyword_matcher()
+    _EXPERIENCE_REGEX = _compile_experience_regex(EXPERIENCE_PATTERNS)
+
 
 def extract_name(text):
     """
     Extrait le nom du candidat (généralement en début de CV).
     Heuristique simple : première ligne en majuscules.
+    Seules les 5 premières lignes sont lues, sans copier ni découper le
+    reste du texte : la première page suffit (read_pdf(..., max_pages=1)).
     """
-    lines = text.strip().split('\n')
-    for line in lines[:5]:  # Chercher dans les 5 premières lignes
-        line = line.strip()
+    match = _NON_BLANK.search(text)
+    start = match.start() if match else len(text)
+    for _ in range(5):  # Chercher dans les 5 premières lignes
+        end = text.find('\n', start)
+        if end == -1:
+            end = len(text)
+        line = text[start:end].strip()
+        start = end + 1
         # Si la ligne ressemble à un nom (2-4 mots, majuscules)
         if line and len(line.split()) >= 2 and len(line.split()) <= 4:
             # Vérifier s'il y a des majuscules
             if any(c.isupper() for c in line):
                 return line.title()
+        if end == len(text):
+            break
     return "Nom Inconnu"
 
 
+def match_keywords(cleaned_text):
+    """
+    Recherche les compétences et la ville en une seule passe sur le texte.
+
+    Returns:
+        Tuple (competences, ville)
+        - competences: Catégories trouvées, dans l'ordre de SKILLS_DB
+        - ville: Première ville de VILLES_CIBLES présente dans le texte, ou "Inconnue"
+    """
+    hits = _KEYWORD_MATCHER.find_values(cleaned_text)
+
+    found_skills = [category for category in SKILLS_DB if ("competence", category) in hits]
+
+    rangs = [rang for kind, rang in hits if kind == "ville"]
+    city = VILLES_CIBLES[min(rangs)].title() if rangs else "Inconnue"
+
+    return found_skills, city
+
+
 def extract_skills(cleaned_text):
     """
     Extrait les compétences trouvées dans le texte.
@@ -56,16 +154,7 @@ def extract_skills(cleaned_text):
     Returns:
         Liste des catégories de compétences identifiées
     """
-    found_skills = []
-
-    for category, keywords in SKILLS_DB.items():
-        for keyword in keywords:
-            if keyword in cleaned_text:
-                if category not in found_skills:
-                    found_skills.append(category)
-                break  # Catégorie trouvée, passer à la suivante
-
-    return found_skills
+    return match_keywords(cleaned_text)[0]
 
 
 def extract_city(cleaned_text):
@@ -75,36 +164,62 @@ def extract_city(cleaned_text):
     Returns:
         Nom de la ville ou "Inconnue"
     """
-    for ville in VILLES_CIBLES:
-        if ville in cleaned_text:
-            return ville.title()
-    return "Inconnue"
+    return match_keywords(cleaned_text)[1]
+
+
+def extract_city_details(cleaned_text, ville=None, gazetteer=None):
+    """
+    Extrait la ville du candidat avec un indice de confiance.
+
+    Les villes cibles (VILLES_CIBLES) restent prioritaires, avec le même
+    résultat que extract_city ; sinon la ville est cherchée dans le
+    référentiel national des communes (noms et codes postaux), s'il a été
+    construit avec scripts/build_gazetteer.py.
+
+    Args:
+        cleaned_text: Texte nettoyé
+        ville: Résultat de extract_city s'il est déjà connu
+        gazetteer: Référentiel à utiliser (défaut : get_gazetteer())
+
+    Returns:
+        Tuple (ville, confiance) avec une confiance entre 0 et 1
+    """
+    if ville is None:
+        ville = extract_city(cleaned_text)
+    if gazetteer is None:
+        gazetteer = get_gazetteer()
+
+    if ville != "Inconnue":
+        if gazetteer is not None:
+            index = gazetteer.lookup(ville)
+            cited_codes = {code for _, code, _ in gazetteer.find(cleaned_text)[1]}
+            if index is not None and gazetteer.postal_codes(index) & cited_codes:
+                return ville, CONFIANCE_VILLE_CIBLE_CP
+        return ville, CONFIANCE_VILLE_CIBLE
+
+    if gazetteer is not None:
+        found, confidence = gazetteer.locate(cleaned_text)
+        # Un nom court isolé est trop souvent un mot courant pour être retenu
+        if found and confidence > CONFIANCE_NOM_COURT:
+            return found, confidence
+
+    return "Inconnue", 0.0
 
 
 def extract_experience(cleaned_text):
     """
     Extrait le nombre d'années d'expérience.
     Recherche des patterns comme "X ans", "X années", etc.
+    (tous les patterns en un seul parcours, voir _compile_experience_regex)
 
     Returns:
         Nombre d'années (int) ou 0 si non trouvé
     """
-    # Patterns pour trouver l'expérience
-    patterns = [
-        r'(\d+)\s*ans?\s*d.exp[ée]rience',  # "5 ans d'expérience"
-        r'exp[ée]rience\s*:\s*(\d+)',         # "Expérience: 5"
-        r'(\d+)\s*ans?\s*en\s*m[ée]canique',  # "5 ans en mécanique"
-        r'(\d+)\s*ann[ée]es?',                # "5 années"
-        r'depuis\s*(\d+)\s*ans?',             # "depuis 5 ans"
-    ]
-
     max_years = 0
-    for pattern in patterns:
-        matches = re.findall(pattern, cleaned_text)
-        for match in matches:
-            years = int(match)
-            if years > max_years and years < 50:  # Sanity check
-                max_years = years
+    for match in _EXPERIENCE_REGEX.finditer(cleaned_text):
+        years = int(match.group(match.lastindex))
+        if years > max_years and years < 50:  # Sanity check
+            max_years = years
 
     return max_years
 
@@ -127,10 +242,13 @@ def extract_profile_data(raw_text):
     cleaned = clean_text(raw_text)
 
     # Extraction des différents champs
+    competences, ville = match_keywords(cleaned)
+    ville, ville_confiance = extract_city_details(cleaned, ville)
     profile = {
         "nom": extract_name(raw_text),  # Utilise le texte brut pour garder la casse
-        "ville": extract_city(cleaned),
-        "competences": extract_skills(cleaned),
+        "ville": ville,
+        "ville_confiance": ville_confiance,
+        "competences": competences,
         "experience_annees": extract_experience(cleaned),
         "texte_source": cleaned[:500]  # Garde un extrait pour debug
     }
@@ -0,0 +1,363 @@
+"""
+Référentiel des communes françaises (gazetteer) pour l'extraction de la ville.
+
+Le référentiel est compilé une fois par scripts/build_gazetteer.py dans un
+fichier binaire compact (data/gazetteer.bin) : noms normalisés triés, noms
+d'affichage et codes postaux, compressés. Les noms triés servent d'arbre
+préfixe : une recherche dichotomique indique si un groupe de mots peut encore
+être le début d'un nom de commune, ce qui permet de trouver le nom le plus long
+("saint martin de crau" plutôt que "saint martin") sans table supplémentaire.
+"""
+import os
+import re
+import struct
+import unicodedata
+import zlib
+from array import array
+from bisect import bisect_left
+
+from aag.config import GAZETTEER_PATH
+
+
+# En-tête du fichier : signature, version du format, nombre de communes
+MAGIC = b"AAGGAZ"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<6sHI")
+
+# Nombre maximal de mots dans un nom de commune
+MAX_TOKENS = 8
+
+# Niveaux de confiance de la ville extraite
+CONFIANCE_NOM_ET_CP = 0.95   # Nom trouvé et confirmé par un code postal
+CONFIANCE_CP = 0.7           # Code postal seul, dans une adresse
+CONFIANCE_NOM = 0.6          # Nom seul (plusieurs mots, ou nom long dans une adresse)
+CONFIANCE_NOM_COURT = 0.3    # Nom court d'un seul mot dans une adresse (non retenu)
+
+# Abréviations usuelles des noms de communes
+_ABREVIATIONS = {"st": "saint", "ste": "sainte"}
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Un nombre de 5 chiffres n'est retenu comme code postal que dans une
+# adresse : accolé à un nom de commune, ou précédé de peu par l'un de ces
+# mots (normalisés). Ailleurs c'est souvent un montant ("35000 euros").
+MOTS_ADRESSE = {
+    "adresse", "domicile", "cp", "postal", "rue", "avenue", "av", "boulevard", "bd",
+    "chemin", "allee", "place", "route", "impasse", "quai", "cours", "residence",
+    "lotissement", "bp", "cedex",
+}
+# Nombre de mots examinés avant le code postal ("12 rue de la paix 75002")
+FENETRE_ADRESSE = 6
+
+# Un nom de commune d'un seul mot n'est retenu que confirmé par un code
+# postal ou précédé de peu par l'un de ces mots : sinon c'est souvent un mot
+# courant ou un employeur ("vente de pièces", "technicien chez Orange")
+MOTS_LOCALISATION = MOTS_ADRESSE | {"habite", "ville", "localisation", "domicilie", "reside", "residant", "situe"}
+
+# Mots laissés en minuscules dans les noms d'affichage ("Saint Martin de Crau")
+_PETITS_MOTS = {"de", "du", "des", "la", "le", "les", "l", "d", "sur", "sous", "en", "et", "au", "aux", "lès"}
+_SEPARATEURS = re.compile(r"([\s\-']+)")
+_ARRONDISSEMENT = re.compile(r"(\s+\d+)+$")
+
+
+def normalize(text):
+    """
+    Normalise un texte pour la recherche de communes :
+    minuscules, sans accents, ponctuation remplacée par des espaces.
+
+    Returns:
+        Liste des mots normalisés
+    """
+    # Après décomposition NFKD, les accents sont des caractères combinants
+    # non ASCII : l'encodage ASCII les retire en une seule passe
+    text = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+    tokens = _NON_ALNUM.sub(" ", text).split()
+    return [_ABREVIATIONS.get(token, token) for token in tokens]
+
+
+def normalize_name(name):
+    """
+    Clé normalisée d'un nom de commune.
+    Le numéro d'arrondissement éventuel est retiré ("MARSEILLE 01" -> "marseille").
+    """
+    tokens = normalize(name)
+    while len(tokens) > 1 and tokens[-1].isdigit():
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def display_name(name):
+    """
+    Nom d'affichage d'une commune à partir du nom de la source.
+
+    Un nom en casse mixte ("Évry-Courcouronnes") est conservé tel quel ; un
+    nom en majuscules ("ST MARTIN DE CRAU", cas de la base La Poste) est
+    remis en casse usuelle en gardant accents, traits d'union et apostrophes
+    ("Saint Martin de Crau"). Le numéro d'arrondissement est retiré.
+    """
+    name = _ARRONDISSEMENT.sub("", " ".join(name.split())) or name
+    if not name.isupper():
+        return name
+    parts = _SEPARATEURS.split(name.lower())
+    for i in range(0, len(parts), 2):
+        word = _ABREVIATIONS.get(parts[i], parts[i])
+        if i == 0 or word not in _PETITS_MOTS:
+            word = word[:1].upper() + word[1:]
+        parts[i] = word
+    return "".join(parts)
+
+
+class Gazetteer:
+    """Index des communes : noms normalisés triés et codes postaux."""
+
+    def __init__(self, keys, displays, codes, offsets, postal_index=None):
+        """
+        Args:
+            keys: Noms normalisés, triés
+            displays: Noms d'affichage (même ordre que keys)
+            codes: Codes postaux de toutes les communes, à la suite (array 'I')
+            offsets: Début des codes de chaque commune dans codes, plus la fin (array 'I')
+            postal_index: Tuple (codes_tries, index_commune) pour retrouver la
+                commune d'un code postal (calculé si None)
+        """
+        self.keys = keys
+        self.displays = displays
+        self.codes = codes
+        self.offsets = offsets
+        if postal_index is None:
+            pairs = sorted(
+                (code, index)
+                for index in range(len(keys))
+                for code in codes[offsets[index]:offsets[index + 1]]
+            )
+            postal_index = (array("I", [c for c, _ in pairs]), array("I", [i for _, i in pairs]))
+        self._postal_codes, self._postal_owners = postal_index
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, name):
+        """Index de la commune portant ce nom, ou None."""
+        key = normalize_name(name)
+        pos = bisect_left(self.keys, key)
+        if pos < len(self.keys) and self.keys[pos] == key:
+            return pos
+        return None
+
+    def postal_codes(self, index):
+        """Codes postaux d'une commune."""
+        return set(self.codes[self.offsets[index]:self.offsets[index + 1]])
+
+    def commune_for_code(self, code):
+        """
+        Commune d'un code postal (la première par ordre alphabétique si le code
+        est partagé par plusieurs communes), ou None.
+        """
+        pos = bisect_left(self._postal_codes, code)
+        if pos < len(self._postal_codes) and self._postal_codes[pos] == code:
+            return self._postal_owners[pos]
+        return None
+
+    def _longest_name_at(self, tokens, start):
+        """
+        Plus long nom de commune commençant au mot start.
+
+        Returns:
+            Tuple (index_commune, nombre_de_mots) ou None
+        """
+        best = None
+        candidate = ""
+        for end in range(start, min(start + MAX_TOKENS, len(tokens))):
+            candidate = tokens[end] if end == start else candidate + " " + tokens[end]
+            pos = bisect_left(self.keys, candidate)
+            if pos == len(self.keys) or not self.keys[pos].startswith(candidate):
+                break  # Aucun nom ne commence ainsi : inutile d'allonger
+            if self.keys[pos] == candidate:
+                best = (pos, end - start + 1)
+        return best
+
+    def find(self, text):
+        """
+        Recherche les communes citées dans un texte.
+
+        Args:
+            text: Texte du CV (brut ou nettoyé)
+
+        Returns:
+            Tuple (noms, codes)
+            - noms: Liste de (position_mot, index_commune, nombre_de_mots,
+              dans_adresse), dans_adresse indiquant qu'un mot de
+              MOTS_LOCALISATION précède le nom de peu
+            - codes: Liste de (position_mot, code_postal, index_commune), pour
+              les seuls codes cités dans une adresse (voir MOTS_ADRESSE)
+        """
+        tokens = normalize(text)
+        names = []
+        candidates = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if len(token) == 5 and token.isdigit():
+                index = self.commune_for_code(int(token))
+                if index is not None:
+                    candidates.append((i, int(token), index))
+                i += 1
+                continue
+            match = self._longest_name_at(tokens, i)
+            # Les communes d'un ou deux caractères ("Y", "Eu") sont ignorées :
+            # dans un CV, ce sont presque toujours des mots courants
+            if match and (match[1] > 1 or len(self.keys[match[0]]) > 2):
+                in_address = not MOTS_LOCALISATION.isdisjoint(tokens[max(0, i - FENETRE_ADRESSE):i])
+                names.append((i, match[0], match[1], in_address))
+                i += match[1]
+            else:
+                i += 1
+
+        # Mots qui commencent ou terminent un nom de commune
+        name_bounds = set()
+        for position, _, size, _ in names:
+            name_bounds.add(position)
+            name_bounds.add(position + size - 1)
+        codes = [
+            (position, code, index) for position, code, index in candidates
+            if position - 1 in name_bounds or position + 1 in name_bounds
+            or not MOTS_ADRESSE.isdisjoint(tokens[max(0, position - FENETRE_ADRESSE):position + 2])
+        ]
+        return names, codes
+
+    def locate(self, text):
+        """
+        Détermine la ville la plus probable d'un CV.
+
+        Un nom confirmé par un code postal l'emporte, puis un code postal seul,
+        puis un nom seul ; à confiance égale, la première mention (en-tête du CV)
+        est retenue. Un nom d'un seul mot sans code postal n'est retenu que
+        dans une adresse (voir MOTS_LOCALISATION), et un nom court l'est alors
+        avec la confiance CONFIANCE_NOM_COURT, insuffisante pour
+        extractor.extract_city_details.
+
+        Returns:
+            Tuple (ville, confiance) ou (None, 0.0) si aucune commune trouvée
+        """
+        names, codes = self.find(text)
+        cited_codes = {code for _, code, _ in codes}
+
+        candidates = []
+        for position, index, size, in_address in names:
+            if self.postal_codes(index) & cited_codes:
+                confidence = CONFIANCE_NOM_ET_CP
+            elif size > 1:
+                confidence = CONFIANCE_NOM
+            elif not in_address:
+                continue
+            elif len(self.keys[index]) >= 6:
+                confidence = CONFIANCE_NOM
+            else:
+                confidence = CONFIANCE_NOM_COURT
+            candidates.append((confidence, -position, index))
+        for position, _, index in codes:
+            candidates.append((CONFIANCE_CP, -position, index))
+
+        if not candidates:
+            return None, 0.0
+        confidence, _, index = max(candidates)
+        return self.displays[index], confidence
+
+    def save(self, path):
+        """Écrit l'index dans un fichier binaire compact."""
+        sections = [
+            "\n".join(self.keys).encode("utf-8"),
+            "\n".join(self.displays).encode("utf-8"),
+            self.codes.tobytes(),
+            self.offsets.tobytes(),
+            self._postal_codes.tobytes(),
+            self._postal_owners.tobytes(),
+        ]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(self.keys)))
+            for section in sections:
+                data = zlib.compress(section, 9)
+                f.write(struct.pack("<I", len(data)))
+                f.write(data)
+
+    @classmethod
+    def load(cls, path):
+        """Charge un index écrit par save."""
+        with open(path, "rb") as f:
+            magic, version, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"Format de gazetteer non supporté : {path}")
+            sections = []
+            for _ in range(6):
+                (size,) = struct.unpack("<I", f.read(4))
+                sections.append(zlib.decompress(f.read(size)))
+
+        keys = sections[0].decode("utf-8").split("\n") if count else []
+        displays = sections[1].decode("utf-8").split("\n") if count else []
+        arrays = []
+        for section in sections[2:]:
+            values = array("I")
+            values.frombytes(section)
+            arrays.append(values)
+        codes, offsets, postal_codes, postal_owners = arrays
+        return cls(keys, displays, codes, offsets, (postal_codes, postal_owners))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Construit l'index à partir de couples (nom_commune, code_postal).
+        Les lignes d'une même commune (plusieurs codes postaux, arrondissements)
+        sont regroupées ; le nom d'affichage vient de la source (voir display_name).
+        """
+        communes = {}
+        for name, code in rows:
+            key = normalize_name(name)
+            if not key:
+                continue
+            commune = communes.get(key)
+            if commune is None:
+                commune = communes[key] = [display_name(name), set(), name.isupper()]
+            elif commune[2] and not name.isupper():
+                # L'orthographe d'origine (accents, casse) l'emporte sur un
+                # nom en majuscules remis en casse
+                commune[0], commune[2] = display_name(name), False
+            if code:
+                commune[1].add(int(code))
+
+        keys = sorted(communes)
+        displays = [communes[key][0] for key in keys]
+        codes = array("I")
+        offsets = array("I", [0])
+        for key in keys:
+            codes.extend(sorted(communes[key][1]))
+            offsets.append(len(codes))
+        return cls(keys, displays, codes, offsets)
+
+
+_GAZETTEER = None
+_GAZETTEER_LOADED = False
+
+
+def get_gazetteer():
+    """
+    Index des communes par défaut (GAZETTEER_PATH), chargé au premier appel.
+
+    Returns:
+        Gazetteer, ou None si le fichier n'a pas été construit
+    """
+    global _GAZETTEER, _GAZETTEER_LOADED
+    if not _GAZETTEER_LOADED:
+        _GAZETTEER = Gazetteer.load(GAZETTEER_PATH) if os.path.exists(GAZETTEER_PATH) else None
+        _GAZETTEER_LOADED = True
+    return _GAZETTEER
+
+
+def gazetteer_version():
+    """
+    Version du référentiel installé (taille et date du fichier), utilisée par
+    le manifeste d'ingestion pour réextraire les profils quand il change.
+    """
+    if not os.path.exists(GAZETTEER_PATH):
+        return None
+    stat = os.stat(GAZETTEER_PATH)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
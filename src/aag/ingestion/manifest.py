@@ -0,0 +1,195 @@
+"""
+Manifeste d'ingestion incrémentale.
+Mémorise, pour chaque PDF source, son empreinte (hash, taille, mtime) et la
+version des dictionnaires d'extraction utilisée, afin de ne retraiter que les
+fichiers nouveaux, modifiés ou extraits avec des dictionnaires périmés.
+"""
+import hashlib
+import json
+import os
+
+from .extractor import SKILLS_DB, VILLES_CIBLES, EXPERIENCE_PATTERNS
+from .gazetteer import MOTS_LOCALISATION, gazetteer_version
+
+
+# Version du format du manifeste (à incrémenter si la structure change)
+MANIFEST_VERSION = 1
+
+
+def file_hash(file_path, chunk_size=1024 * 1024):
+    """
+    Calcule le hash SHA-256 du contenu d'un fichier, par blocs.
+
+    Args:
+        file_path: Chemin du fichier
+        chunk_size: Taille des blocs lus
+
+    Returns:
+        Hash hexadécimal
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_hash(data):
+    """
+    Hash SHA-256 d'un contenu en mémoire (même valeur que file_hash sur
+    un fichier de même contenu).
+
+    Args:
+        data: Contenu (bytes)
+
+    Returns:
+        Hash hexadécimal
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def dictionaries_version():
+    """
+    Calcule la version des dictionnaires d'extraction.
+    Toute modification de SKILLS_DB, VILLES_CIBLES, des patterns
+    d'expérience, du référentiel des communes ou des mots d'adresse qui
+    l'accompagnent change cette version et invalide les profils existants.
+
+    Returns:
+        Empreinte courte (16 caractères hexadécimaux)
+    """
+    payload = json.dumps(
+        {
+            "skills": SKILLS_DB,
+            "villes": VILLES_CIBLES,
+            "experience": EXPERIENCE_PATTERNS,
+            "gazetteer": gazetteer_version(),
+            "localisation": sorted(MOTS_LOCALISATION),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_manifest(path):
+    """
+    Charge le manifeste, ou en crée un vide s'il n'existe pas
+    (ou s'il a été écrit dans un autre format).
+
+    Args:
+        path: Chemin du fichier manifeste
+
+    Returns:
+        Dictionnaire {"version": int, "fichiers": {nom_pdf: entrée}}
+    """
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    return {"version": MANIFEST_VERSION, "fichiers": {}}
+
+
+def save_manifest(manifest, path):
+    """
+    Sauvegarde le manifeste de façon atomique (fichier temporaire + renommage),
+    pour ne jamais laisser un manifeste tronqué si l'ingestion est interrompue.
+
+    Args:
+        manifest: Dictionnaire du manifeste
+        path: Chemin du fichier manifeste
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def plan_ingestion(pdf_paths, manifest, output_dir, version=None, force=False, backend=None):
+    """
+    Détermine les fichiers à (re)traiter.
+
+    Un fichier dont la taille, le mtime, la version des dictionnaires et le
+    moteur PDF sont inchangés est ignoré sans être relu. Si seuls la taille ou le mtime ont
+    changé, le hash tranche : un fichier simplement "touché" est ignoré.
+
+    Args:
+        pdf_paths: Liste des chemins PDF
+        manifest: Manifeste chargé par load_manifest (mis à jour en place)
+        output_dir: Dossier des profils JSON (un JSON manquant force le retraitement)
+        version: Version des dictionnaires (calculée si None)
+        force: Retraiter tous les fichiers
+        backend: Nom du moteur PDF utilisé (un changement de moteur change
+            le texte extrait, donc force le retraitement)
+
+    Returns:
+        Tuple (a_traiter, inchanges)
+        - a_traiter: Liste de tuples (chemin_pdf, hash)
+        - inchanges: Liste des chemins ignorés
+    """
+    if version is None:
+        version = dictionaries_version()
+
+    entries = manifest["fichiers"]
+    to_process = []
+    unchanged = []
+
+    for pdf_path in pdf_paths:
+        filename = os.path.basename(pdf_path)
+        stat = os.stat(pdf_path)
+        entry = entries.get(filename)
+
+        up_to_date = (
+            not force
+            and entry is not None
+            and entry["version_dictionnaires"] == version
+            and entry.get("backend") == backend
+            and os.path.exists(os.path.join(output_dir, entry["json"]))
+        )
+        if up_to_date and entry["taille"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+            unchanged.append(pdf_path)
+            continue
+
+        content_hash = file_hash(pdf_path)
+        if up_to_date and entry["hash"] == content_hash:
+            # Fichier touché mais contenu identique
+            entry["taille"] = stat.st_size
+            entry["mtime"] = stat.st_mtime_ns
+            unchanged.append(pdf_path)
+            continue
+
+        to_process.append((pdf_path, content_hash))
+
+    return to_process, unchanged
+
+
+def record_entry(manifest, pdf_path, content_hash, json_filename, version=None, backend=None, size=None):
+    """
+    Enregistre un fichier traité avec succès dans le manifeste.
+
+    Args:
+        manifest: Manifeste à mettre à jour
+        pdf_path: Chemin du PDF source
+        content_hash: Hash du contenu (calculé par plan_ingestion)
+        json_filename: Nom du profil JSON généré
+        version: Version des dictionnaires (calculée si None)
+        backend: Nom du moteur PDF utilisé
+        size: Taille du contenu d'un CV reçu en mémoire ; pdf_path n'est
+            alors qu'un nom de fichier, et le mtime est inconnu (le hash
+            tranchera si le fichier est ensuite déposé dans le dossier des CV)
+    """
+    if size is None:
+        stat = os.stat(pdf_path)
+        size, mtime = stat.st_size, stat.st_mtime_ns
+    else:
+        mtime = None
+    manifest["fichiers"][os.path.basename(pdf_path)] = {
+        "hash": content_hash,
+        "taille": size,
+        "mtime": mtime,
+        "version_dictionnaires": version or dictionaries_version(),
+        "json": json_filename,
+        "backend": backend,
+    }
@@ -1,16 +1,191 @@
-import PyPDF2
+"""
+Module de lecture des CV au format PDF.
+Les pages sont lues paresseusement, dans la limite d'un budget de pages et
+d'une taille maximale de fichier, pour qu'un document démesuré (portfolio
+scanné de 200 pages...) ne bloque pas l'ingestion.
 
-def read_pdf(file_path):
-    """Extrait le texte brut d'un fichier PDF."""
-    text = ""
+Un PDF peut être donné par son chemin, par son contenu en mémoire (bytes,
+fichier téléversé dans l'application) ou par un fichier binaire déjà ouvert.
+
+Plusieurs moteurs d'extraction de texte sont supportés ; le plus rapide parmi
+ceux installés est choisi automatiquement, PyPDF2 servant de solution de repli
+(voir scripts/bench_pdf_backends.py pour les comparer).
+"""
+import importlib.util
+import io
+import os
+from contextlib import nullcontext
+from itertools import islice
+
+from aag.config import PDF_BACKEND, PDF_MAX_BYTES, PDF_MAX_PAGES
+from aag.utils.logger import logger
+
+
+# =============================================================================
+# MOTEURS D'EXTRACTION
+# Chaque moteur reçoit un fichier binaire ouvert et retourne un tuple
+# (nombre_de_pages, itérateur paresseux sur le texte de chaque page).
+# =============================================================================
+
+def _pages_pymupdf(f):
+    """Extraction avec PyMuPDF (bibliothèque C, la plus rapide)."""
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    doc = pymupdf.open(stream=f.read(), filetype="pdf")
+    return doc.page_count, (page.get_text() for page in doc)
+
+
+def _pages_pypdf(f):
+    """Extraction avec pypdf (successeur maintenu de PyPDF2)."""
+    import pypdf
+    reader = pypdf.PdfReader(f)
+    return len(reader.pages), (page.extract_text() for page in reader.pages)
+
+
+def _pages_pypdf2(f):
+    """Extraction avec PyPDF2 (moteur historique, solution de repli)."""
+    import PyPDF2
+    reader = PyPDF2.PdfReader(f)
+    return len(reader.pages), (page.extract_text() for page in reader.pages)
+
+
+# Moteurs disponibles : nom -> (modules possibles, fonction d'extraction)
+BACKENDS = {
+    "pymupdf": (("pymupdf", "fitz"), _pages_pymupdf),
+    "pypdf": (("pypdf",), _pages_pypdf),
+    "pypdf2": (("PyPDF2",), _pages_pypdf2),
+}
+
+# Ordre de préférence en mode "auto" (du plus rapide au plus lent, mesuré
+# avec scripts/bench_pdf_backends.py : pypdf est plus lent que PyPDF2 sur nos CV)
+BACKEND_PREFERENCE = ["pymupdf", "pypdf2", "pypdf"]
+
+
+def available_backends():
+    """
+    Liste les moteurs d'extraction installés, par ordre de préférence.
+
+    Returns:
+        Liste de noms de moteurs
+    """
+    return [
+        name for name in BACKEND_PREFERENCE
+        if any(importlib.util.find_spec(module) for module in BACKENDS[name][0])
+    ]
+
+
+def get_backend_name(backend=None):
+    """
+    Résout le nom du moteur à utiliser.
+
+    Args:
+        backend: Nom du moteur, "auto" ou None (= config PDF_BACKEND)
+
+    Returns:
+        Nom d'un moteur installé ("pypdf2" si le moteur demandé est absent)
+    """
+    backend = backend or PDF_BACKEND
+    if backend != "auto" and backend not in BACKENDS:
+        raise ValueError(f"Moteur PDF inconnu : {backend} (choix : auto, {', '.join(BACKENDS)})")
+
+    installed = available_backends()
+    if backend == "auto":
+        return installed[0] if installed else "pypdf2"
+    if backend not in installed:
+        logger.warning(f"Moteur PDF {backend} non installé, repli sur PyPDF2")
+        return "pypdf2"
+    return backend
+
+
+# =============================================================================
+# SOURCES
+# =============================================================================
+
+def _is_pdf_data(source):
+    """Indique si la source est le contenu du PDF plutôt qu'un chemin ou un fichier."""
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+
+def _open_pdf(source):
+    """
+    Ouvre la source en lecture binaire. Un fichier déjà ouvert n'est pas
+    refermé en sortie du bloc with.
+    """
+    if _is_pdf_data(source):
+        return io.BytesIO(source)
+    if hasattr(source, "read"):
+        return nullcontext(source)
+    return open(source, "rb")
+
+
+def _pdf_size(source):
+    """Taille de la source en octets (à partir de la position courante pour un fichier ouvert)."""
+    if _is_pdf_data(source):
+        return len(source)
+    if hasattr(source, "read"):
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END) - position
+        source.seek(position)
+        return size
+    return os.path.getsize(source)
+
+
+def _pdf_name(source):
+    """Nom de la source pour les messages du log."""
+    if _is_pdf_data(source):
+        return "<en mémoire>"
+    if hasattr(source, "read"):
+        return getattr(source, "name", "<en mémoire>")
+    return source
+
+
+def iter_pdf_pages(file_path, max_pages=PDF_MAX_PAGES, backend=None):
+    """
+    Itère sur le texte des pages d'un PDF, une page à la fois.
+    Les pages sans texte sont ignorées.
+
+    Args:
+        file_path: Chemin du fichier PDF, contenu du PDF (bytes) ou
+            fichier binaire ouvert
+        max_pages: Nombre maximum de pages lues (None = toutes)
+        backend: Moteur d'extraction (voir get_backend_name)
+
+    Yields:
+        Texte brut de chaque page
+    """
+    extract_pages = BACKENDS[get_backend_name(backend)][1]
+    with _open_pdf(file_path) as f:
+        page_count, pages = extract_pages(f)
+        if max_pages is not None and page_count > max_pages:
+            logger.warning(f"{_pdf_name(file_path)} : lecture limitée aux {max_pages} premières pages sur {page_count}")
+            pages = islice(pages, max_pages)
+        for content in pages:
+            if content:
+                yield content
+
+
+def read_pdf(file_path, max_pages=PDF_MAX_PAGES, max_bytes=PDF_MAX_BYTES, backend=None):
+    """
+    Extrait le texte brut d'un fichier PDF.
+
+    Args:
+        file_path: Chemin du fichier PDF, contenu du PDF (bytes) ou
+            fichier binaire ouvert
+        max_pages: Nombre maximum de pages lues (None = toutes).
+            max_pages=1 suffit pour extract_name.
+        max_bytes: Taille maximale du fichier en octets (None = pas de limite)
+        backend: Moteur d'extraction (voir get_backend_name)
+
+    Returns:
+        Texte brut (une ligne vide entre les pages) ou None si erreur
+    """
     try:
-        with open(file_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                content = page.extract_text()
-                if content:
-                    text += content + "\n"
-        return text
+        if max_bytes is not None and _pdf_size(file_path) > max_bytes:
+            logger.error(f"PDF ignoré, taille supérieure à {max_bytes} octets : {_pdf_name(file_path)}")
+            return None
+        return "".join(content + "\n" for content in iter_pdf_pages(file_path, max_pages, backend))
     except Exception as e:
-        print(f"Erreur lors de la lecture du PDF {file_path}: {e}")
-        return None
\ No newline at end of file
+        logger.error(f"Erreur lors de la lecture du PDF {_pdf_name(file_path)}: {e}")
+        return None
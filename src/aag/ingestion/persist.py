@@ -0,0 +1,102 @@
+"""
+Enregistrement des profils extraits : profil JSON, manifeste, store
+consolidé et base de recherche.
+Partagé par scripts/run_ingestion.py et l'analyse en tâche de fond des CV
+téléversés (background.IngestionJob), pour que les deux chemins produisent
+les mêmes fichiers.
+"""
+import os
+
+from .manifest import save_manifest
+from .text_cache import load_text
+from .text_cleaner import clean_text
+from aag.config import PROFILE_STORE_PATH, SEARCH_DB_PATH, TEXT_CACHE_DIR
+from aag.storage.profile_store import append_profiles
+from aag.storage.search_db import index_profiles, open_search_db
+from aag.utils.io import save_json
+
+
+def save_profile(profile, filename, output_dir):
+    """
+    Enregistre le profil JSON d'un CV, complété du nom du fichier source.
+
+    Args:
+        profile: Profil extrait (modifié en place)
+        filename: Nom du PDF source
+        output_dir: Dossier des profils JSON
+
+    Returns:
+        Nom du fichier JSON généré
+    """
+    profile["fichier_source"] = filename
+    json_filename = filename.replace(".pdf", ".json").replace(".PDF", ".json")
+    save_json(profile, json_filename, output_dir)
+    return json_filename
+
+
+def update_store(profiles, store_path=PROFILE_STORE_PATH):
+    """
+    Ajoute les profils au store consolidé, s'il a été créé.
+
+    Returns:
+        Nombre de profils ajoutés
+    """
+    if not profiles or not os.path.exists(store_path):
+        return 0
+    append_profiles(profiles, store_path)
+    return len(profiles)
+
+
+def update_search_index(profiles, hashes, db_path=SEARCH_DB_PATH, cache_dir=TEXT_CACHE_DIR, create=False):
+    """
+    Indexe les profils dans la base de recherche, en une transaction, si
+    elle existe (ou si create est vrai).
+    Le texte complet de chaque CV est relu dans le cache texte.
+
+    Args:
+        profiles: Liste des profils
+        hashes: Hash des PDF sources (même ordre que profiles)
+        db_path: Chemin de la base de recherche
+        cache_dir: Dossier du cache texte
+        create: Créer la base si elle n'existe pas
+
+    Returns:
+        Nombre de profils indexés
+    """
+    if not profiles or not (create or os.path.exists(db_path)):
+        return 0
+    items = []
+    for profile, content_hash in zip(profiles, hashes):
+        raw_text = load_text(content_hash, cache_dir)
+        items.append((profile, clean_text(raw_text) if raw_text is not None else None))
+    conn = open_search_db(db_path)
+    try:
+        return index_profiles(conn, items)
+    finally:
+        conn.close()
+
+
+def persist_profiles(manifest, manifest_path, profiles, hashes, store_path=PROFILE_STORE_PATH,
+                     search_db_path=SEARCH_DB_PATH, cache_dir=TEXT_CACHE_DIR, create_index=False):
+    """
+    Termine l'enregistrement d'un lot : sauvegarde le manifeste (où les
+    profils JSON ont été inscrits par record_entry) puis ajoute les
+    profils au store et à la base de recherche.
+
+    Args:
+        manifest: Manifeste à jour
+        manifest_path: Chemin du manifeste
+        profiles: Profils enregistrés par save_profile
+        hashes: Hash des PDF sources (même ordre que profiles)
+        store_path: Chemin du store consolidé (ignoré s'il n'existe pas)
+        search_db_path: Chemin de la base de recherche
+        cache_dir: Dossier du cache texte
+        create_index: Créer la base de recherche si elle n'existe pas
+
+    Returns:
+        Tuple (ajoutés au store, indexés pour la recherche)
+    """
+    save_manifest(manifest, manifest_path)
+    stored = update_store(profiles, store_path)
+    indexed = update_search_index(profiles, hashes, search_db_path, cache_dir, create_index)
+    return stored, indexed
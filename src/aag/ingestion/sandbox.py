@@ -0,0 +1,143 @@
+"""
+Lecture isolée des PDF pathologiques.
+Chaque PDF est lu dans un processus dédié, tué s'il dépasse un temps ou une
+mémoire maximale. Les fichiers en cause sont mis en quarantaine avec la raison,
+sans interrompre le reste du lot.
+"""
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime
+
+from .pdf_reader import read_pdf
+
+
+# Intervalle de surveillance du processus de lecture (secondes)
+POLL_INTERVAL = 0.05
+
+
+def get_process_context():
+    """
+    Contexte multiprocessing utilisé pour les processus de lecture (ici et
+    dans background.IngestionJob).
+    "forkserver" crée chaque processus à partir d'un serveur propre (sans les
+    threads du parent) tout en évitant de réimporter PyPDF2 à chaque PDF.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(["aag.ingestion.pdf_reader"])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def _read_pdf_child(conn, pdf_path, backend):
+    """Point d'entrée du processus de lecture : renvoie le texte au parent."""
+    conn.send(read_pdf(pdf_path, backend=backend))
+    conn.close()
+
+
+def _rss_mb(pid):
+    """
+    Mémoire résidente (RSS) d'un processus en Mo, lue dans /proc.
+
+    Returns:
+        RSS en Mo, ou None si /proc n'est pas disponible (hors Linux)
+    """
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def read_pdf_isolated(pdf_path, timeout, max_rss_mb, backend=None):
+    """
+    Lit un PDF dans un processus dédié, tué en cas de dépassement.
+
+    Args:
+        pdf_path: Chemin du fichier PDF
+        timeout: Durée maximale de lecture (secondes)
+        max_rss_mb: Mémoire résidente maximale (Mo) ; seule la limite de
+            temps s'applique sur les systèmes sans /proc
+        backend: Moteur d'extraction PDF (voir pdf_reader.get_backend_name)
+
+    Returns:
+        Tuple (texte, raison_quarantaine)
+        - texte: Texte brut, ou None si illisible / interrompu
+        - raison_quarantaine: None si aucune limite n'a été dépassée
+    """
+    ctx = get_process_context()
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_read_pdf_child, args=(child_conn, pdf_path, backend), daemon=True)
+    process.start()
+    child_conn.close()
+
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            if parent_conn.poll(POLL_INTERVAL):
+                try:
+                    return parent_conn.recv(), None
+                except EOFError:
+                    process.join()
+                    return None, f"processus interrompu (code {process.exitcode})"
+
+            if time.monotonic() > deadline:
+                return None, f"délai dépassé ({timeout} s)"
+
+            rss = _rss_mb(process.pid)
+            if rss is not None and rss > max_rss_mb:
+                return None, f"mémoire dépassée ({rss:.0f} Mo > {max_rss_mb} Mo)"
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        parent_conn.close()
+
+
+def load_quarantine(path):
+    """
+    Charge la liste de quarantaine.
+
+    Returns:
+        Dictionnaire {nom_pdf: {"hash", "raison", "date"}}
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_quarantine(quarantine, path):
+    """
+    Sauvegarde la liste de quarantaine de façon atomique (fichier temporaire
+    + renommage, comme manifest.save_manifest) : une ingestion interrompue ne
+    laisse jamais une liste tronquée, illisible au lancement suivant.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(quarantine, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def add_to_quarantine(quarantine, filename, reason, content_hash=None):
+    """
+    Ajoute (ou met à jour) un fichier dans la liste de quarantaine.
+
+    Args:
+        quarantine: Liste chargée par load_quarantine
+        filename: Nom du PDF
+        reason: Limite dépassée
+        content_hash: Hash du PDF ; un fichier modifié depuis sa mise en
+            quarantaine est retenté automatiquement
+    """
+    quarantine[filename] = {
+        "hash": content_hash,
+        "raison": reason,
+        "date": datetime.now().isoformat(timespec="seconds"),
+    }
@@ -0,0 +1,61 @@
+"""
+Cache du texte brut extrait des PDF.
+Le texte complet de chaque CV est conservé compressé, indexé par le hash du
+PDF source, pour pouvoir relancer l'extraction sans relire les PDF.
+"""
+import gzip
+import os
+
+
+def cache_path(content_hash, cache_dir):
+    """
+    Chemin du fichier de cache pour un hash donné.
+    Les fichiers sont répartis en sous-dossiers (2 premiers caractères du hash)
+    pour éviter des dossiers à plusieurs dizaines de milliers d'entrées.
+
+    Args:
+        content_hash: Hash SHA-256 du PDF source
+        cache_dir: Dossier racine du cache
+
+    Returns:
+        Chemin du fichier .txt.gz
+    """
+    return os.path.join(cache_dir, content_hash[:2], content_hash + ".txt.gz")
+
+
+def save_text(content_hash, text, cache_dir):
+    """
+    Sauvegarde le texte brut compressé dans le cache.
+
+    Args:
+        content_hash: Hash SHA-256 du PDF source
+        text: Texte brut extrait du PDF
+        cache_dir: Dossier racine du cache
+    """
+    path = cache_path(content_hash, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Écriture dans un fichier temporaire puis renommage : plusieurs workers
+    # peuvent écrire le même hash (doublons) sans jamais laisser un .gz tronqué
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def load_text(content_hash, cache_dir):
+    """
+    Charge le texte brut d'un PDF depuis le cache.
+
+    Args:
+        content_hash: Hash SHA-256 du PDF source
+        cache_dir: Dossier racine du cache
+
+    Returns:
+        Texte brut, ou None s'il n'est pas en cache
+    """
+    path = cache_path(content_hash, cache_dir)
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return f.read()
@@ -2,7 +2,6 @@
 Module de nettoyage de texte pour les CV.
 Transforme le texte brut en texte propre pour l'analyse.
 """
-import re
 
 
 def clean_text(text):
@@ -18,13 +17,7 @@ def clean_text(text):
     if not text:
         return ""
 
-    # Tout en minuscules
-    text = text.lower()
-
-    # Remplace les retours à la ligne par des espaces
-    text = text.replace('\n', ' ')
-
-    # Supprime les doubles espaces et plus
-    text = re.sub(r'\s+', ' ', text)
-
-    return text.strip()
+    # Tout en minuscules, retours à la ligne et espaces multiples réduits
+    # à un seul espace : str.split() découpe sur les mêmes blancs que \s
+    # et évite le passage par le moteur d'expressions régulières
+    return ' '.join(text.lower().split())
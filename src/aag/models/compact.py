@@ -0,0 +1,188 @@
+"""
+Modeles de donnees compacts pour de grands volumes de profils et de missions.
+Les competences sont stockees en masque de bits (une categorie de SKILLS_DB
+par bit) et les villes en identifiants partages (voir vocab), dans des
+classes a __slots__.
+"""
+from .vocab import COMPETENCES, city_name, intern_city
+
+_COMPETENCE_BITS = {comp: 1 << i for i, comp in enumerate(COMPETENCES)}
+
+
+def competences_to_mask(competences):
+    """
+    Convertit une liste de competences en masque de bits.
+
+    Returns:
+        Tuple (masque, exact) ; exact vaut False si la liste ne peut pas etre
+        reconstruite depuis le masque (competence hors SKILLS_DB, doublon
+        ou ordre different de SKILLS_DB)
+    """
+    mask = 0
+    for comp in competences:
+        mask |= _COMPETENCE_BITS.get(comp, 0)
+    return mask, list(competences) == mask_to_competences(mask)
+
+
+def mask_to_competences(mask):
+    """Liste des competences d'un masque, dans l'ordre de SKILLS_DB."""
+    return [comp for comp in COMPETENCES if mask & _COMPETENCE_BITS[comp]]
+
+
+class CompactProfil:
+    """
+    Profil Gomecanicien compact : competences en masque de bits, ville en
+    identifiant interne.
+
+    Les listes de competences qui ne se deduisent pas du masque (competence
+    inconnue, ordre different) et les champs supplementaires du JSON
+    (texte_source, ...) sont conserves a part : pour un profil JSON
+    d'ingestion, to_dict(from_dict(d)) == d.
+    """
+
+    __slots__ = (
+        "nom", "ville_id", "competences_mask", "experience_annees",
+        "fichier_source", "ville_confiance", "_competences", "_autres"
+    )
+
+    def __init__(self, nom, ville, competences=None, experience_annees=0,
+                 fichier_source=None, ville_confiance=None, autres=None):
+        self.nom = nom
+        self.ville_id = intern_city(ville)
+        mask, exact = competences_to_mask(competences or [])
+        self.competences_mask = mask
+        # Liste d'origine, seulement si le masque ne suffit pas
+        self._competences = None if exact else tuple(competences)
+        self.experience_annees = experience_annees
+        # None = champ absent du JSON d'origine
+        self.fichier_source = fichier_source
+        self.ville_confiance = ville_confiance
+        self._autres = autres or None
+
+    @property
+    def ville(self):
+        return city_name(self.ville_id)
+
+    @property
+    def competences(self):
+        if self._competences is not None:
+            return list(self._competences)
+        return mask_to_competences(self.competences_mask)
+
+    @property
+    def mask_exact(self):
+        """True si la liste des competences se deduit du masque."""
+        return self._competences is None
+
+    def has_competence(self, competence):
+        """Verifie si le profil possede une competence donnee."""
+        bit = _COMPETENCE_BITS.get(competence)
+        if bit is not None and self.competences_mask & bit:
+            return True
+        return self._competences is not None and competence in self._competences
+
+    def to_dict(self):
+        """Convertit le profil en dictionnaire (compatible JSON)."""
+        data = {
+            "nom": self.nom,
+            "ville": self.ville,
+            "competences": self.competences,
+            "experience_annees": self.experience_annees,
+        }
+        if self.fichier_source is not None:
+            data["fichier_source"] = self.fichier_source
+        if self.ville_confiance is not None:
+            data["ville_confiance"] = self.ville_confiance
+        if self._autres:
+            data.update(self._autres)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Cree un CompactProfil a partir d'un dictionnaire JSON."""
+        core = ("nom", "ville", "competences", "experience_annees", "fichier_source", "ville_confiance")
+        return cls(
+            nom=data.get("nom", "Inconnu"),
+            ville=data.get("ville", "Inconnue"),
+            competences=data.get("competences", []),
+            experience_annees=data.get("experience_annees", 0),
+            fichier_source=data.get("fichier_source"),
+            ville_confiance=data.get("ville_confiance"),
+            autres={key: value for key, value in data.items() if key not in core}
+        )
+
+    def __repr__(self):
+        return f"CompactProfil({self.nom}, {self.ville}, {self.experience_annees}ans, {self.competences})"
+
+
+class CompactBesoin:
+    """
+    Besoin operationnel compact : ville cible en identifiant interne,
+    competence requise aussi disponible en masque de bits.
+    """
+
+    __slots__ = (
+        "id_mission", "ville_id", "competence_requise", "experience_min",
+        "poids_ville", "poids_competence", "poids_experience", "_autres"
+    )
+
+    def __init__(self, id_mission, ville_cible, competence_requise,
+                 experience_min=0, poids_ville=50, poids_competence=30,
+                 poids_experience=20, autres=None):
+        self.id_mission = id_mission
+        self.ville_id = intern_city(ville_cible)
+        self.competence_requise = competence_requise
+        self.experience_min = experience_min
+        self.poids_ville = poids_ville
+        self.poids_competence = poids_competence
+        self.poids_experience = poids_experience
+        self._autres = autres or None
+
+    @property
+    def ville_cible(self):
+        return city_name(self.ville_id)
+
+    @property
+    def competence_mask(self):
+        """Bit de la competence requise (0 si hors SKILLS_DB)."""
+        return _COMPETENCE_BITS.get(self.competence_requise, 0)
+
+    def to_dict(self):
+        """Convertit le besoin en dictionnaire (compatible JSON)."""
+        data = {
+            "id_mission": self.id_mission,
+            "ville_cible": self.ville_cible,
+            "competence_requise": self.competence_requise,
+            "experience_min": self.experience_min,
+            "poids_ville": self.poids_ville,
+            "poids_competence": self.poids_competence,
+            "poids_experience": self.poids_experience
+        }
+        if self._autres:
+            data.update(self._autres)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Cree un CompactBesoin a partir d'un dictionnaire JSON."""
+        core = (
+            "id_mission", "ville_cible", "competence_requise", "experience_min",
+            "poids_ville", "poids_competence", "poids_experience"
+        )
+        return cls(
+            id_mission=data.get("id_mission", ""),
+            ville_cible=data.get("ville_cible", ""),
+            competence_requise=data.get("competence_requise", ""),
+            experience_min=data.get("experience_min", 0),
+            poids_ville=data.get("poids_ville", 50),
+            poids_competence=data.get("poids_competence", 30),
+            poids_experience=data.get("poids_experience", 20),
+            autres={key: value for key, value in data.items() if key not in core}
+        )
+
+    def total_poids(self):
+        """Verifie que le total des poids fait 100."""
+        return self.poids_ville + self.poids_competence + self.poids_experience
+
+    def __repr__(self):
+        return f"CompactBesoin({self.id_mission}, {self.ville_cible}, {self.competence_requise})"
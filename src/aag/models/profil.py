@@ -3,6 +3,14 @@ Modele de donnees pour un profil Gomecanicien.
 """
 
 
+def profile_key(profil):
+    """
+    Identifiant d'un profil (dictionnaire JSON) : son fichier source, a
+    defaut son nom. Deux versions d'un meme CV ont le meme identifiant.
+    """
+    return profil.get("fichier_source") or profil.get("nom", "")
+
+
 class Profil:
     """Represente un mecanicien candidat extrait d'un CV."""
 
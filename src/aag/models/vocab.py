@@ -0,0 +1,80 @@
+"""
+Vocabulaire partage par l'extraction, les modeles et le scoring.
+Module sans dependance : les regles metier et les modeles compacts
+l'importent sans charger la chaine d'ingestion des PDF.
+"""
+import threading
+
+# Categories de competences et leurs mots-cles associes
+# (a enrichir par les etudiants ; l'ordre des categories est celui des
+# competences extraites et des bits des masques de competences)
+SKILLS_DB = {
+    "moteur": ["moteur", "distribution", "culasse", "embrayage", "vidange", "courroie"],
+    "freinage": ["frein", "freinage", "disque", "plaquette", "abs", "étrier"],
+    "electrique": ["électrique", "electrique", "batterie", "alternateur", "démarreur",
+                   "hybride", "diagnostic", "valise", "injection"],
+    "pneus": ["pneu", "pneumatique", "parallélisme", "équilibrage", "géométrie"],
+    "climatisation": ["climatisation", "clim", "recharge"],
+    "carrosserie": ["carrosserie", "peinture", "débosselage"],
+    "vul": ["vul", "utilitaire", "véhicule utilitaire", "flotte"]
+}
+
+# Categories de competences, dans l'ordre des bits du masque
+COMPETENCES = list(SKILLS_DB)
+
+
+# Villes internees : un identifiant entier par nom (sensible a la casse),
+# et pour chacun l'identifiant du nom en minuscules.
+# Les identifiants restent valides tant que le processus vit : rien n'est
+# jamais retire. Les villes des profils viennent de l'extraction (villes
+# cibles, noms du referentiel des communes, "Inconnue"), soit au plus
+# quelques dizaines de milliers de noms et leur forme en minuscules ;
+# MAX_VILLES borne la table face a des noms arbitraires (besoins saisis,
+# profils importes d'ailleurs).
+MAX_VILLES = 200000
+_CITY_IDS = {}
+_CITY_NAMES = []
+_CITY_KEYS = []
+# Partagee par les threads du service et des sessions de l'application
+_CITY_LOCK = threading.Lock()
+
+
+def intern_city(ville):
+    """
+    Identifiant partage d'une ville (cree au premier appel).
+
+    Raises:
+        ValueError: Plus de MAX_VILLES noms distincts
+    """
+    city_id = _CITY_IDS.get(ville)
+    if city_id is None:
+        with _CITY_LOCK:
+            city_id = _intern_city_locked(ville)
+    return city_id
+
+
+def _intern_city_locked(ville):
+    """intern_city, appele sous _CITY_LOCK."""
+    city_id = _CITY_IDS.get(ville)
+    if city_id is not None:
+        return city_id
+    lower = ville.lower()
+    key = _intern_city_locked(lower) if lower != ville else None
+    if len(_CITY_NAMES) >= MAX_VILLES:
+        raise ValueError(f"Plus de {MAX_VILLES} villes distinctes : {ville}")
+    city_id = len(_CITY_NAMES)
+    _CITY_NAMES.append(ville)
+    _CITY_KEYS.append(city_id if key is None else key)
+    # Publie en dernier : un identifiant lu sans verrou est deja complet
+    _CITY_IDS[ville] = city_id
+    return city_id
+
+
+def city_name(city_id):
+    """Nom d'une ville a partir de son identifiant."""
+    return _CITY_NAMES[city_id]
+
+
+def city_key(city_id):
+    """Identifiant du nom en minuscules (comparaison insensible a la casse)."""
+    return _CITY_KEYS[city_id]
@@ -1,3 +1,8 @@
 # Module scoring - Logique de matching et calcul de score
-from .scorer import calculate_match, rank_candidates
-from .rules import get_experience_category, get_bonus_competences
+from .scorer import (
+    calculate_match, explain, explain_result, rank_candidates, rank_missions, rank_page, score_compact_profile,
+    score_profile
+)
+from .rules import get_experience_category, get_bonus_competences, get_bonus_total, get_compiled_rules
+from .vectorized import ProfileTable
+from .index import ProfileIndex
@@ -0,0 +1,169 @@
+"""
+Index inversé des profils par ville et par compétences.
+Les requêtes top-k visitent d'abord les villes et les groupes de profils au
+meilleur score possible et s'arrêtent dès qu'aucun profil restant ne peut
+entrer dans le classement, sans évaluer tous les profils.
+"""
+import heapq
+
+from .rules import get_compiled_rules
+from .scorer import score_profile
+
+
+class ProfileIndex:
+    """
+    Profils regroupés par ville normalisée, puis par ensemble de compétences.
+
+    Borne d'une ville : terme de ville + poids_competence + poids_experience
+    + plus gros bonus de la ville. Elle ne dépend que des poids du besoin, et
+    l'ordre des villes hors cible et hors zone prioritaire (par bonus
+    maximal décroissant) est calculé une fois pour toutes.
+
+    Dans une ville, les profils d'un groupe ne diffèrent que par
+    l'expérience, et le score croît avec elle : les profils sont rangés par
+    expérience décroissante et le score du premier est la borne exacte du
+    groupe.
+
+    Les bornes supposent des poids positifs ou nuls ; sinon tous les
+    profils sont évalués.
+
+    L'index se comporte comme une séquence des profils d'origine : il peut
+    être passé à rank_candidates à la place de la liste.
+    """
+
+    def __init__(self, profils):
+        """
+        Args:
+            profils: Liste de dictionnaires profils (format JSON d'ingestion)
+        """
+        self.profils = list(profils)
+        self._build()
+
+    def _build(self):
+        """Construit l'index avec les règles métier en vigueur."""
+        self._rules = get_compiled_rules()
+        cities = {}
+        for index, profil in enumerate(self.profils):
+            competences = profil.get("competences", [])
+            # Le bonus fait partie de la clé : il compte les doublons éventuels
+            key = (frozenset(competences), self._rules.bonus_total(competences))
+            city = profil.get("ville", "Inconnue").lower()
+            cities.setdefault(city, {}).setdefault(key, []).append(index)
+
+        # Index inversé : ville normalisée -> groupes de positions, par
+        # expérience décroissante (tri stable : à expérience égale, ordre
+        # de la liste d'origine)
+        self.by_city = {}
+        # Plus gros bonus de compétences de chaque ville
+        self.max_bonus = {}
+        for city, groups in cities.items():
+            for indices in groups.values():
+                indices.sort(key=lambda i: -self.profils[i].get("experience_annees", 0))
+            self.by_city[city] = list(groups.values())
+            self.max_bonus[city] = max(bonus for _, bonus in groups)
+
+        cities_by_bonus = sorted(self.by_city, key=lambda city: -self.max_bonus[city])
+        priority_cities = self._rules.priority_cities
+        self._priority_cities = [city for city in cities_by_bonus if city in priority_cities]
+        self._other_cities = [city for city in cities_by_bonus if city not in priority_cities]
+
+    def __len__(self):
+        return len(self.profils)
+
+    def __getitem__(self, index):
+        return self.profils[index]
+
+    def __iter__(self):
+        return iter(self.profils)
+
+    def _city_bounds(self, besoin):
+        """
+        Villes et leur borne de score, de la meilleure à la moins bonne.
+        Les villes ordinaires ne sont parcourues qu'au fur et à mesure.
+
+        Yields:
+            Tuples (borne, ville)
+        """
+        target = besoin.get("ville_cible", "").lower()
+        poids_ville = besoin.get("poids_ville", 50)
+        poids_competence = besoin.get("poids_competence", 30)
+        poids_experience = besoin.get("poids_experience", 20)
+
+        def bound(city, city_term):
+            # Termes maximaux, additionnés dans le même ordre que score_profile
+            # pour que la borne ne soit jamais inférieure à un score réel
+            return round(0 + city_term + poids_competence + poids_experience + self.max_bonus[city], 1)
+
+        def bounds(cities, city_term):
+            for city in cities:
+                if city != target:
+                    yield bound(city, city_term), city
+
+        streams = [
+            bounds(self._priority_cities, poids_ville * 0.5),
+            bounds(self._other_cities, 0),
+        ]
+        if target in self.by_city:
+            streams.append(iter([(bound(target, poids_ville), target)]))
+        yield from heapq.merge(*streams, key=lambda city_bound: -city_bound[0])
+
+    def search(self, besoin, top_k):
+        """
+        Recherche les top_k meilleurs profils pour un besoin.
+
+        Villes puis groupes sont visités par borne décroissante. La recherche
+        s'arrête dès qu'une borne est strictement inférieure au k-ième score :
+        à égalité, un profil placé plus tôt dans la liste d'origine pourrait
+        encore entrer dans le classement.
+
+        Args:
+            besoin: Dictionnaire (ou objet Besoin) du besoin opérationnel
+            top_k: Nombre de profils à retourner
+
+        Returns:
+            Liste de tuples (position, score, raisons) par score décroissant,
+            à score égal dans l'ordre de la liste d'origine (même classement
+            que rank_candidates)
+        """
+        if hasattr(besoin, "to_dict"):
+            besoin = besoin.to_dict()
+        if top_k <= 0:
+            return []
+        rules = get_compiled_rules()
+        if rules is not self._rules:
+            # Bonus et villes prioritaires ont changé : bornes à recalculer
+            self._build()
+        prune = min(
+            besoin.get("poids_ville", 50),
+            besoin.get("poids_competence", 30),
+            besoin.get("poids_experience", 20),
+        ) >= 0
+
+        # Tas des top_k meilleurs (score, -position, raisons)
+        heap = []
+        for city_bound, city in self._city_bounds(besoin):
+            if prune and len(heap) == top_k and city_bound < heap[0][0]:
+                break
+            groups = sorted(
+                ((score_profile(self.profils[indices[0]], besoin, rules)[0], indices)
+                 for indices in self.by_city[city]),
+                key=lambda group: group[0], reverse=True
+            )
+            for bound, indices in groups:
+                if prune and len(heap) == top_k and bound < heap[0][0]:
+                    break
+                for index in indices:
+                    score, raisons = score_profile(self.profils[index], besoin, rules)
+                    entry = (score, -index, raisons)
+                    if len(heap) < top_k:
+                        heapq.heappush(heap, entry)
+                    elif entry[:2] > heap[0][:2]:
+                        heapq.heapreplace(heap, entry)
+                    elif prune and score < heap[0][0]:
+                        # Les profils suivants du groupe ont moins d'expérience
+                        break
+
+        return [
+            (-neg_index, score, raisons)
+            for score, neg_index, raisons in sorted(heap, key=lambda e: e[:2], reverse=True)
+        ]
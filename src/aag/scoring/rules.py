@@ -2,6 +2,7 @@
 Règles métier pour le scoring des Gomécaniciens.
 Ces règles peuvent être enrichies par l'équipe selon les besoins de Gomécano.
 """
+from types import MappingProxyType
 
 # Bonus spéciaux pour certaines compétences stratégiques
 BONUS_COMPETENCES = {
@@ -66,6 +67,23 @@ def get_bonus_competences(competences):
     return bonus_total, bonus_details
 
 
+def get_bonus_total(competences):
+    """
+    Bonus total pour les compétences stratégiques, sans le détail.
+    Même total que get_bonus_competences.
+
+    Args:
+        competences: Liste des compétences du profil
+
+    Returns:
+        Bonus total
+    """
+    bonus_total = 0
+    for comp in competences:
+        bonus_total += BONUS_COMPETENCES.get(comp, 0)
+    return bonus_total
+
+
 def is_priority_city(ville):
     """
     Vérifie si la ville est dans la zone prioritaire.
@@ -77,3 +95,77 @@ def is_priority_city(ville):
         Boolean
     """
     return ville.lower() in VILLES_PRIORITAIRES
+
+
+# =============================================================================
+# COMPILATION DES RÈGLES
+# =============================================================================
+
+class CompiledRules:
+    """
+    Tables de règles précompilées, calculées en entier à la construction
+    puis jamais modifiées : un même objet est partagé sans verrou par tous
+    les threads (service HTTP, sessions de l'application).
+    - priority_cities: ensemble des villes prioritaires
+    - bonus_by_competence: copie en lecture seule de BONUS_COMPETENCES
+    - category_by_year: catégorie d'expérience pour 0, 1, ... années ;
+      au-delà de la dernière entrée, la catégorie ne change plus
+
+    Ne pas construire directement : voir get_compiled_rules.
+    """
+
+    __slots__ = ("fingerprint", "priority_cities", "bonus_by_competence", "category_by_year")
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.priority_cities = frozenset(VILLES_PRIORITAIRES)
+        self.bonus_by_competence = MappingProxyType(dict(BONUS_COMPETENCES))
+
+        last_year = max(max(SEUILS_EXPERIENCE.values()), 0) + 1
+        self.category_by_year = tuple(get_experience_category(year) for year in range(last_year + 1))
+
+    def is_priority_city(self, ville):
+        """Même résultat que is_priority_city(ville)."""
+        return ville.lower() in self.priority_cities
+
+    def bonus_total(self, competences):
+        """Même résultat que get_bonus_total(competences)."""
+        bonus_by_competence = self.bonus_by_competence
+        bonus_total = 0
+        for comp in competences:
+            bonus_total += bonus_by_competence.get(comp, 0)
+        return bonus_total
+
+    def experience_category(self, years):
+        """Même résultat que get_experience_category(years)."""
+        if type(years) is int and years >= 0:
+            return self.category_by_year[min(years, len(self.category_by_year) - 1)]
+        return get_experience_category(years)
+
+
+_COMPILED_RULES = None
+
+
+def rules_fingerprint():
+    """Empreinte des tables de règles (change dès qu'une table est modifiée)."""
+    return (
+        tuple(BONUS_COMPETENCES.items()),
+        tuple(SEUILS_EXPERIENCE.items()),
+        tuple(VILLES_PRIORITAIRES)
+    )
+
+
+def get_compiled_rules():
+    """
+    Retourne les règles compilées, recompilées si BONUS_COMPETENCES,
+    SEUILS_EXPERIENCE ou VILLES_PRIORITAIRES ont changé depuis.
+    À appeler une fois par lot de profils plutôt qu'à chaque profil.
+
+    Returns:
+        Objet CompiledRules
+    """
+    global _COMPILED_RULES
+    fingerprint = rules_fingerprint()
+    if _COMPILED_RULES is None or _COMPILED_RULES.fingerprint != fingerprint:
+        _COMPILED_RULES = CompiledRules(fingerprint)
+    return _COMPILED_RULES
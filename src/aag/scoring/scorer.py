@@ -1,25 +1,53 @@
 """
 Moteur de scoring pour le matching Gomécanicien / Mission.
 Calcule un score de compatibilité et génère une justification lisible.
+
+Le calcul est séparé en deux étapes : score_profile (score et codes de
+raison, sans texte) puis explain (justifications), appelée seulement pour
+les candidats affichés.
 """
-from .rules import get_experience_category, get_bonus_competences, is_priority_city
+import heapq
 
+from aag.models.vocab import city_key
+from .rules import get_bonus_competences, get_compiled_rules
+from .vectorized import ProfileTable
 
-def calculate_match(profil, besoin):
+# Codes de raison retournés par score_profile, un par critère.
+# Ils suffisent à explain() pour reconstruire les justifications.
+VILLE_PARFAITE = "ville_parfaite"
+VILLE_PRIORITAIRE = "ville_prioritaire"
+VILLE_HORS_ZONE = "ville_hors_zone"
+COMPETENCE_REQUISE = "competence_requise"
+COMPETENCE_AUTRES = "competence_autres"
+COMPETENCE_ABSENTE = "competence_absente"
+EXPERIENCE_CONFIRMEE = "experience_confirmee"
+EXPERIENCE_PARTIELLE = "experience_partielle"
+EXPERIENCE_ABSENTE = "experience_absente"
+BONUS_APPLIQUE = "bonus_applique"
+
+
+def score_profile(profil, besoin, rules=None):
     """
-    Calcule le score de compatibilité entre un profil et un besoin.
+    Calcule le score de compatibilité sans générer de texte.
+
+    Chemin rapide du scoring : aucune chaîne n'est formatée. Les
+    justifications lisibles sont produites à la demande par explain().
 
     Args:
         profil: Dictionnaire du profil Gomécanicien (extrait du JSON)
         besoin: Dictionnaire du besoin opérationnel
+        rules: Règles compilées (get_compiled_rules() par défaut) ; pour un
+            lot de profils, les obtenir une fois et les passer à chaque appel
 
     Returns:
-        Tuple (score, liste_justifications)
+        Tuple (score, raisons)
         - score: Note sur 100 (peut dépasser 100 avec les bonus)
-        - justifications: Liste de strings expliquant le score
+        - raisons: Tuple (ville, competence, experience, bonus) de codes de
+          raison ; bonus vaut None si aucun bonus n'est appliqué
     """
+    if rules is None:
+        rules = get_compiled_rules()
     score = 0
-    justifications = []
 
     # Récupération des données du profil
     ville_profil = profil.get("ville", "Inconnue")
@@ -41,82 +69,351 @@ def calculate_match(profil, besoin):
     # =========================================================================
     if ville_profil.lower() == ville_cible.lower():
         score += poids_ville
-        justifications.append(f"Localisation parfaite ({ville_profil})")
-    elif is_priority_city(ville_profil):
+        raison_ville = VILLE_PARFAITE
+    elif rules.is_priority_city(ville_profil):
         # Bonus partiel si dans une ville prioritaire proche
         score += poids_ville * 0.5
-        justifications.append(f"Zone PACA ({ville_profil})")
+        raison_ville = VILLE_PRIORITAIRE
     else:
-        justifications.append(f"Hors zone cible ({ville_profil})")
+        raison_ville = VILLE_HORS_ZONE
 
     # =========================================================================
     # 2. CRITÈRE COMPÉTENCE TECHNIQUE
     # =========================================================================
     if competence_requise in competences:
         score += poids_competence
-        justifications.append(f"Expert en {competence_requise}")
+        raison_competence = COMPETENCE_REQUISE
+    elif competences:
+        # Autres compétences pertinentes
+        score += poids_competence * 0.3
+        raison_competence = COMPETENCE_AUTRES
     else:
-        # Vérifier si d'autres compétences pertinentes
-        if competences:
-            score += poids_competence * 0.3
-            justifications.append(f"Autres compétences: {', '.join(competences[:2])}")
-        else:
-            justifications.append(f"Compétence {competence_requise} non validée")
+        raison_competence = COMPETENCE_ABSENTE
 
     # =========================================================================
     # 3. CRITÈRE EXPÉRIENCE
     # =========================================================================
-    category = get_experience_category(experience)
-
     if experience >= experience_min:
         score += poids_experience
-        justifications.append(f"Expérience confirmée ({experience} ans - {category})")
+        raison_experience = EXPERIENCE_CONFIRMEE
     elif experience > 0:
         # Score proportionnel à l'expérience
         ratio = experience / experience_min
         score += poids_experience * ratio
-        justifications.append(f"Profil {category} ({experience} ans)")
+        raison_experience = EXPERIENCE_PARTIELLE
     else:
-        justifications.append("Expérience non renseignée")
+        raison_experience = EXPERIENCE_ABSENTE
 
     # =========================================================================
     # 4. BONUS STRATÉGIQUES (VUL, Électrique, etc.)
     # =========================================================================
-    bonus, bonus_details = get_bonus_competences(competences)
+    bonus = rules.bonus_total(competences)
+    if bonus > 0:
+        score += bonus
+        raison_bonus = BONUS_APPLIQUE
+    else:
+        raison_bonus = None
+
+    return round(score, 1), (raison_ville, raison_competence, raison_experience, raison_bonus)
+
+
+def score_compact_profile(profil, besoin, rules=None):
+    """
+    Équivalent de score_profile pour les modèles compacts (villes comparées
+    par identifiant, compétence requise testée sur le masque).
+
+    Args:
+        profil: CompactProfil
+        besoin: CompactBesoin
+        rules: Règles compilées (get_compiled_rules() par défaut) ; pour un
+            lot de profils, les obtenir une fois et les passer à chaque appel
+
+    Returns:
+        Tuple (score, raisons), identique à
+        score_profile(profil.to_dict(), besoin.to_dict())
+    """
+    if rules is None:
+        rules = get_compiled_rules()
+    score = 0
+    experience = profil.experience_annees
+    experience_min = besoin.experience_min
+    poids_ville = besoin.poids_ville
+    poids_competence = besoin.poids_competence
+    poids_experience = besoin.poids_experience
+
+    # Mêmes critères, dans le même ordre d'addition que score_profile
+    if city_key(profil.ville_id) == city_key(besoin.ville_id):
+        score += poids_ville
+        raison_ville = VILLE_PARFAITE
+    elif rules.is_priority_city(profil.ville):
+        score += poids_ville * 0.5
+        raison_ville = VILLE_PRIORITAIRE
+    else:
+        raison_ville = VILLE_HORS_ZONE
+
+    if profil.has_competence(besoin.competence_requise):
+        score += poids_competence
+        raison_competence = COMPETENCE_REQUISE
+    elif profil.competences_mask or not profil.mask_exact and profil.competences:
+        score += poids_competence * 0.3
+        raison_competence = COMPETENCE_AUTRES
+    else:
+        raison_competence = COMPETENCE_ABSENTE
+
+    if experience >= experience_min:
+        score += poids_experience
+        raison_experience = EXPERIENCE_CONFIRMEE
+    elif experience > 0:
+        ratio = experience / experience_min
+        score += poids_experience * ratio
+        raison_experience = EXPERIENCE_PARTIELLE
+    else:
+        raison_experience = EXPERIENCE_ABSENTE
+
+    bonus = rules.bonus_total(profil.competences)
     if bonus > 0:
         score += bonus
+        raison_bonus = BONUS_APPLIQUE
+    else:
+        raison_bonus = None
+
+    return round(score, 1), (raison_ville, raison_competence, raison_experience, raison_bonus)
+
+
+def explain(profil, besoin, raisons=None, rules=None):
+    """
+    Génère les justifications lisibles d'un score.
+
+    Args:
+        profil: Dictionnaire du profil Gomécanicien
+        besoin: Dictionnaire du besoin opérationnel
+        raisons: Codes retournés par score_profile (recalculés si None)
+        rules: Règles compilées (get_compiled_rules() par défaut)
+
+    Returns:
+        Liste de strings expliquant le score (identique à calculate_match)
+    """
+    if rules is None:
+        rules = get_compiled_rules()
+    if raisons is None:
+        raisons = score_profile(profil, besoin, rules)[1]
+    raison_ville, raison_competence, raison_experience, raison_bonus = raisons
+
+    ville_profil = profil.get("ville", "Inconnue")
+    competences = profil.get("competences", [])
+    experience = profil.get("experience_annees", 0)
+    competence_requise = besoin.get("competence_requise", "")
+
+    justifications = []
+
+    if raison_ville == VILLE_PARFAITE:
+        justifications.append(f"Localisation parfaite ({ville_profil})")
+    elif raison_ville == VILLE_PRIORITAIRE:
+        justifications.append(f"Zone PACA ({ville_profil})")
+    else:
+        justifications.append(f"Hors zone cible ({ville_profil})")
+
+    if raison_competence == COMPETENCE_REQUISE:
+        justifications.append(f"Expert en {competence_requise}")
+    elif raison_competence == COMPETENCE_AUTRES:
+        justifications.append(f"Autres compétences: {', '.join(competences[:2])}")
+    else:
+        justifications.append(f"Compétence {competence_requise} non validée")
+
+    category = rules.experience_category(experience)
+    if raison_experience == EXPERIENCE_CONFIRMEE:
+        justifications.append(f"Expérience confirmée ({experience} ans - {category})")
+    elif raison_experience == EXPERIENCE_PARTIELLE:
+        justifications.append(f"Profil {category} ({experience} ans)")
+    else:
+        justifications.append("Expérience non renseignée")
+
+    if raison_bonus == BONUS_APPLIQUE:
+        _, bonus_details = get_bonus_competences(competences)
         justifications.append(f"Bonus compétences: {', '.join(bonus_details)}")
 
-    return round(score, 1), justifications
+    return justifications
+
+
+def calculate_match(profil, besoin):
+    """
+    Calcule le score de compatibilité entre un profil et un besoin.
+
+    Args:
+        profil: Dictionnaire du profil Gomécanicien (extrait du JSON)
+        besoin: Dictionnaire du besoin opérationnel
+
+    Returns:
+        Tuple (score, liste_justifications)
+        - score: Note sur 100 (peut dépasser 100 avec les bonus)
+        - justifications: Liste de strings expliquant le score
+    """
+    rules = get_compiled_rules()
+    score, raisons = score_profile(profil, besoin, rules)
+    return score, explain(profil, besoin, raisons, rules)
+
+
+def _build_result(profil, score, raisons, besoin, with_justifications, rules):
+    """
+    Entrée du classement pour un profil.
+    Sans justifications, l'entrée garde les codes de raison et le profil
+    pour que explain_result() puisse les générer plus tard.
+    """
+    result = {
+        "nom": profil.get("nom", "Inconnu"),
+        "fichier": profil.get("fichier_source", ""),
+        "score": score,
+        "justifications": explain(profil, besoin, raisons, rules) if with_justifications else None,
+        "ville": profil.get("ville", ""),
+        "experience": profil.get("experience_annees", 0),
+        "competences": profil.get("competences", [])
+    }
+    if not with_justifications:
+        result["raisons"] = raisons
+        result["profil"] = profil
+    return result
 
 
-def rank_candidates(profils, besoin):
+def explain_result(result, besoin):
+    """
+    Complète les justifications d'une entrée de rank_candidates obtenue
+    avec with_justifications=False (à appeler pour les seuls candidats
+    affichés ou exportés).
+
+    Args:
+        result: Entrée du classement
+        besoin: Besoin utilisé pour le classement
+
+    Returns:
+        Liste des justifications (aussi enregistrée dans result)
+    """
+    if result["justifications"] is None:
+        result["justifications"] = explain(result["profil"], besoin, result["raisons"])
+    return result["justifications"]
+
+
+def rank_candidates(profils, besoin, top_k=None, with_justifications=True):
     """
     Classe une liste de profils selon leur compatibilité avec un besoin.
 
     Args:
-        profils: Liste de dictionnaires profils
+        profils: Liste de dictionnaires profils, table colonnaire
+            (vectorized.ProfileTable) dont les scores sont calculés en bloc,
+            ou index (index.ProfileIndex) qui n'évalue que les profils
+            pouvant entrer dans le top_k
         besoin: Dictionnaire du besoin
+        top_k: Ne garder que les top_k meilleurs candidats (None = tous).
+            Seuls ces candidats donnent lieu à un dictionnaire de résultat ;
+            l'ordre est le même que celui du classement complet
+            (à score égal, ordre de la liste d'origine)
+        with_justifications: Si False, les justifications ne sont pas
+            générées ("justifications" vaut None) ; voir explain_result
 
     Returns:
         Liste triée par score décroissant avec détails
     """
-    results = []
+    if top_k is not None and top_k <= 0:
+        return []
+    # Règles obtenues une fois pour tout le classement
+    rules = get_compiled_rules()
+
+    if top_k is not None and hasattr(profils, "search"):
+        results = []
+        for index, score, raisons in profils.search(besoin, top_k):
+            results.append(_build_result(profils[index], score, raisons, besoin, with_justifications, rules))
+        return results
+
+    if hasattr(profils, "scores"):
+        return rank_page(profils, besoin, profils.scores(besoin), 0, top_k, with_justifications, rules)
+
+    if top_k is None:
+        results = []
+        for profil in profils:
+            score, raisons = score_profile(profil, besoin, rules)
+            results.append(_build_result(profil, score, raisons, besoin, with_justifications, rules))
 
-    for profil in profils:
-        score, justifications = calculate_match(profil, besoin)
+        # Tri par score décroissant
+        results.sort(key=lambda x: x["score"], reverse=True)
+        return results
 
-        results.append({
-            "nom": profil.get("nom", "Inconnu"),
-            "fichier": profil.get("fichier_source", ""),
-            "score": score,
-            "justifications": justifications,
-            "ville": profil.get("ville", ""),
-            "experience": profil.get("experience_annees", 0),
-            "competences": profil.get("competences", [])
-        })
+    # Tas des top_k meilleurs (score, -position) : le plus faible est en tête
+    # et la position départage les égalités comme le tri stable
+    heap = []
+    for index, profil in enumerate(profils):
+        score, raisons = score_profile(profil, besoin, rules)
+        entry = (score, -index, raisons, profil)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
 
-    # Tri par score décroissant
-    results.sort(key=lambda x: x["score"], reverse=True)
+    return [
+        _build_result(profil, score, raisons, besoin, with_justifications, rules)
+        for score, _, raisons, profil in sorted(heap, key=lambda e: e[:2], reverse=True)
+    ]
 
+
+def rank_page(table, besoin, scores, start, stop=None, with_justifications=True, rules=None):
+    """
+    Tranche [start:stop] du classement d'une table colonnaire, à partir
+    de scores déjà calculés : seuls les profils de la tranche donnent lieu
+    à un dictionnaire de résultat (pagination).
+
+    Args:
+        table: Table vectorized.ProfileTable
+        besoin: Dictionnaire du besoin
+        scores: Tableau retourné par table.scores(besoin)
+        start: Rang du premier candidat (0 = meilleur)
+        stop: Rang suivant le dernier candidat (None = jusqu'au dernier)
+        with_justifications: Voir rank_candidates
+        rules: Règles compilées (get_compiled_rules() par défaut)
+
+    Returns:
+        Entrées du classement, identiques à
+        rank_candidates(table, besoin, top_k=stop)[start:]
+    """
+    if rules is None:
+        rules = get_compiled_rules()
+    results = []
+    for index in table.ranked_indices(scores, stop)[start:]:
+        profil = table[index]
+        raisons = score_profile(profil, besoin, rules)[1]
+        results.append(_build_result(profil, float(scores[index]), raisons, besoin, with_justifications, rules))
     return results
+
+
+def rank_missions(profils, besoins, top_k=10, with_justifications=True):
+    """
+    Classe les candidats de plusieurs missions en un seul appel.
+
+    Les caractéristiques des profils (table colonnaire) sont calculées une
+    seule fois pour toutes les missions, et les scores sont évalués par
+    blocs de profils (voir vectorized.ProfileTable.top_k_per_mission).
+
+    Args:
+        profils: Table vectorized.ProfileTable, ou liste de profils (la
+            table est alors construite)
+        besoins: Liste de besoins (dictionnaires ou objets Besoin)
+        top_k: Nombre de candidats par mission (None = tous)
+        with_justifications: Voir rank_candidates
+
+    Returns:
+        Liste (une entrée par besoin, dans l'ordre de besoins) des classements,
+        identiques à rank_candidates(profils, besoin, top_k)
+    """
+    if not hasattr(profils, "top_k_per_mission"):
+        profils = ProfileTable(profils)
+    besoins = [besoin.to_dict() if hasattr(besoin, "to_dict") else besoin for besoin in besoins]
+
+    if top_k is None:
+        top_k = len(profils)
+    rules = get_compiled_rules()
+    classements = []
+    for besoin, ranked in zip(besoins, profils.top_k_per_mission(besoins, top_k)):
+        results = []
+        for index, score in ranked:
+            profil = profils[index]
+            raisons = score_profile(profil, besoin, rules)[1]
+            results.append(_build_result(profil, score, raisons, besoin, with_justifications, rules))
+        classements.append(results)
+    return classements
@@ -0,0 +1,516 @@
+"""
+Moteur de scoring vectorisé (NumPy).
+Les profils sont chargés une seule fois dans des colonnes (ville, compétences,
+expérience) ; un besoin est ensuite évalué contre tous les profils en quelques
+opérations sur tableaux, avec les mêmes scores que calculate_match.
+"""
+import threading
+
+import numpy as np
+
+from aag.config import MATRIX_CHUNK_SIZE
+from aag.models.profil import profile_key
+from .rules import get_compiled_rules
+
+# Nombre maximal de compétences distinctes (une par bit du masque)
+MAX_COMPETENCES = 64
+
+# Nombre de couples (ville_cible, competence_requise) dont les facteurs
+# de critères restent en cache
+FACTOR_CACHE_SIZE = 32
+
+
+class ProfileTable:
+    """
+    Table colonnaire d'une liste de profils.
+
+    Colonnes (un élément par profil, dans l'ordre de la liste d'origine) :
+    - city_ids: Identifiant de la ville (index dans cities, en minuscules)
+    - competence_masks: Masque de bits des compétences (bit i = competences_vocab[i])
+    - has_competences: Le profil a au moins une compétence
+    - years: Années d'expérience
+    - bonus: Bonus de compétences stratégiques (rules.BONUS_COMPETENCES)
+
+    La table se comporte comme une séquence des profils d'origine : elle peut
+    être passée à rank_candidates à la place de la liste. upsert y ajoute
+    ou remplace des profils sans la reconstruire.
+
+    Plusieurs threads peuvent scorer la même table en parallèle : les caches
+    de facteurs sont protégés par un verrou interne. upsert, qui modifie les
+    colonnes, doit en revanche être exclu des scorings par l'appelant.
+    """
+
+    def __init__(self, profils):
+        """
+        Args:
+            profils: Liste de dictionnaires profils (format JSON d'ingestion)
+        """
+        self.profils = list(profils)
+
+        # Vocabulaire des compétences, dans l'ordre d'apparition
+        self.competences_vocab = []
+        self._competence_bits = {}
+        self.cities = []
+        self._city_ids = {}
+
+        # Colonnes remplies en listes Python puis converties en une fois :
+        # l'affectation élément par élément dans un tableau NumPy est lente
+        city_ids = []
+        masks = []
+        has_competences = []
+        years = []
+
+        for profil in self.profils:
+            city_id, mask, has_competence, experience = self._row(profil)
+            city_ids.append(city_id)
+            masks.append(mask)
+            has_competences.append(has_competence)
+            years.append(experience)
+
+        self.city_ids = np.array(city_ids, dtype=np.int32)
+        self.competence_masks = np.array(masks, dtype=np.uint64)
+        self.has_competences = np.array(has_competences, dtype=bool)
+        self.years = np.array(years, dtype=np.float64)
+
+        # Colonnes et facteurs qui dépendent des règles métier (voir _sync_rules)
+        self._rules = get_compiled_rules()
+        self.bonus = self._bonus_column(self._rules)
+
+        # Facteurs de critères déjà calculés (voir criterion_factors)
+        self._factors = {}
+        self._experience_factors = {}
+        self._cache_lock = threading.RLock()
+
+        # Position de chaque profil par identifiant (voir _position_map)
+        self._positions = None
+
+    def _row(self, profil):
+        """
+        Valeurs des colonnes pour un profil.
+
+        Returns:
+            Tuple (city_id, masque, a_des_competences, annees)
+        """
+        competences = profil.get("competences", [])
+        mask = 0
+        for comp in competences:
+            mask |= 1 << self._competence_bit(comp)
+        return (
+            self._intern_city(profil.get("ville", "Inconnue")), mask,
+            bool(competences), profil.get("experience_annees", 0)
+        )
+
+    def _profile_keys(self):
+        """Identifiant (profile_key) de chaque profil, dans l'ordre de la table."""
+        return [profile_key(profil) for profil in self.profils]
+
+    def _position_map(self):
+        """Position de chaque profil par identifiant, construite au premier appel."""
+        if self._positions is None:
+            self._positions = {key: index for index, key in enumerate(self._profile_keys())}
+        return self._positions
+
+    def find(self, key):
+        """
+        Position d'un profil dans la table.
+
+        Args:
+            key: Identifiant du profil (profile_key, soit son fichier_source)
+
+        Returns:
+            Position du profil, ou None s'il est absent
+        """
+        return self._position_map().get(key)
+
+    def upsert(self, profils):
+        """
+        Ajoute des profils à la table, ou remplace ceux de même identifiant
+        (fichier_source), sans recalculer les autres lignes.
+
+        Les facteurs en cache sont invalidés.
+
+        Args:
+            profils: Liste de dictionnaires profils
+
+        Returns:
+            Tuple (nombre_ajoutés, nombre_remplacés)
+        """
+        rules = self._sync_rules()
+        positions = self._position_map()
+
+        replaced = {}
+        added = []
+        for profil in profils:
+            key = profile_key(profil)
+            index = positions.get(key)
+            if index is None:
+                positions[key] = len(self.profils)
+                self.profils.append(profil)
+                added.append(profil)
+            else:
+                self.profils[index] = profil
+                replaced[index] = profil
+
+        # Les colonnes peuvent être en lecture seule (instantané en mmap) :
+        # elles sont copiées avant la première modification
+        columns = ["city_ids", "competence_masks", "has_competences", "years", "bonus"]
+        if replaced:
+            for name in columns:
+                column = getattr(self, name)
+                if not column.flags.writeable:
+                    setattr(self, name, column.copy())
+            for index, profil in replaced.items():
+                row = self._row(profil) + (rules.bonus_total(profil.get("competences", [])),)
+                for name, value in zip(columns, row):
+                    getattr(self, name)[index] = value
+        if added:
+            rows = [self._row(profil) + (rules.bonus_total(profil.get("competences", [])),) for profil in added]
+            for name, values in zip(columns, zip(*rows)):
+                column = getattr(self, name)
+                setattr(self, name, np.concatenate([column, np.array(values, dtype=column.dtype)]))
+
+        with self._cache_lock:
+            self._factors.clear()
+            self._experience_factors.clear()
+        return len(added), len(replaced)
+
+    def _bonus_column(self, rules):
+        """Bonus de compétences de chaque profil, calculé une fois par liste distincte."""
+        bonus = []
+        bonus_cache = {}
+        for profil in self.profils:
+            competences = profil.get("competences", [])
+            key = tuple(competences)
+            if key not in bonus_cache:
+                bonus_cache[key] = rules.bonus_total(competences)
+            bonus.append(bonus_cache[key])
+        return np.array(bonus, dtype=np.float64)
+
+    def _sync_rules(self):
+        """
+        Recalcule la colonne bonus et vide le cache des facteurs si les
+        tables de rules.py ont changé depuis leur calcul.
+
+        Returns:
+            Règles compilées en vigueur
+        """
+        rules = get_compiled_rules()
+        if rules is not self._rules:
+            with self._cache_lock:
+                if rules is not self._rules:
+                    self.bonus = self._bonus_column(rules)
+                    self._factors.clear()
+                    self._rules = rules
+        return rules
+
+    def _intern_city(self, ville):
+        """Identifiant de la ville (comparaison insensible à la casse)."""
+        key = ville.lower()
+        city_id = self._city_ids.get(key)
+        if city_id is None:
+            city_id = len(self.cities)
+            self._city_ids[key] = city_id
+            self.cities.append(key)
+        return city_id
+
+    def _competence_bit(self, comp):
+        """Position du bit d'une compétence, ajoutée au vocabulaire si besoin."""
+        bit = self._competence_bits.get(comp)
+        if bit is None:
+            bit = len(self.competences_vocab)
+            if bit >= MAX_COMPETENCES:
+                raise ValueError(f"Plus de {MAX_COMPETENCES} compétences distinctes : {comp}")
+            self._competence_bits[comp] = bit
+            self.competences_vocab.append(comp)
+        return bit
+
+    def __len__(self):
+        return len(self.profils)
+
+    def __getitem__(self, index):
+        return self.profils[index]
+
+    def __iter__(self):
+        return iter(self.profils)
+
+    def ranked_indices(self, scores, top_k=None):
+        """
+        Positions des profils par score décroissant (à score égal, ordre de
+        la table), limitées aux top_k premiers.
+
+        Pour top_k < len(self), une sélection partielle (np.partition) évite
+        de trier tous les scores : seuls les candidats au moins égaux au
+        k-ième score sont triés.
+
+        Args:
+            scores: Tableau retourné par scores()
+            top_k: Nombre de positions à garder (None = toutes)
+
+        Returns:
+            Liste des positions
+        """
+        return _top_positions(scores, top_k).tolist()
+
+    def criterion_factors(self, ville_cible, competence_requise):
+        """
+        Facteurs de ville et de compétence de chaque profil, indépendants des
+        poids : le score vaut poids_ville * facteur_ville + poids_competence
+        * facteur_competence + poids_experience * facteur_experience + bonus.
+
+        Les facteurs sont mis en cache par (ville_cible, competence_requise) :
+        quand seuls les poids ou l'expérience minimale changent, le score est
+        recalculé par une simple somme pondérée.
+
+        Args:
+            ville_cible: Ville cible du besoin
+            competence_requise: Compétence requise du besoin
+
+        Returns:
+            Tuple (facteur_ville, facteur_competence) de tableaux NumPy
+            (1 / 0.5 / 0 pour la ville, 1 / 0.3 / 0 pour la compétence)
+        """
+        priority_cities = self._sync_rules().priority_cities
+        key = (ville_cible.lower(), competence_requise)
+        with self._cache_lock:
+            factors = self._factors.get(key)
+            if factors is None:
+                factors = self._factors[key] = self._compute_criterion_factors(key, priority_cities)
+                if len(self._factors) > FACTOR_CACHE_SIZE:
+                    self._factors.pop(next(iter(self._factors)))
+        return factors
+
+    def _compute_criterion_factors(self, key, priority_cities):
+        """Facteurs de ville et de compétence (voir criterion_factors), sans cache."""
+        ville_cible, competence_requise = key
+        target = self._city_ids.get(ville_cible)
+        city_factors = np.array([
+            1.0 if city_id == target else 0.5 if city in priority_cities else 0.0
+            for city_id, city in enumerate(self.cities)
+        ], dtype=np.float64)
+        ville = city_factors[self.city_ids] if self.cities else np.zeros(0)
+
+        bit = self._competence_bits.get(competence_requise)
+        if bit is None:
+            has_required = np.zeros(len(self), dtype=bool)
+        else:
+            has_required = (self.competence_masks & np.uint64(1 << bit)) != 0
+        competence = np.where(has_required, 1.0, np.where(self.has_competences, 0.3, 0.0))
+        return ville, competence
+
+    def experience_factors(self, experience_min):
+        """
+        Facteur d'expérience de chaque profil : 1 si l'expérience atteint le
+        minimum, sinon la fraction du minimum atteinte (0 sans expérience).
+
+        Returns:
+            Tableau NumPy
+        """
+        with self._cache_lock:
+            factors = self._experience_factors.get(experience_min)
+            if factors is None:
+                years = self.years
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    factors = np.where(
+                        years >= experience_min, 1.0,
+                        np.where(years > 0, years / experience_min, 0.0)
+                    )
+                self._experience_factors[experience_min] = factors
+                if len(self._experience_factors) > FACTOR_CACHE_SIZE:
+                    self._experience_factors.pop(next(iter(self._experience_factors)))
+        return factors
+
+    def scores(self, besoin):
+        """
+        Calcule le score de tous les profils pour un besoin.
+
+        Le score est la somme pondérée des facteurs de critères (mis en cache,
+        voir criterion_factors). Les termes sont additionnés dans le même ordre
+        que calculate_match, en flottants double précision : les scores sont
+        identiques.
+
+        Args:
+            besoin: Dictionnaire (ou objet Besoin) du besoin opérationnel
+
+        Returns:
+            Tableau NumPy des scores (arrondis à 0.1), dans l'ordre des profils
+        """
+        if hasattr(besoin, "to_dict"):
+            besoin = besoin.to_dict()
+        ville, competence = self.criterion_factors(
+            besoin.get("ville_cible", ""), besoin.get("competence_requise", "")
+        )
+        experience = self.experience_factors(besoin.get("experience_min", 0))
+
+        # Pas de produit matriciel (np.dot) : il pourrait réordonner les
+        # additions et changer le dernier bit des scores
+        score = besoin.get("poids_ville", 50) * ville + besoin.get("poids_competence", 30) * competence
+        score = score + besoin.get("poids_experience", 20) * experience
+        score = score + self.bonus
+        return _round_like_python(score)
+
+    def score_matrix(self, besoins, chunk_size=MATRIX_CHUNK_SIZE):
+        """
+        Calcule la matrice des scores de plusieurs besoins (missions).
+
+        Args:
+            besoins: Liste de besoins (dictionnaires ou objets Besoin)
+            chunk_size: Nombre de profils traités par bloc
+
+        Returns:
+            Tableau NumPy M x N (une ligne par besoin, une colonne par profil)
+        """
+        matrix = np.empty((len(besoins), len(self)), dtype=np.float64)
+        for start, block in self.iter_score_blocks(besoins, chunk_size):
+            matrix[:, start:start + block.shape[1]] = block
+        return matrix
+
+    def iter_score_blocks(self, besoins, chunk_size=MATRIX_CHUNK_SIZE):
+        """
+        Calcule les scores de plusieurs besoins par blocs de profils.
+        La mémoire utilisée est proportionnelle à len(besoins) x chunk_size,
+        quel que soit le nombre de profils.
+
+        Args:
+            besoins: Liste de besoins (dictionnaires ou objets Besoin)
+            chunk_size: Nombre de profils par bloc
+
+        Yields:
+            Tuples (debut, bloc) : bloc est un tableau M x chunk_size (ou moins
+            pour le dernier) des scores des profils debut, debut + 1, ...
+        """
+        params = _besoin_params(besoins)
+        self._sync_rules()
+        chunk_size = max(1, chunk_size)
+        for start in range(0, len(self), chunk_size):
+            yield start, self._score_block(params, start, min(start + chunk_size, len(self)))
+
+    def top_k_per_mission(self, besoins, top_k, chunk_size=MATRIX_CHUNK_SIZE):
+        """
+        Meilleurs profils de chaque besoin, sans construire la matrice complète.
+
+        Les k meilleurs de chaque bloc sont fusionnés avec les k meilleurs des
+        blocs précédents ; à score égal, l'ordre de la table est conservé
+        (même résultat que ranked_indices sur la ligne complète).
+
+        Args:
+            besoins: Liste de besoins (dictionnaires ou objets Besoin)
+            top_k: Nombre de profils à garder par besoin
+            chunk_size: Nombre de profils par bloc
+
+        Returns:
+            Liste (une entrée par besoin) de listes de tuples (position, score)
+        """
+        best = [(np.empty(0), np.empty(0, dtype=np.int64)) for _ in besoins]
+        if top_k <= 0:
+            return [[] for _ in besoins]
+
+        for start, block in self.iter_score_blocks(besoins, chunk_size):
+            for m, row in enumerate(block):
+                positions = _top_positions(row, top_k)
+                # Les meilleurs précédents viennent en tête : à score égal,
+                # le tri stable les garde avant ceux de ce bloc
+                scores = np.concatenate([best[m][0], row[positions]])
+                indices = np.concatenate([best[m][1], positions + start])
+                keep = _top_positions(scores, top_k)
+                best[m] = (scores[keep], indices[keep])
+
+        return [list(zip(indices.tolist(), scores.tolist())) for scores, indices in best]
+
+    def _score_block(self, params, start, stop):
+        """
+        Scores des profils start..stop-1 pour un ensemble de besoins.
+
+        Returns:
+            Tableau M x (stop - start)
+        """
+        (ville_cibles, competences_requises, experience_min,
+         poids_ville, poids_competence, poids_experience) = params
+        col = np.newaxis
+
+        # 1. Ville : un terme par (besoin, ville distincte), puis indexation par profil
+        priority = np.array([city in self._rules.priority_cities for city in self.cities], dtype=bool)
+        city_terms = np.where(priority, poids_ville[:, col] * 0.5, 0.0)
+        for m, ville_cible in enumerate(ville_cibles):
+            city_id = self._city_ids.get(ville_cible.lower())
+            if city_id is not None:
+                city_terms[m, city_id] = poids_ville[m]
+        score = city_terms[:, self.city_ids[start:stop]]
+
+        # 2. Compétence requise, sinon bonus partiel si d'autres compétences
+        bits = np.array([self._competence_bits.get(comp, -1) for comp in competences_requises], dtype=np.int64)
+        known = bits >= 0
+        shifts = np.where(known, bits, 0).astype(np.uint64)
+        masks = self.competence_masks[start:stop]
+        has_required = ((masks >> shifts[:, col]) & np.uint64(1)).astype(bool) & known[:, col]
+        score = score + np.where(
+            has_required, poids_competence[:, col],
+            np.where(self.has_competences[start:stop], poids_competence[:, col] * 0.3, 0.0)
+        )
+
+        # 3. Expérience : complète si suffisante, sinon proportionnelle
+        years = self.years[start:stop]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            partial = poids_experience[:, col] * (years / experience_min[:, col])
+        score = score + np.where(
+            years >= experience_min[:, col], poids_experience[:, col],
+            np.where(years > 0, partial, 0.0)
+        )
+
+        # 4. Bonus stratégiques
+        score = score + self.bonus[start:stop]
+
+        return _round_like_python(score)
+
+
+def _besoin_params(besoins):
+    """
+    Paramètres d'une liste de besoins, en colonnes.
+
+    Returns:
+        Tuple (villes_cibles, competences_requises, experience_min,
+        poids_ville, poids_competence, poids_experience) ; les quatre
+        derniers sont des tableaux NumPy
+    """
+    besoins = [besoin.to_dict() if hasattr(besoin, "to_dict") else besoin for besoin in besoins]
+    return (
+        [besoin.get("ville_cible", "") for besoin in besoins],
+        [besoin.get("competence_requise", "") for besoin in besoins],
+        np.array([besoin.get("experience_min", 0) for besoin in besoins], dtype=np.float64),
+        np.array([besoin.get("poids_ville", 50) for besoin in besoins], dtype=np.float64),
+        np.array([besoin.get("poids_competence", 30) for besoin in besoins], dtype=np.float64),
+        np.array([besoin.get("poids_experience", 20) for besoin in besoins], dtype=np.float64),
+    )
+
+
+def _top_positions(scores, top_k=None):
+    """
+    Positions des top_k meilleurs scores, par score décroissant puis
+    position croissante (tableau NumPy).
+    """
+    count = len(scores)
+    if top_k is None or top_k >= count:
+        return np.argsort(-scores, kind="stable")
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    kth = np.partition(scores, count - top_k)[count - top_k]
+    candidates = np.flatnonzero(scores >= kth)
+    order = np.argsort(-scores[candidates], kind="stable")[:top_k]
+    return candidates[order]
+
+
+def _round_like_python(values):
+    """
+    Arrondit à 0.1 comme round(x, 1).
+
+    np.round multiplie par 10 avant d'arrondir, ce qui peut faire basculer
+    une valeur très proche de xx.x5 ; ces valeurs sont arrondies avec
+    round(), une fois par valeur distincte.
+    """
+    rounded = np.round(values, 1)
+    scaled = values * 10
+    halfway = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if len(halfway):
+        distinct, inverse = np.unique(values.reshape(-1)[halfway], return_inverse=True)
+        fixed = np.array([round(float(value), 1) for value in distinct])
+        rounded.reshape(-1)[halfway] = fixed[inverse]
+    return rounded
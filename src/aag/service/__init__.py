@@ -0,0 +1,2 @@
+# Module service - Service HTTP local de matching
+from .server import MatchingService, create_server, parse_besoin
@@ -0,0 +1,286 @@
+"""
+Service HTTP local de matching.
+Le corpus de profils est chargé une seule fois en table de scoring
+(instantané binaire, voir storage.snapshot) et reste en mémoire : un
+classement ne coûte que le calcul des scores, sans relire aucun fichier.
+
+Routes (corps JSON en entrée et en sortie) :
+- POST /rank   : {"besoin": {...}, "top_k": 10, "justifications": false}
+                 -> {"total": nombre de profils, "resultats": [...]}
+- POST /score  : {"besoin": {...}, "profil": {...}} ou
+                 {"besoin": {...}, "fichier": "CV_x.pdf"} (profil du corpus)
+                 -> {"score": ..., "justifications": [...]}
+- POST /reload : relit le corpus -> {"profils": ..., "duree_ms": ...}
+- GET /status  : {"profils": ...}
+
+Les requêtes sont traitées en parallèle (un thread par connexion), sans
+verrou autour du scoring : la table protège elle-même ses caches de
+facteurs (voir vectorized.ProfileTable) et n'est jamais modifiée par le
+service. Un rechargement construit une nouvelle table puis remplace la
+référence ; chaque requête travaille sur la table lue à son début.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from numbers import Number
+
+from aag.config import (
+    JSON_DIR, PROFILE_SNAPSHOT_PATH, PROFILE_STORE_PATH, SERVICE_HOST, SERVICE_PORT, SERVICE_TOP_K
+)
+from aag.models.besoin import Besoin
+from aag.models.profil import Profil
+from aag.scoring.scorer import calculate_match, rank_candidates
+from aag.storage.snapshot import load_snapshot_table
+from aag.utils.logger import logger
+
+
+# Champs numériques du besoin
+_BESOIN_NUMBERS = ("experience_min", "poids_ville", "poids_competence", "poids_experience")
+
+
+def parse_besoin(data):
+    """
+    Valide un besoin reçu par le service et complète les champs absents
+    (valeurs par défaut de models.Besoin).
+
+    Args:
+        data: Besoin décodé du JSON de la requête
+
+    Returns:
+        Dictionnaire du besoin
+
+    Raises:
+        ValueError: Besoin absent ou mal formé
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Champ 'besoin' absent ou invalide")
+    besoin = Besoin.from_dict(data).to_dict()
+    for field in ("ville_cible", "competence_requise"):
+        if not isinstance(besoin[field], str):
+            raise ValueError(f"Champ '{field}' invalide : texte attendu")
+    for field in _BESOIN_NUMBERS:
+        if not isinstance(besoin[field], Number) or isinstance(besoin[field], bool):
+            raise ValueError(f"Champ '{field}' invalide : nombre attendu")
+    return besoin
+
+
+def parse_profil(data):
+    """
+    Valide un profil reçu par le service et complète les champs absents
+    (valeurs par défaut de models.Profil). Les autres champs du profil
+    (ville_confiance...) sont conservés.
+
+    Args:
+        data: Profil décodé du JSON de la requête
+
+    Returns:
+        Dictionnaire du profil
+
+    Raises:
+        ValueError: Profil absent ou mal formé
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Champ 'profil' ou 'fichier' absent ou invalide")
+    profil = {**Profil.from_dict(data).to_dict(), **data}
+    if not isinstance(profil["ville"], str):
+        raise ValueError("Champ 'ville' invalide : texte attendu")
+    competences = profil["competences"]
+    if not isinstance(competences, list) or not all(isinstance(c, str) for c in competences):
+        raise ValueError("Champ 'competences' invalide : liste de textes attendue")
+    experience = profil["experience_annees"]
+    if not isinstance(experience, Number) or isinstance(experience, bool):
+        raise ValueError("Champ 'experience_annees' invalide : nombre attendu")
+    return profil
+
+
+class MatchingService:
+    """
+    Corpus de profils en mémoire, partagé par les threads du serveur.
+    """
+
+    def __init__(self, snapshot_path=PROFILE_SNAPSHOT_PATH, store_path=PROFILE_STORE_PATH, json_dir=JSON_DIR):
+        """
+        Args:
+            snapshot_path: Chemin de l'instantané binaire
+            store_path: Store consolidé (source prioritaire)
+            json_dir: Dossier des profils JSON (source de repli)
+        """
+        self.snapshot_path = snapshot_path
+        self.store_path = store_path
+        self.json_dir = json_dir
+        self._reload_lock = threading.Lock()
+        self.table = None
+        self.reload()
+
+    def reload(self):
+        """
+        Relit le corpus (instantané reconstruit si la source a changé).
+        Les classements en cours se terminent sur l'ancienne table.
+
+        Returns:
+            Nombre de profils chargés
+        """
+        with self._reload_lock:
+            table = load_snapshot_table(self.snapshot_path, self.store_path, self.json_dir)
+            self.table = table
+        logger.info(f"Service de matching : {len(table)} profil(s) chargé(s)")
+        return len(table)
+
+    def count(self):
+        """Nombre de profils en mémoire."""
+        return len(self.table)
+
+    def rank(self, besoin, top_k=SERVICE_TOP_K, justifications=False):
+        """
+        Classe les profils du corpus pour un besoin.
+
+        Args:
+            besoin: Dictionnaire du besoin (voir parse_besoin)
+            top_k: Nombre de candidats retournés (None = tous)
+            justifications: Générer les justifications lisibles
+
+        Returns:
+            Liste des entrées du classement (voir scorer.rank_candidates)
+        """
+        results = rank_candidates(self.table, besoin, top_k=top_k, with_justifications=justifications)
+        for result in results:
+            # Codes internes et profil complet : inutiles au client
+            result.pop("raisons", None)
+            result.pop("profil", None)
+        return results
+
+    def find(self, fichier):
+        """
+        Profil du corpus par identifiant.
+
+        Args:
+            fichier: fichier_source du profil
+
+        Returns:
+            Dictionnaire profil, ou None s'il est absent
+        """
+        table = self.table
+        index = table.find(fichier)
+        return None if index is None else table[index]
+
+
+# =============================================================================
+# SERVEUR HTTP
+# =============================================================================
+
+class HTTPError(Exception):
+    """Erreur retournée au client avec un code HTTP."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MatchingRequestHandler(BaseHTTPRequestHandler):
+    """Traite une connexion ; le service est accessible par self.server.service."""
+
+    # Connexions persistantes : un client enchaîne ses requêtes sans
+    # rouvrir de connexion TCP
+    protocol_version = "HTTP/1.1"
+    # Les en-têtes et le corps partent en écritures séparées : sans
+    # TCP_NODELAY, l'algorithme de Nagle ajoute ~40 ms à chaque réponse
+    disable_nagle_algorithm = True
+    server_version = "AAGMatching/1.0"
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._send(200, {"profils": self.server.service.count()})
+        else:
+            self._send(404, {"erreur": f"Route inconnue : {self.path}"})
+
+    def do_POST(self):
+        routes = {"/rank": self._rank, "/score": self._score, "/reload": self._reload}
+        try:
+            body = self._read_json()
+            route = routes.get(self.path)
+            if route is None:
+                raise HTTPError(404, f"Route inconnue : {self.path}")
+            self._send(200, route(body))
+        except HTTPError as e:
+            self._send(e.status, {"erreur": str(e)})
+        except ValueError as e:
+            self._send(400, {"erreur": str(e)})
+        except Exception as e:
+            logger.error(f"Erreur du service sur {self.path}: {e}")
+            self._send(500, {"erreur": "Erreur interne"})
+
+    def _rank(self, body):
+        besoin = parse_besoin(body.get("besoin"))
+        top_k = body.get("top_k", SERVICE_TOP_K)
+        if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool)):
+            raise ValueError("Champ 'top_k' invalide : entier attendu")
+        service = self.server.service
+        results = service.rank(besoin, top_k, bool(body.get("justifications", False)))
+        return {"total": service.count(), "resultats": results}
+
+    def _score(self, body):
+        besoin = parse_besoin(body.get("besoin"))
+        profil = body.get("profil")
+        if profil is None and "fichier" in body:
+            profil = self.server.service.find(body["fichier"])
+            if profil is None:
+                raise HTTPError(404, f"Profil inconnu : {body['fichier']}")
+        else:
+            profil = parse_profil(profil)
+        score, justifications = calculate_match(profil, besoin)
+        return {"score": score, "justifications": justifications}
+
+    def _reload(self, body):
+        start = time.perf_counter()
+        count = self.server.service.reload()
+        return {"profils": count, "duree_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    def _read_json(self):
+        """Corps de la requête décodé (dictionnaire vide si absent)."""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Corps de taille inconnue : la suite du flux n'est plus lisible
+            self.close_connection = True
+            raise HTTPError(400, "En-tête Content-Length invalide")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise HTTPError(400, "Corps JSON invalide")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Objet JSON attendu")
+        return body
+
+    def _send(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+def create_server(service, host=SERVICE_HOST, port=SERVICE_PORT):
+    """
+    Crée le serveur HTTP (non démarré).
+
+    Args:
+        service: Objet MatchingService
+        host: Adresse d'écoute
+        port: Port d'écoute (0 = port libre choisi par le système)
+
+    Returns:
+        Objet ThreadingHTTPServer ; server.server_address donne l'adresse
+        effective, server.serve_forever() le démarre
+    """
+    server = ThreadingHTTPServer((host, port), MatchingRequestHandler)
+    server.service = service
+    return server
@@ -0,0 +1,5 @@
+# Module storage - Stockage consolide des profils
+from .profile_store import append_profiles, compact_store, import_json_dir, load_all_profiles, load_store
+from .search_db import index_profiles, open_search_db, search_profiles
+from .snapshot import load_snapshot_table
+from .watcher import ProfileSourceWatcher
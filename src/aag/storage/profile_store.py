@@ -0,0 +1,177 @@
+"""
+Stockage consolidé des profils au format JSON Lines (un profil par ligne).
+Un seul fichier remplace les milliers de fichiers de data/samples_json :
+le chargement ne coûte qu'une ouverture de fichier, quel que soit le nombre
+de profils.
+
+Les écritures se font par ajout en fin de fichier. Un profil est identifié
+par son fichier_source : au chargement, la dernière ligne d'un profil
+remplace les précédentes (compact_store supprime les versions périmées).
+"""
+import json
+import os
+
+from aag.config import JSON_DIR, PROFILE_STORE_PATH
+from aag.models.profil import profile_key
+from aag.utils.io import load_json
+from aag.utils.logger import logger
+
+
+def append_profiles(profils, path=PROFILE_STORE_PATH):
+    """
+    Ajoute des profils en fin de store, en une seule écriture.
+
+    Args:
+        profils: Liste de dictionnaires profils
+        path: Chemin du store
+
+    Returns:
+        Nombre de profils ajoutés
+    """
+    lines = [json.dumps(profil, ensure_ascii=False) + "\n" for profil in profils]
+    if not lines:
+        return 0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("".join(lines))
+    return len(lines)
+
+
+def load_store(path=PROFILE_STORE_PATH):
+    """
+    Charge tous les profils du store.
+
+    Une ligne illisible (écriture interrompue) est ignorée avec un
+    avertissement.
+
+    Args:
+        path: Chemin du store
+
+    Returns:
+        Liste de dictionnaires profils, dans l'ordre du premier ajout de
+        chacun (dernière version de chaque profil)
+    """
+    profils = {}
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                profil = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Ligne {line_number} illisible dans {path}, ignorée")
+                continue
+            profils[profile_key(profil)] = profil
+    return list(profils.values())
+
+
+def read_store_from(path, offset):
+    """
+    Lit les profils ajoutés au store après une position donnée.
+    Une dernière ligne incomplète (écriture en cours) n'est pas lue.
+
+    Args:
+        path: Chemin du store
+        offset: Position en octets (taille du store lors de la lecture précédente)
+
+    Returns:
+        Tuple (profils, nouvelle_position) ; profils contient la dernière
+        version de chaque profil lu
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    profils = {}
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            profil = json.loads(line)
+        except ValueError:
+            logger.warning(f"Ligne illisible dans {path} après l'octet {offset}, ignorée")
+            continue
+        profils[profile_key(profil)] = profil
+    return list(profils.values()), offset + end
+
+
+def _write_store(profils, path):
+    """Réécrit le store de façon atomique (fichier temporaire + renommage)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write("".join(json.dumps(profil, ensure_ascii=False) + "\n" for profil in profils))
+    os.replace(tmp_path, path)
+
+
+def compact_store(path=PROFILE_STORE_PATH):
+    """
+    Réécrit le store avec une seule ligne par profil.
+
+    Returns:
+        Nombre de profils conservés
+    """
+    profils = load_store(path)
+    _write_store(profils, path)
+    return len(profils)
+
+
+def load_json_dir(json_dir=JSON_DIR):
+    """
+    Charge les profils d'un dossier de fichiers JSON (un fichier par profil).
+    Les fichiers illisibles sont ignorés avec une erreur dans le log.
+
+    Args:
+        json_dir: Dossier des profils JSON
+
+    Returns:
+        Liste de dictionnaires profils, par nom de fichier
+    """
+    profils = []
+    if not os.path.exists(json_dir):
+        return profils
+    for filename in sorted(os.listdir(json_dir)):
+        if filename.endswith(".json"):
+            try:
+                profil = load_json(os.path.join(json_dir, filename))
+            except (OSError, ValueError) as e:
+                logger.error(f"Erreur lors du chargement de {filename}: {e}")
+                continue
+            profil.setdefault("fichier_source", filename)
+            profils.append(profil)
+    return profils
+
+
+def import_json_dir(json_dir=JSON_DIR, path=PROFILE_STORE_PATH):
+    """
+    Crée (ou remplace) le store à partir d'un dossier de profils JSON.
+
+    Args:
+        json_dir: Dossier des profils JSON
+        path: Chemin du store
+
+    Returns:
+        Nombre de profils importés
+    """
+    profils = load_json_dir(json_dir)
+    _write_store(profils, path)
+    return len(profils)
+
+
+def load_all_profiles(path=PROFILE_STORE_PATH, json_dir=JSON_DIR):
+    """
+    Charge les profils depuis le store s'il existe, sinon depuis le dossier
+    des fichiers JSON.
+
+    Args:
+        path: Chemin du store
+        json_dir: Dossier des profils JSON (solution de repli)
+
+    Returns:
+        Liste de dictionnaires profils
+    """
+    if os.path.exists(path):
+        return load_store(path)
+    return load_json_dir(json_dir)
@@ -0,0 +1,161 @@
+"""
+Base SQLite de recherche dans les CV (optionnelle).
+Chaque profil y est stocké avec le texte nettoyé complet de son CV, indexé
+en plein texte (FTS5) : une requête comme '"hybride" AND "habilitation"'
+est résolue par l'index au lieu d'un parcours des profils en Python, et
+se combine aux filtres ville / compétences / expérience.
+
+La casse et les accents sont ignorés dans les requêtes (tokenizer unicode61,
+remove_diacritics 2).
+"""
+import json
+import os
+import sqlite3
+
+from aag.config import SEARCH_DB_PATH
+from aag.models.profil import profile_key
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profils (
+    id INTEGER PRIMARY KEY,
+    fichier_source TEXT NOT NULL UNIQUE,
+    ville TEXT NOT NULL,
+    experience_annees REAL NOT NULL,
+    profil TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profils_ville ON profils (ville);
+CREATE INDEX IF NOT EXISTS profils_experience ON profils (experience_annees);
+CREATE TABLE IF NOT EXISTS competences (
+    competence TEXT NOT NULL,
+    profil_id INTEGER NOT NULL,
+    PRIMARY KEY (competence, profil_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS textes USING fts5(
+    texte, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def open_search_db(path=SEARCH_DB_PATH):
+    """
+    Ouvre (et crée si besoin) la base de recherche.
+
+    Args:
+        path: Chemin du fichier SQLite
+
+    Returns:
+        Connexion sqlite3
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def index_profiles(conn, items):
+    """
+    Ajoute ou remplace des profils, en une seule transaction : en cas
+    d'erreur, aucun profil du lot n'est enregistré.
+
+    Un profil est identifié par son fichier_source ; le réindexer remplace
+    ses données, ses compétences et son texte.
+
+    Args:
+        conn: Connexion ouverte par open_search_db
+        items: Itérable de tuples (profil, texte) ; texte est le texte
+            nettoyé complet du CV (texte_source du profil si None)
+
+    Returns:
+        Nombre de profils indexés
+    """
+    count = 0
+    with conn:
+        for profil, texte in items:
+            fichier = profile_key(profil)
+            if texte is None:
+                texte = profil.get("texte_source", "")
+            row = conn.execute("SELECT id FROM profils WHERE fichier_source = ?", (fichier,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM competences WHERE profil_id = ?", row)
+                conn.execute("DELETE FROM textes WHERE rowid = ?", row)
+                conn.execute("DELETE FROM profils WHERE id = ?", row)
+
+            profil_id = conn.execute(
+                "INSERT INTO profils (fichier_source, ville, experience_annees, profil) VALUES (?, ?, ?, ?)",
+                (
+                    fichier,
+                    profil.get("ville", "Inconnue").lower(),
+                    profil.get("experience_annees", 0),
+                    json.dumps(profil, ensure_ascii=False),
+                )
+            ).lastrowid
+            conn.executemany(
+                "INSERT OR IGNORE INTO competences (competence, profil_id) VALUES (?, ?)",
+                [(comp, profil_id) for comp in profil.get("competences", [])]
+            )
+            conn.execute("INSERT INTO textes (rowid, texte) VALUES (?, ?)", (profil_id, texte))
+            count += 1
+    return count
+
+
+def search_profiles(conn, query=None, ville=None, competences=None, experience_min=None, limit=50):
+    """
+    Recherche des profils par texte et par critères structurés.
+
+    Args:
+        conn: Connexion ouverte par open_search_db
+        query: Requête plein texte FTS5 (ex: 'hybride AND habilitation',
+            '"moteur diesel"', 'electri*') ; None pour ne filtrer que sur
+            les critères
+        ville: Ville du profil (insensible à la casse)
+        competences: Liste de compétences, toutes requises
+        experience_min: Nombre minimal d'années d'expérience
+        limit: Nombre maximal de profils retournés
+
+    Returns:
+        Liste de dictionnaires profils, les plus pertinents d'abord (ordre
+        d'indexation sans requête texte). Avec une requête, chaque profil a
+        un champ "extrait" : passage du CV où les termes sont [surlignés].
+
+    Raises:
+        ValueError: Requête plein texte invalide
+    """
+    where = []
+    params = []
+    if ville:
+        where.append("p.ville = ?")
+        params.append(ville.lower())
+    if experience_min is not None:
+        where.append("p.experience_annees >= ?")
+        params.append(experience_min)
+    for comp in competences or []:
+        where.append("p.id IN (SELECT profil_id FROM competences WHERE competence = ?)")
+        params.append(comp)
+
+    if query:
+        sql = (
+            "SELECT p.profil, snippet(textes, 0, '[', ']', '...', 12) FROM textes"
+            " JOIN profils p ON p.id = textes.rowid WHERE textes MATCH ?"
+        )
+        params.insert(0, query)
+        order = "textes.rank"
+    else:
+        sql = "SELECT p.profil, NULL FROM profils p WHERE 1"
+        order = "p.id"
+    for condition in where:
+        sql += " AND " + condition
+    sql += f" ORDER BY {order} LIMIT ?"
+    params.append(limit)
+
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError as e:
+        raise ValueError(f"Requête invalide : {query} ({e})") from e
+
+    results = []
+    for data, extrait in rows:
+        profil = json.loads(data)
+        if extrait is not None:
+            profil["extrait"] = extrait
+        results.append(profil)
+    return results
@@ -0,0 +1,390 @@
+"""
+Instantané binaire du corpus de profils, lu par projection mémoire (mmap).
+
+Les colonnes utilisées par le scoring (ville, masque de compétences,
+expérience) sont stockées en tableaux de largeur fixe et évaluées sur
+place par ProfileTable : le chargement ne lit aucun profil un par un. Les
+noms et fichiers sources sont dans des tables de chaînes, et un profil
+n'est reconstruit en dictionnaire que lorsqu'on y accède (candidats
+affichés).
+
+Format (entiers little-endian) :
+- en-tête : magique b"AAGSNAP\\0", version (uint32), taille des métadonnées (uint64)
+- métadonnées JSON : tables des villes et des listes de compétences,
+  source des profils, position de chaque colonne
+- colonnes et tables de chaînes, alignées sur 8 octets (positions
+  relatives à la fin des métadonnées, arrondie à 8)
+
+L'instantané est reconstruit automatiquement si sa version ne correspond
+pas à SNAPSHOT_VERSION ou si la source des profils (store ou dossier JSON)
+a changé depuis sa construction.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+
+import numpy as np
+
+from aag.config import JSON_DIR, PROFILE_SNAPSHOT_PATH, PROFILE_STORE_PATH
+from aag.scoring.vectorized import MAX_COMPETENCES, ProfileTable
+from aag.utils.logger import logger
+from .profile_store import load_all_profiles
+
+SNAPSHOT_MAGIC = b"AAGSNAP\0"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<8sIQ")
+
+# Colonnes de largeur fixe : nom -> type NumPy (une valeur par profil,
+# sauf les positions des chaînes : une de plus)
+_COLUMNS = {
+    "city_ids": np.int32,           # ville en minuscules (table "cities")
+    "ville_ids": np.int32,          # ville telle qu'écrite (table "villes")
+    "competence_ids": np.int32,     # liste de compétences (table "competences")
+    "competence_masks": np.uint64,  # bit i = competences_vocab[i]
+    "years": np.float64,
+    "years_is_float": np.uint8,     # 1 si experience_annees n'est pas un entier
+    "ville_confiance": np.float64,  # NaN si absente
+    "nom_offsets": np.uint64,
+    "fichier_offsets": np.uint64,
+}
+
+
+# =============================================================================
+# SOURCE DES PROFILS
+# =============================================================================
+
+def source_signature(store_path=PROFILE_STORE_PATH, json_dir=JSON_DIR):
+    """
+    Signature de la source des profils : le store s'il existe (inode,
+    taille, date), sinon le dossier JSON (dernière modification d'un
+    fichier et nombre de fichiers).
+
+    Returns:
+        Dictionnaire compatible JSON
+    """
+    if os.path.exists(store_path):
+        stat = os.stat(store_path)
+        return {
+            "store": os.path.abspath(store_path), "inode": stat.st_ino,
+            "mtime_ns": stat.st_mtime_ns, "taille": stat.st_size
+        }
+
+    latest = 0
+    count = 0
+    if os.path.isdir(json_dir):
+        with os.scandir(json_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    latest = max(latest, entry.stat().st_mtime_ns)
+                    count += 1
+    return {"dossier": os.path.abspath(json_dir), "mtime_ns": latest, "fichiers": count}
+
+
+# =============================================================================
+# ÉCRITURE
+# =============================================================================
+
+def _padding(size):
+    """Octets de bourrage pour aligner size sur 8."""
+    return -size % 8
+
+
+def _string_table(values):
+    """Positions (N + 1) et contenu UTF-8 d'une liste de chaînes."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, b"".join(encoded)
+
+
+def write_snapshot(profils, path=PROFILE_SNAPSHOT_PATH, source=None):
+    """
+    Écrit l'instantané d'une liste de profils (de façon atomique).
+
+    Seuls les champs nom, ville, competences, experience_annees,
+    ville_confiance et fichier_source sont conservés (pas texte_source).
+
+    Args:
+        profils: Liste de dictionnaires profils
+        path: Chemin de l'instantané
+        source: Signature de la source (voir source_signature)
+    """
+    villes, ville_index = [], {}
+    cities, city_index = [], {}
+    competence_lists, competence_index = [], {}
+    vocab, bits = [], {}
+
+    columns = {name: [] for name in _COLUMNS if not name.endswith("_offsets")}
+    noms, fichiers = [], []
+
+    for profil in profils:
+        ville = profil.get("ville", "Inconnue")
+        if ville not in ville_index:
+            ville_index[ville] = len(villes)
+            villes.append(ville)
+        city = ville.lower()
+        if city not in city_index:
+            city_index[city] = len(cities)
+            cities.append(city)
+
+        competences = tuple(profil.get("competences", []))
+        if competences not in competence_index:
+            competence_index[competences] = len(competence_lists)
+            competence_lists.append(list(competences))
+        mask = 0
+        for comp in competences:
+            if comp not in bits:
+                if len(vocab) >= MAX_COMPETENCES:
+                    raise ValueError(f"Plus de {MAX_COMPETENCES} compétences distinctes : {comp}")
+                bits[comp] = len(vocab)
+                vocab.append(comp)
+            mask |= 1 << bits[comp]
+
+        experience = profil.get("experience_annees", 0)
+        confiance = profil.get("ville_confiance")
+
+        columns["city_ids"].append(city_index[city])
+        columns["ville_ids"].append(ville_index[ville])
+        columns["competence_ids"].append(competence_index[competences])
+        columns["competence_masks"].append(mask)
+        columns["years"].append(experience)
+        columns["years_is_float"].append(not isinstance(experience, int))
+        columns["ville_confiance"].append(np.nan if confiance is None else confiance)
+        noms.append(profil.get("nom", "Inconnu"))
+        fichiers.append(profil.get("fichier_source", ""))
+
+    arrays = {name: np.array(values, dtype=_COLUMNS[name]) for name, values in columns.items()}
+    arrays["nom_offsets"], nom_blob = _string_table(noms)
+    arrays["fichier_offsets"], fichier_blob = _string_table(fichiers)
+
+    sections = {name: arrays[name].tobytes() for name in _COLUMNS}
+    sections["nom_blob"] = nom_blob
+    sections["fichier_blob"] = fichier_blob
+
+    layout = {}
+    position = 0
+    for name, data in sections.items():
+        layout[name] = [position, len(data)]
+        position += len(data) + _padding(len(data))
+
+    metadata = {
+        "count": len(noms),
+        "source": source,
+        "villes": villes,
+        "cities": cities,
+        "competences": competence_lists,
+        "competences_vocab": vocab,
+        "layout": layout,
+    }
+    meta_bytes = json.dumps(metadata, ensure_ascii=False).encode("utf-8")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(meta_bytes)))
+        f.write(meta_bytes)
+        f.write(b"\0" * _padding(_HEADER.size + len(meta_bytes)))
+        for data in sections.values():
+            f.write(data)
+            f.write(b"\0" * _padding(len(data)))
+    os.replace(tmp_path, path)
+
+
+# =============================================================================
+# LECTURE
+# =============================================================================
+
+class Snapshot:
+    """
+    Instantané ouvert par projection mémoire : les colonnes sont des
+    tableaux NumPy adossés au fichier, sans copie.
+    """
+
+    def __init__(self, path=PROFILE_SNAPSHOT_PATH):
+        """
+        Args:
+            path: Chemin de l'instantané
+
+        Raises:
+            ValueError: Fichier qui n'est pas un instantané de la version courante
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, meta_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"Instantané de version {version} (attendue : {SNAPSHOT_VERSION})")
+        meta_end = _HEADER.size + meta_length
+        self.metadata = json.loads(self._mmap[_HEADER.size:meta_end])
+        self.count = self.metadata["count"]
+
+        data_start = meta_end + _padding(meta_end)
+        layout = {name: (data_start + offset, size) for name, (offset, size) in self.metadata["layout"].items()}
+        for name, dtype in _COLUMNS.items():
+            offset, size = layout[name]
+            count = size // np.dtype(dtype).itemsize
+            setattr(self, name, np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset))
+        self._nom_start = layout["nom_blob"][0]
+        self._fichier_start = layout["fichier_blob"][0]
+
+    def _string(self, start, offsets, index):
+        """Chaîne index d'une table de chaînes commençant à start."""
+        return self._mmap[start + int(offsets[index]):start + int(offsets[index + 1])].decode("utf-8")
+
+    def profile(self, index):
+        """
+        Reconstruit le dictionnaire d'un profil.
+
+        Args:
+            index: Position du profil
+
+        Returns:
+            Dictionnaire profil (format JSON d'ingestion, sans texte_source)
+        """
+        years = float(self.years[index])
+        profil = {
+            "nom": self._string(self._nom_start, self.nom_offsets, index),
+            "ville": self.metadata["villes"][self.ville_ids[index]],
+            "competences": list(self.metadata["competences"][self.competence_ids[index]]),
+            "experience_annees": years if self.years_is_float[index] else int(years),
+        }
+        confiance = float(self.ville_confiance[index])
+        if confiance == confiance:
+            profil["ville_confiance"] = confiance
+        fichier = self._string(self._fichier_start, self.fichier_offsets, index)
+        if fichier:
+            profil["fichier_source"] = fichier
+        return profil
+
+    def profile_key(self, index):
+        """Identifiant (profile_key) d'un profil, sans reconstruire le dictionnaire."""
+        return self._string(self._fichier_start, self.fichier_offsets, index) or \
+            self._string(self._nom_start, self.nom_offsets, index)
+
+
+class SnapshotProfiles:
+    """
+    Séquence des profils d'un instantané, reconstruits à l'accès.
+    Les profils ajoutés ou remplacés depuis (ProfileTable.upsert) sont
+    gardés en mémoire, par-dessus l'instantané.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.replaced = {}
+        self.added = []
+
+    def __len__(self):
+        return self.snapshot.count + len(self.added)
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        index %= len(self)
+        if index >= self.snapshot.count:
+            return self.added[index - self.snapshot.count]
+        profil = self.replaced.get(index)
+        return profil if profil is not None else self.snapshot.profile(index)
+
+    def __setitem__(self, index, profil):
+        if index >= self.snapshot.count:
+            self.added[index - self.snapshot.count] = profil
+        else:
+            self.replaced[index] = profil
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, profil):
+        self.added.append(profil)
+
+
+class SnapshotTable(ProfileTable):
+    """
+    ProfileTable dont les colonnes sont celles de l'instantané (en
+    projection mémoire). Seul le bonus est recalculé, une fois par liste de
+    compétences distincte, pour suivre les règles en vigueur.
+    """
+
+    def __init__(self, snapshot):
+        """
+        Args:
+            snapshot: Objet Snapshot
+        """
+        metadata = snapshot.metadata
+        self.snapshot = snapshot
+        self.profils = SnapshotProfiles(snapshot)
+        self.competences_vocab = list(metadata["competences_vocab"])
+        self._competence_bits = {comp: bit for bit, comp in enumerate(self.competences_vocab)}
+        self.cities = list(metadata["cities"])
+        self._city_ids = {city: city_id for city_id, city in enumerate(self.cities)}
+
+        self.city_ids = snapshot.city_ids
+        self.competence_masks = snapshot.competence_masks
+        self.has_competences = np.array(
+            [bool(competences) for competences in metadata["competences"]], dtype=bool
+        )[snapshot.competence_ids] if snapshot.count else np.zeros(0, dtype=bool)
+        self.years = snapshot.years
+
+        self._rules = None
+        self._factors = {}
+        self._experience_factors = {}
+        self._cache_lock = threading.RLock()
+        self._positions = None
+        self._sync_rules()
+
+    def _profile_keys(self):
+        """Identifiants lus dans les tables de chaînes (avant tout upsert)."""
+        return [self.snapshot.profile_key(index) for index in range(self.snapshot.count)]
+
+    def _bonus_column(self, rules):
+        """
+        Bonus de chaque profil : calculé une fois par liste de compétences
+        distincte pour l'instantané, profil par profil pour les ajouts.
+        """
+        per_list = np.array(
+            [rules.bonus_total(competences) for competences in self.snapshot.metadata["competences"]],
+            dtype=np.float64
+        )
+        bonus = per_list[self.snapshot.competence_ids] if self.snapshot.count else np.zeros(0)
+        changed = list(self.profils.replaced.items())
+        changed += [(self.snapshot.count + i, profil) for i, profil in enumerate(self.profils.added)]
+        if changed:
+            bonus = np.concatenate([bonus, np.zeros(len(self.profils.added))])
+            for index, profil in changed:
+                bonus[index] = rules.bonus_total(profil.get("competences", []))
+        return bonus
+
+
+def load_snapshot_table(path=PROFILE_SNAPSHOT_PATH, store_path=PROFILE_STORE_PATH, json_dir=JSON_DIR):
+    """
+    Ouvre l'instantané des profils en table de scoring, après l'avoir
+    (re)construit si besoin : absent, d'une autre version, ou plus ancien
+    que la source des profils.
+
+    Args:
+        path: Chemin de l'instantané
+        store_path: Store consolidé (source prioritaire)
+        json_dir: Dossier des profils JSON (source de repli)
+
+    Returns:
+        Objet SnapshotTable, utilisable partout où une ProfileTable l'est
+    """
+    source = source_signature(store_path, json_dir)
+    snapshot = None
+    if os.path.exists(path):
+        try:
+            snapshot = Snapshot(path)
+        except (ValueError, KeyError, struct.error) as e:
+            logger.warning(f"Instantané {path} illisible ({e}), reconstruction")
+        else:
+            if snapshot.metadata.get("source") != source:
+                logger.info(f"Source des profils modifiée, reconstruction de {path}")
+                snapshot = None
+
+    if snapshot is None:
+        write_snapshot(load_all_profiles(store_path, json_dir), path, source)
+        snapshot = Snapshot(path)
+    return SnapshotTable(snapshot)
@@ -0,0 +1,81 @@
+"""
+Suivi incrémental de la source des profils.
+Une application déjà chargée vérifie à moindre coût (signature : taille et
+date du store, ou nombre de fichiers et date la plus récente du dossier
+JSON) si des profils ont été ajoutés, et ne lit que ceux-là.
+"""
+import os
+
+from aag.config import JSON_DIR, PROFILE_STORE_PATH
+from aag.utils.io import load_json
+from aag.utils.logger import logger
+from .profile_store import read_store_from
+from .snapshot import source_signature
+
+
+class ProfileSourceWatcher:
+    """
+    Détecte les profils ajoutés ou modifiés depuis une signature connue
+    (par exemple celle de l'instantané chargé au démarrage).
+
+    - Store JSON Lines : seules les lignes écrites après la dernière
+      position lue sont décodées.
+    - Dossier JSON : seuls les fichiers plus récents que la dernière
+      vérification sont relus.
+
+    Un rechargement complet est demandé quand un ajout ne suffit pas à
+    décrire le changement : store réécrit (compact_store, import),
+    fichiers JSON supprimés, store créé à la place du dossier.
+    """
+
+    def __init__(self, signature, store_path=PROFILE_STORE_PATH, json_dir=JSON_DIR):
+        """
+        Args:
+            signature: Signature de la source déjà chargée (snapshot.source_signature)
+            store_path: Chemin du store consolidé
+            json_dir: Dossier des profils JSON
+        """
+        self.signature = signature
+        self.store_path = store_path
+        self.json_dir = json_dir
+
+    def poll(self):
+        """
+        Lit les profils ajoutés ou modifiés depuis l'appel précédent.
+
+        Returns:
+            Liste de dictionnaires profils (vide si rien n'a changé), ou None
+            si la source doit être rechargée entièrement
+        """
+        current = source_signature(self.store_path, self.json_dir)
+        if current == self.signature:
+            return []
+        previous = self.signature
+
+        if "store" in current:
+            if ("store" not in previous or current["inode"] != previous["inode"]
+                    or current["taille"] <= previous["taille"]):
+                return None
+            profils, end = read_store_from(self.store_path, previous["taille"])
+            # Une ligne en cours d'écriture sera relue au prochain appel
+            self.signature = dict(current, taille=end)
+            return profils
+
+        if "dossier" not in previous or current["fichiers"] < previous["fichiers"]:
+            return None
+        profils = []
+        with os.scandir(self.json_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.stat().st_mtime_ns > previous["mtime_ns"]:
+                    try:
+                        profil = load_json(entry.path)
+                    except (OSError, ValueError) as e:
+                        logger.error(f"Erreur lors du chargement de {entry.name}: {e}")
+                        continue
+                    profil.setdefault("fichier_source", entry.name)
+                    profils.append(profil)
+        if len(profils) < current["fichiers"] - previous["fichiers"]:
+            # Fichiers ajoutés avec une date ancienne (copie qui la conserve)
+            return None
+        self.signature = current
+        return profils
@@ -4,6 +4,8 @@ Dashboard de matching candidats / missions B2B
 """
 import os
 import sys
+import threading
+import time
 
 # Ajoute le dossier src au chemin Python
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
@@ -11,7 +13,13 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from aag.scoring.scorer import calculate_match, rank_candidates
+from aag.config import (
+    DEFAULT_PAGE_SIZE, PAGE_SIZES, PROFILE_POLL_INTERVAL, UPLOAD_POLL_INTERVAL
+)
+from aag.ingestion.background import IngestionJob
+from aag.scoring.scorer import calculate_match, explain_result, rank_page
+from aag.storage.snapshot import load_snapshot_table
+from aag.storage.watcher import ProfileSourceWatcher
 from aag.utils.io import load_json
 
 
@@ -250,18 +258,37 @@ st.markdown(f"""
 # =============================================================================
 # CHARGEMENT DES DONNEES
 # =============================================================================
-@st.cache_data
-def load_profiles(json_dir="data/samples_json/"):
-    profils = []
-    if not os.path.exists(json_dir):
-        return profils
-    for filename in os.listdir(json_dir):
-        if filename.endswith(".json"):
-            filepath = os.path.join(json_dir, filename)
-            profil = load_json(filepath)
-            profil["fichier_source"] = filename
-            profils.append(profil)
-    return profils
+@st.cache_resource
+def load_profile_table():
+    # Table colonnaire conservee entre les reruns : les facteurs de criteres
+    # y sont mis en cache par (ville cible, competence requise), et deplacer
+    # un curseur de poids ne fait qu'une somme ponderee.
+    # Ses colonnes sont celles de l'instantane binaire data/profiles.snap,
+    # reconstruit si le store ou les JSON ont change
+    table = load_snapshot_table(json_dir="data/samples_json/")
+    return {
+        "table": table,
+        "watcher": ProfileSourceWatcher(table.snapshot.metadata["source"], json_dir="data/samples_json/"),
+        # Partage entre les sessions : mise a jour et scoring sous verrou
+        "lock": threading.Lock(),
+        "checked": time.monotonic(),
+    }
+
+
+def refresh_profile_table(state):
+    # Ajoute a la table les profils ingeres depuis le chargement, au plus
+    # une verification toutes les PROFILE_POLL_INTERVAL secondes ; si la
+    # source a ete reecrite, tout est recharge
+    if time.monotonic() - state["checked"] < PROFILE_POLL_INTERVAL:
+        return state
+    state["checked"] = time.monotonic()
+    changes = state["watcher"].poll()
+    if changes is None:
+        load_profile_table.clear()
+        return load_profile_table()
+    if changes:
+        state["table"].upsert(changes)
+    return state
 
 
 def load_besoin(path="data/besoin.json"):
@@ -323,6 +350,65 @@ if total_poids != 100:
 else:
     st.sidebar.success(f"Total des poids : 100/100")
 
+st.sidebar.markdown("---")
+st.sidebar.markdown("##### Affichage")
+
+page_size = st.sidebar.selectbox("Candidats par page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+
+st.sidebar.markdown("---")
+st.sidebar.markdown("##### Ajouter des CV")
+
+uploaded_files = st.sidebar.file_uploader("CV au format PDF", type="pdf", accept_multiple_files=True)
+ingestion_running = "ingestion_job" in st.session_state
+
+if st.sidebar.button("Analyser les CV", disabled=not uploaded_files or ingestion_running):
+    # Les PDF sont lus depuis leur contenu en memoire, sans fichier temporaire,
+    # et analyses par un pool de processus. Le lot enregistre lui-meme les
+    # profils (JSON, manifeste, store, recherche) : fermer l'onglet ne les
+    # perd pas, ils rejoignent la table au prochain passage du watcher
+    st.session_state["ingestion_job"] = IngestionJob(
+        [(os.path.basename(f.name), f.getvalue()) for f in uploaded_files], output_dir="data/samples_json/"
+    )
+    st.session_state["ingestion_added"] = 0
+    st.session_state["ingestion_errors"] = []
+    ingestion_running = True
+
+
+@st.fragment(run_every=UPLOAD_POLL_INTERVAL if ingestion_running else None)
+def show_ingestion_progress():
+    # Seul ce fragment est reexecute pendant l'analyse : l'interface reste
+    # utilisable et les profils extraits rejoignent la table au fil de l'eau
+    job = st.session_state.get("ingestion_job")
+    if job is None:
+        if "ingestion_added" in st.session_state:
+            st.success(f"{st.session_state['ingestion_added']} profil(s) ajoute(s)")
+            for error in st.session_state["ingestion_errors"]:
+                st.warning(error)
+        return
+
+    # Etat lu avant la releve : un lot termine n'a plus de resultat en attente
+    finished = job.finished
+    results = job.poll()
+    profiles = [r["profil"] for r in results if r["profil"] is not None]
+    if profiles:
+        state = load_profile_table()
+        with state["lock"]:
+            state["table"].upsert(profiles)
+    st.session_state["ingestion_added"] += len(profiles)
+    st.session_state["ingestion_errors"] += [
+        f"{r['fichier']} : {r['erreur']}" for r in results if r["profil"] is None
+    ]
+    st.progress(job.done / job.total, text=f"{job.done}/{job.total} CV analyses")
+
+    if finished:
+        # Classement recalcule avec les nouveaux profils
+        del st.session_state["ingestion_job"]
+        st.rerun()
+
+
+with st.sidebar:
+    show_ingestion_progress()
+
 besoin = {
     "id_mission": id_mission,
     "ville_cible": ville_cible,
@@ -346,10 +432,13 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-profils = load_profiles()
+profile_state = load_profile_table()
+with profile_state["lock"]:
+    profile_state = refresh_profile_table(profile_state)
+profils = profile_state["table"]
 
 if not profils:
-    st.error("Aucun profil trouve dans `data/samples_json/`. Lancez d'abord `python scripts/run_ingestion.py`.")
+    st.error("Aucun profil trouve dans `data/samples_json/`. Lancez d'abord `python scripts/run_ingestion.py` ou ajoutez des CV depuis la barre laterale.")
     st.stop()
 
 # KPIs
@@ -378,10 +467,23 @@ st.markdown(f"""
 # =============================================================================
 # CLASSEMENT
 # =============================================================================
-results = rank_candidates(profils, besoin)
-
 st.markdown('<div class="stitle">Classement des candidats</div>', unsafe_allow_html=True)
 
+# Seule la page affichee est classee en detail (cartes, graphique, tableau) ;
+# les indicateurs du resume portent sur les scores de tous les profils
+nb_pages = max(1, -(-len(profils) // page_size))
+page = st.number_input(f"Page (sur {nb_pages})", min_value=1, max_value=nb_pages, value=1, step=1)
+start = (page - 1) * page_size
+
+with profile_state["lock"]:
+    # Scores calcules une seule fois ; seuls les candidats de la page (et le
+    # meilleur, pour la recommandation) deviennent des entrees du classement
+    all_scores = profils.scores(besoin)
+    results = rank_page(profils, besoin, all_scores, start, start + page_size, with_justifications=False)
+    best = results[:1] if start == 0 else rank_page(profils, besoin, all_scores, 0, 1, with_justifications=False)
+
+st.caption(f"Candidats {start + 1} a {start + len(results)} sur {len(profils)}")
+
 
 def _score_color(score):
     if score >= 80:
@@ -400,7 +502,7 @@ for i, res in enumerate(results):
     col_rank, col_info, col_score = st.columns([0.6, 5, 1.2])
 
     with col_rank:
-        st.markdown(f"**#{i + 1}**")
+        st.markdown(f"**#{start + i + 1}**")
 
     with col_info:
         st.markdown(f"**{res['nom']}**")
@@ -412,7 +514,7 @@ for i, res in enumerate(results):
         st.markdown(f'<span class="sbadge {cls}">{label}</span>', unsafe_allow_html=True)
 
     with st.expander(f"Details du scoring - {res['nom']}"):
-        for j in res["justifications"]:
+        for j in explain_result(res, besoin):
             st.markdown(f"- {j}")
 
     st.divider()
@@ -479,10 +581,10 @@ st.markdown('</div>', unsafe_allow_html=True)
 # =============================================================================
 st.markdown('<div class="stitle">Resume pour decision</div>', unsafe_allow_html=True)
 
-top = results[0] if results else None
-nb_reco = sum(1 for r in results if r["score"] >= 80)
-nb_consider = sum(1 for r in results if 50 <= r["score"] < 80)
-nb_low = sum(1 for r in results if r["score"] < 50)
+top = best[0] if best else None
+nb_reco = int((all_scores >= 80).sum())
+nb_consider = int(((all_scores >= 50) & (all_scores < 80)).sum())
+nb_low = int((all_scores < 50).sum())
 
 st.markdown(f"""
 <div class="srow">
@@ -511,7 +613,7 @@ if top and top["score"] >= 50:
 
     df = pd.DataFrame([
         {
-            "Rang": i + 1,
+            "Rang": start + i + 1,
             "Nom": r["nom"],
             "Ville": r["ville"],
             "Experience": f"{r['experience']} ans",
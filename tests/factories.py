@@ -0,0 +1,46 @@
+"""
+Profils et besoins de test partages par les suites de tests.
+"""
+
+VILLES = ["Marseille", "marseille", "Aix-en-Provence", "Aubagne", "Lyon", "Paris", "Toulon", "Évry", "Inconnue"]
+COMPETENCES = ["moteur", "freinage", "electrique", "climatisation", "vul", "pneus", "diagnostic"]
+
+
+def profil(nom, fichier, experience=3, ville="Marseille", competences=("moteur",)):
+    """Profil minimal identifie par son fichier source."""
+    return {
+        "nom": nom,
+        "ville": ville,
+        "competences": list(competences),
+        "experience_annees": experience,
+        "fichier_source": fichier
+    }
+
+
+def random_profils(rng, count):
+    """
+    Profils aléatoires couvrant toutes les branches du scoring : villes en
+    casse mixte, compétences en doublon ou hors SKILLS_DB, expérience
+    décimale, confiance de ville optionnelle.
+    """
+    profils = []
+    for i in range(count):
+        data = profil(f"Candidat {i} é", f"CV_{i}.pdf", rng.choice([0, 1, 2, 3, 5, 7, 12, 2.5]))
+        data["ville"] = rng.choice(VILLES)
+        data["competences"] = rng.sample(COMPETENCES, rng.randint(0, 4)) + rng.choice([[], [], ["vul"]])
+        if rng.random() < 0.5:
+            data["ville_confiance"] = rng.choice([1.0, 0.8, 0.5])
+        profils.append(data)
+    return profils
+
+
+def random_besoin(rng):
+    """Besoin aléatoire, poids entiers ou décimaux."""
+    return {
+        "ville_cible": rng.choice(VILLES + ["MARSEILLE", "Nice"]),
+        "competence_requise": rng.choice(COMPETENCES + ["carrosserie"]),
+        "experience_min": rng.choice([0, 1, 3, 7]),
+        "poids_ville": rng.choice([0, 33, 50, 12.5]),
+        "poids_competence": rng.choice([0, 30, 17, 45.3]),
+        "poids_experience": rng.choice([0, 20, 11, 7.7]),
+    }
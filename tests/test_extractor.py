@@ -3,6 +3,8 @@ Tests unitaires pour le module d'extraction de profils.
 """
 import sys
 import os
+import tempfile
+import tracemalloc
 import unittest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
@@ -11,10 +13,16 @@ from aag.ingestion.extractor import (
     extract_name,
     extract_skills,
     extract_city,
+    extract_city_details,
     extract_experience,
-    extract_profile_data
+    extract_profile_data,
+    SKILLS_DB,
+    VILLES_CIBLES
 )
+from aag.ingestion.gazetteer import Gazetteer
+from aag.ingestion.matcher import KeywordMatcher
 from aag.ingestion.text_cleaner import clean_text
+from aag.utils.io import load_json
 
 
 class TestCleanText(unittest.TestCase):
@@ -49,6 +57,24 @@ class TestExtractName(unittest.TestCase):
         result = extract_name(text)
         self.assertEqual(result, "Nom Inconnu")
 
+    def test_cinq_premieres_lignes_seulement(self):
+        text = "cv\n\nmecanicien\nauto\nmarseille\nMARC DURAND"
+        self.assertEqual(extract_name(text), "Nom Inconnu")
+        self.assertEqual(extract_name("\n\n  " + text[3:]), "Marc Durand")
+
+    def test_texte_long_non_parcouru(self):
+        # Nom en première ligne d'un texte de ~8 Mo : le reste du texte
+        # n'est ni copié ni découpé en lignes
+        text = "  MARC DURAND\n" + "ligne du cv sans nom\n" * 400000
+        tracemalloc.start()
+        try:
+            result = extract_name(text)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(result, "Marc Durand")
+        self.assertLess(peak, 64 * 1024)
+
 
 class TestExtractSkills(unittest.TestCase):
     """Tests pour l'extraction des competences."""
@@ -97,6 +123,59 @@ class TestExtractCity(unittest.TestCase):
         self.assertEqual(result, "Inconnue")
 
 
+class TestKeywordMatcher(unittest.TestCase):
+    """Tests pour l'automate de recherche de mots-cles."""
+
+    def test_occurrences_chevauchantes(self):
+        matcher = KeywordMatcher([("frein", "f"), ("freinage", "fa"), ("age", "a")])
+        matches = sorted(matcher.iter_matches("le freinage"))
+        self.assertEqual(matches, [(3, 8, "f"), (3, 11, "fa"), (8, 11, "a")])
+
+    def test_mots_entiers(self):
+        matcher = KeywordMatcher([("clim", "climatisation")])
+        self.assertEqual(matcher.find_values("climatisation"), {"climatisation"})
+        self.assertEqual(matcher.find_values("climatisation", word_boundary=True), set())
+        self.assertEqual(matcher.find_values("recharge clim.", word_boundary=True), {"climatisation"})
+
+    def test_grand_dictionnaire(self):
+        keywords = [(f"mot{i}", i) for i in range(500)] + [("frein", "f")]
+        matcher = KeywordMatcher(keywords)
+        self.assertEqual(matcher.find_values("le frein et mot42, mot7"), {"f", 42, 4, 7})
+
+    def test_identique_a_la_recherche_par_sous_chaine(self):
+        texts = [
+            "mecanicien vul a aix en provence, freinage abs et clim",
+            "electricien a toulon puis marseille, batterie hybride",
+            "pneumatique et géométrie a salon-de-provence",
+            "bonjour je suis disponible",
+        ]
+        for text in texts:
+            expected_skills = [
+                c for c, keywords in SKILLS_DB.items() if any(k in text for k in keywords)
+            ]
+            expected_city = next((v.title() for v in VILLES_CIBLES if v in text), "Inconnue")
+            self.assertEqual(extract_skills(text), expected_skills)
+            self.assertEqual(extract_city(text), expected_city)
+
+    def test_automate_sur_le_dictionnaire_reel(self):
+        # Dictionnaire de l'extracteur, sur les CV d'exemple : l'automate
+        # trouve exactement les mots-clés d'une recherche par sous-chaîne
+        keywords = [(k, c) for c, words in SKILLS_DB.items() for k in words]
+        keywords += [(ville, "ville") for ville in VILLES_CIBLES]
+        matcher = KeywordMatcher(keywords)
+        json_dir = os.path.join(os.path.dirname(__file__), "..", "data", "samples_json")
+        texts = [
+            clean_text(load_json(os.path.join(json_dir, f)).get("texte_source", ""))
+            for f in sorted(os.listdir(json_dir)) if f.endswith(".json")
+        ]
+        self.assertTrue(texts)
+        for text in texts:
+            expected = {value for keyword, value in keywords if keyword in text}
+            found = {value for _, _, value in matcher.iter_matches(text)}
+            self.assertEqual(found, expected)
+            self.assertEqual(matcher.find_values(text), expected)
+
+
 class TestExtractExperience(unittest.TestCase):
     """Tests pour l'extraction de l'experience."""
 
@@ -112,6 +191,116 @@ class TestExtractExperience(unittest.TestCase):
         result = extract_experience("debutant sans mention d'annees")
         self.assertEqual(result, 0)
 
+    def test_plusieurs_mentions_max(self):
+        result = extract_experience("depuis 4 ans en atelier, 7 années en concession")
+        self.assertEqual(result, 7)
+
+    def test_mentions_qui_se_chevauchent(self):
+        result = extract_experience("5 ans d'expérience : 9")
+        self.assertEqual(result, 9)
+
+    def test_valeurs_aberrantes_ignorees(self):
+        self.assertEqual(extract_experience("55 ans d'expérience"), 0)
+        self.assertEqual(extract_experience("150 années"), 0)
+
+
+class TestGazetteer(unittest.TestCase):
+    """Tests pour la localisation par le référentiel des communes."""
+
+    ROWS = [
+        ("MARSEILLE 01", "13001"),
+        ("MARSEILLE 02", "13002"),
+        ("ST ETIENNE", "42000"),
+        ("VILLEURBANNE", "69100"),
+        ("SAINT MARTIN", "04000"),
+        ("ST MARTIN DE CRAU", "13310"),
+        ("Y", "80190"),
+        ("RENNES", "35000"),
+        ("EVRY COURCOURONNES", "91000"),
+        ("Évry-Courcouronnes", "91000"),
+        ("L'ISLE SUR LA SORGUE", "84800"),
+        ("ORANGE", "84100"),
+        ("VENTE", "59270"),
+    ]
+
+    def setUp(self):
+        self.gazetteer = Gazetteer.from_rows(self.ROWS)
+
+    def test_regroupement_arrondissements(self):
+        index = self.gazetteer.lookup("Marseille")
+        self.assertEqual(self.gazetteer.postal_codes(index), {13001, 13002})
+
+    def test_nom_confirme_par_code_postal(self):
+        text = clean_text("Jean Dupont\n12 rue Victor Hugo, 42000 Saint-Étienne")
+        self.assertEqual(extract_city_details(text, gazetteer=self.gazetteer), ("Saint Etienne", 0.95))
+
+    def test_code_postal_seul(self):
+        text = clean_text("Domicile : 69100")
+        self.assertEqual(extract_city_details(text, gazetteer=self.gazetteer), ("Villeurbanne", 0.7))
+
+    def test_nom_le_plus_long(self):
+        text = clean_text("Habite à St Martin de Crau")
+        self.assertEqual(extract_city_details(text, gazetteer=self.gazetteer)[0], "Saint Martin de Crau")
+
+    def test_code_postal_hors_adresse_ignore(self):
+        text = clean_text("Prétentions salariales : 35000 euros brut annuel")
+        self.assertEqual(extract_city_details(text, gazetteer=self.gazetteer), ("Inconnue", 0.0))
+
+    def test_code_postal_accole_a_un_nom(self):
+        names, codes = self.gazetteer.find(clean_text("Mutation possible vers 35000 Rennes"))
+        self.assertEqual([code for _, code, _ in codes], [35000])
+
+    def test_noms_d_affichage(self):
+        self.assertEqual(self.gazetteer.displays[self.gazetteer.lookup("Evry Courcouronnes")], "Évry-Courcouronnes")
+        self.assertEqual(self.gazetteer.displays[self.gazetteer.lookup("l'isle sur la sorgue")], "L'Isle sur la Sorgue")
+        self.assertEqual(self.gazetteer.displays[self.gazetteer.lookup("Marseille")], "Marseille")
+
+    def test_mot_court_ignore(self):
+        text = clean_text("il y a un garage")
+        self.assertEqual(extract_city_details(text, gazetteer=self.gazetteer), ("Inconnue", 0.0))
+
+    def test_mot_courant_hors_adresse_ignore(self):
+        for text in ("vente de pieces auto", "technicien chez orange depuis 3 ans"):
+            with self.subTest(text=text):
+                self.assertEqual(extract_city_details(clean_text(text), gazetteer=self.gazetteer), ("Inconnue", 0.0))
+
+    def test_nom_d_un_mot_dans_une_adresse(self):
+        self.assertEqual(
+            extract_city_details(clean_text("Adresse : 3 place de la Mairie, Orange"), gazetteer=self.gazetteer),
+            ("Orange", 0.6)
+        )
+        self.assertEqual(
+            extract_city_details(clean_text("Technicien chez Orange, 84100 Orange"), gazetteer=self.gazetteer),
+            ("Orange", 0.95)
+        )
+        # Nom court : même dans une adresse, confiance insuffisante
+        self.assertEqual(
+            extract_city_details(clean_text("Domicile : Vente"), gazetteer=self.gazetteer), ("Inconnue", 0.0)
+        )
+
+    def test_ville_cible_prioritaire(self):
+        self.assertEqual(
+            extract_city_details(clean_text("Mécanicien à Marseille 13002"), gazetteer=self.gazetteer),
+            ("Marseille", 1.0)
+        )
+        self.assertEqual(
+            extract_city_details(clean_text("Mécanicien à Marseille"), gazetteer=self.gazetteer),
+            ("Marseille", 0.8)
+        )
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "gazetteer.bin")
+            self.gazetteer.save(path)
+            loaded = Gazetteer.load(path)
+        self.assertEqual(loaded.keys, self.gazetteer.keys)
+        self.assertEqual(loaded.displays, self.gazetteer.displays)
+        self.assertEqual(loaded.commune_for_code(69100), self.gazetteer.lookup("Villeurbanne"))
+
+    def test_commune_absente(self):
+        empty = Gazetteer.from_rows([])
+        self.assertEqual(extract_city_details(clean_text("Habite à Villeurbanne"), gazetteer=empty), ("Inconnue", 0.0))
+
 
 class TestExtractProfileData(unittest.TestCase):
     """Tests pour l'extraction complete d'un profil."""
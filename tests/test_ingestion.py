@@ -0,0 +1,361 @@
+"""
+Tests unitaires pour le pipeline d'ingestion par lots.
+"""
+import sys
+import os
+import io
+import shutil
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.config import CV_DIR
+from aag.ingestion.background import IngestionJob
+from aag.ingestion.batch import extract_profiles_batch, ingest_pdfs, process_pdf, reextract_profiles
+from aag.ingestion.manifest import (
+    file_hash, load_manifest, plan_ingestion, record_entry, save_manifest
+)
+from aag.ingestion.extractor import extract_profile_data
+from aag.ingestion.pdf_reader import available_backends, get_backend_name, iter_pdf_pages, read_pdf
+from aag.ingestion.sandbox import add_to_quarantine, load_quarantine, read_pdf_isolated, save_quarantine
+from aag.ingestion.text_cache import load_text, save_text
+from aag.storage.profile_store import load_store
+from aag.storage.search_db import open_search_db, search_profiles
+from aag.utils.io import load_json
+
+
+SAMPLE_PDFS = sorted(
+    os.path.join(CV_DIR, f) for f in os.listdir(CV_DIR) if f.lower().endswith(".pdf")
+)
+
+
+class TestReadPdf(unittest.TestCase):
+    """Tests pour la lecture paresseuse des PDF."""
+
+    def test_texte_identique_aux_pages(self):
+        pages = list(iter_pdf_pages(SAMPLE_PDFS[0]))
+        self.assertEqual(read_pdf(SAMPLE_PDFS[0]), "".join(p + "\n" for p in pages))
+
+    def test_budget_de_pages(self):
+        self.assertEqual(len(list(iter_pdf_pages(SAMPLE_PDFS[0], max_pages=1))), 1)
+
+    def test_fichier_trop_volumineux(self):
+        self.assertIsNone(read_pdf(SAMPLE_PDFS[0], max_bytes=10))
+
+    def test_fichier_inexistant(self):
+        self.assertIsNone(read_pdf("/chemin/inexistant.pdf"))
+
+    def test_contenu_en_memoire(self):
+        with open(SAMPLE_PDFS[0], "rb") as f:
+            data = f.read()
+        self.assertEqual(read_pdf(data), read_pdf(SAMPLE_PDFS[0]))
+        self.assertEqual(read_pdf(io.BytesIO(data)), read_pdf(SAMPLE_PDFS[0]))
+        self.assertIsNone(read_pdf(data, max_bytes=10))
+        self.assertIsNone(read_pdf(b"pas un pdf"))
+
+    def test_moteur_inconnu(self):
+        with self.assertRaises(ValueError):
+            get_backend_name("inconnu")
+
+    def test_moteurs_profils_identiques(self):
+        for pdf_path in SAMPLE_PDFS:
+            reference = extract_profile_data(read_pdf(pdf_path, backend="pypdf2"))
+            for backend in available_backends():
+                with self.subTest(backend=backend, pdf=pdf_path):
+                    profile = extract_profile_data(read_pdf(pdf_path, backend=backend))
+                    self.assertEqual(profile, reference)
+
+
+@unittest.skipUnless(hasattr(os, "mkfifo"), "necessite os.mkfifo")
+class TestReadPdfIsolated(unittest.TestCase):
+    """Tests pour la lecture isolee (un FIFO sans ecrivain bloque la lecture indefiniment)."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.fifo = os.path.join(self.tmp, "bloquant.pdf")
+        os.mkfifo(self.fifo)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_lecture_normale(self):
+        text, reason = read_pdf_isolated(SAMPLE_PDFS[0], timeout=30, max_rss_mb=1024)
+        self.assertIsNone(reason)
+        self.assertEqual(text, read_pdf(SAMPLE_PDFS[0]))
+
+    def test_delai_depasse(self):
+        text, reason = read_pdf_isolated(self.fifo, timeout=0.3, max_rss_mb=1024)
+        self.assertIsNone(text)
+        self.assertIn("délai", reason)
+
+    def test_memoire_depassee(self):
+        text, reason = read_pdf_isolated(self.fifo, timeout=30, max_rss_mb=1)
+        self.assertIsNone(text)
+        if os.path.exists("/proc/self/status"):
+            self.assertIn("mémoire", reason)
+
+
+class TestQuarantine(unittest.TestCase):
+    """Tests pour la sauvegarde de la liste de quarantaine."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "quarantaine.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_sauvegarde_puis_chargement(self):
+        quarantine = {}
+        add_to_quarantine(quarantine, "cv.pdf", "délai dépassé (5 s)", "abc")
+        save_quarantine(quarantine, self.path)
+        self.assertEqual(load_quarantine(self.path), quarantine)
+        self.assertEqual(os.listdir(self.tmp), ["quarantaine.json"])
+
+    def test_ecriture_interrompue(self):
+        # Une écriture interrompue laisse la liste précédente intacte
+        quarantine = {}
+        add_to_quarantine(quarantine, "cv.pdf", "délai dépassé (5 s)", "abc")
+        save_quarantine(quarantine, self.path)
+        # Valeur non sérialisable : json.dump échoue en cours d'écriture
+        add_to_quarantine(quarantine, "autre.pdf", "mémoire dépassée", object())
+        with self.assertRaises(TypeError):
+            save_quarantine(quarantine, self.path)
+        self.assertEqual(list(load_quarantine(self.path)), ["cv.pdf"])
+
+
+class TestIngestPdfs(unittest.TestCase):
+    """Tests pour l'ingestion parallele."""
+
+    def test_fichier_invalide_isole(self):
+        result = process_pdf("/chemin/inexistant.pdf")
+        self.assertIsNone(result["profil"])
+        self.assertIsNotNone(result["erreur"])
+
+    def test_ordre_stable_en_parallele(self):
+        paths = SAMPLE_PDFS + ["/chemin/inexistant.pdf"]
+        results = list(ingest_pdfs(paths, workers=2))
+        self.assertEqual([r["fichier"] for r in results], [os.path.basename(p) for p in paths])
+        self.assertIsNotNone(results[-1]["erreur"])
+
+    def test_parallele_identique_au_sequentiel(self):
+        sequentiel = [r["profil"] for r in ingest_pdfs(SAMPLE_PDFS, workers=1)]
+        parallele = [r["profil"] for r in ingest_pdfs(SAMPLE_PDFS, workers=2)]
+        self.assertEqual(sequentiel, parallele)
+
+
+class TestIngestionJob(unittest.TestCase):
+    """Tests pour l'analyse en tache de fond de CV en memoire."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.json_dir = os.path.join(self.tmp, "json")
+        self.cache_dir = os.path.join(self.tmp, "text_cache")
+        self.manifest_path = os.path.join(self.tmp, "manifest.json")
+        self.store_path = os.path.join(self.tmp, "profiles.jsonl")
+        self.db_path = os.path.join(self.tmp, "profiles.db")
+        self.uploads = []
+        for pdf_path in SAMPLE_PDFS:
+            with open(pdf_path, "rb") as f:
+                self.uploads.append((os.path.basename(pdf_path), f.read()))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _job(self, uploads):
+        return IngestionJob(
+            uploads, self.json_dir, workers=2, cache_dir=self.cache_dir, manifest_path=self.manifest_path,
+            store_path=self.store_path, search_db_path=self.db_path
+        )
+
+    def _run(self, uploads):
+        job = self._job(uploads)
+        self.assertEqual(job.total, len(uploads))
+        results = []
+        deadline = time.monotonic() + 60
+        while not job.finished and time.monotonic() < deadline:
+            results.extend(job.poll())
+            time.sleep(0.01)
+        self.assertTrue(job.finished)
+        results.extend(job.poll())
+        self.assertEqual(job.done, len(uploads))
+        return results
+
+    def test_identique_a_process_pdf(self):
+        results = self._run(self.uploads + [("invalide.pdf", b"pas un pdf")])
+
+        by_name = {r["fichier"]: r for r in results}
+        self.assertEqual(len(by_name), len(SAMPLE_PDFS) + 1)
+        self.assertIsNotNone(by_name["invalide.pdf"]["erreur"])
+        for pdf_path in SAMPLE_PDFS:
+            with self.subTest(pdf=pdf_path):
+                expected = dict(process_pdf(pdf_path)["profil"], fichier_source=os.path.basename(pdf_path))
+                self.assertEqual(by_name[os.path.basename(pdf_path)]["profil"], expected)
+
+    def test_enregistrement_sans_releve(self):
+        # Store et base de recherche existants : le lot les complete
+        open(self.store_path, "w").close()
+        open_search_db(self.db_path).close()
+        job = self._job(self.uploads)
+        # Aucun poll() : le lot enregistre lui-meme les profils
+        self.assertTrue(job.wait(60))
+
+        manifest = load_manifest(self.manifest_path)
+        stored = {p["fichier_source"]: p for p in load_store(self.store_path)}
+        conn = open_search_db(self.db_path)
+        try:
+            indexed = {p["fichier_source"] for p in search_profiles(conn, limit=100)}
+        finally:
+            conn.close()
+        for pdf_path in SAMPLE_PDFS:
+            filename = os.path.basename(pdf_path)
+            with self.subTest(pdf=filename):
+                entry = manifest["fichiers"][filename]
+                self.assertEqual(entry["hash"], file_hash(pdf_path))
+                self.assertEqual(entry["taille"], os.path.getsize(pdf_path))
+                self.assertEqual(load_text(entry["hash"], self.cache_dir), read_pdf(pdf_path))
+                profile = load_json(os.path.join(self.json_dir, entry["json"]))
+                self.assertEqual(profile["fichier_source"], filename)
+                self.assertEqual(stored[filename], profile)
+                self.assertIn(filename, indexed)
+        self.assertEqual(len(job.poll()), len(self.uploads))
+
+    def test_manifeste_reconnait_le_cv_depose_ensuite(self):
+        self.assertTrue(self._job(self.uploads[:1]).wait(60))
+        manifest = load_manifest(self.manifest_path)
+        to_process, unchanged = plan_ingestion(
+            SAMPLE_PDFS[:1], manifest, self.json_dir, backend=get_backend_name()
+        )
+        self.assertEqual((to_process, unchanged), ([], SAMPLE_PDFS[:1]))
+
+    def test_lot_vide(self):
+        job = self._job([])
+        self.assertTrue(job.finished)
+        self.assertTrue(job.wait())
+        self.assertEqual(job.poll(), [])
+        self.assertFalse(os.path.exists(self.manifest_path))
+
+
+class TestExtractProfilesBatch(unittest.TestCase):
+    """Tests pour l'extraction de profils par lots."""
+
+    TEXTS = [
+        "Marc Durand\nMecanicien a Marseille\n10 ans d'experience\nExpert moteur et freinage",
+        "",
+        "Julie Martin\nElectricienne auto a Lyon\n3 ans d'experience\nDiagnostic valise",
+    ]
+
+    def _items(self, count):
+        return ((f"cv{i}", self.TEXTS[i % len(self.TEXTS)]) for i in range(count))
+
+    def test_identique_a_extract_profile_data(self):
+        results = list(extract_profiles_batch(self._items(10), chunk_size=4))
+        self.assertEqual([source_id for source_id, _ in results], [f"cv{i}" for i in range(10)])
+        for i, (_, profile) in enumerate(results):
+            self.assertEqual(profile, extract_profile_data(self.TEXTS[i % len(self.TEXTS)]))
+
+    def test_parallele_identique_au_sequentiel(self):
+        sequentiel = list(extract_profiles_batch(self._items(50), chunk_size=7))
+        parallele = list(extract_profiles_batch(self._items(50), chunk_size=7, workers=2))
+        self.assertEqual(sequentiel, parallele)
+
+    def test_flux_paresseux(self):
+        consumed = []
+
+        def items():
+            for i in range(1000):
+                consumed.append(i)
+                yield f"cv{i}", self.TEXTS[0]
+
+        stream = extract_profiles_batch(items(), chunk_size=10)
+        next(stream)
+        self.assertEqual(len(consumed), 10)
+
+
+class TestManifest(unittest.TestCase):
+    """Tests pour le manifeste d'ingestion incrementale."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.pdf = os.path.join(self.tmp, "cv.pdf")
+        shutil.copy(SAMPLE_PDFS[0], self.pdf)
+        with open(os.path.join(self.tmp, "cv.json"), "w") as f:
+            f.write("{}")
+        self.manifest_path = os.path.join(self.tmp, "manifest.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _plan(self, version="v1"):
+        manifest = load_manifest(self.manifest_path)
+        return manifest, plan_ingestion([self.pdf], manifest, self.tmp, version=version)
+
+    def _record(self, version="v1"):
+        manifest, (to_process, _) = self._plan(version)
+        for path, content_hash in to_process:
+            record_entry(manifest, path, content_hash, "cv.json", version)
+        save_manifest(manifest, self.manifest_path)
+
+    def test_nouveau_fichier_a_traiter(self):
+        _, (to_process, unchanged) = self._plan()
+        self.assertEqual(len(to_process), 1)
+        self.assertEqual(unchanged, [])
+
+    def test_fichier_inchange_ignore(self):
+        self._record()
+        _, (to_process, unchanged) = self._plan()
+        self.assertEqual(to_process, [])
+        self.assertEqual(unchanged, [self.pdf])
+
+    def test_fichier_touche_ignore(self):
+        self._record()
+        os.utime(self.pdf, ns=(0, 0))
+        _, (to_process, _) = self._plan()
+        self.assertEqual(to_process, [])
+
+    def test_contenu_modifie_retraite(self):
+        self._record()
+        with open(self.pdf, "ab") as f:
+            f.write(b"\n")
+        _, (to_process, _) = self._plan()
+        self.assertEqual(len(to_process), 1)
+
+    def test_dictionnaires_modifies_retraite(self):
+        self._record(version="v1")
+        _, (to_process, _) = self._plan(version="v2")
+        self.assertEqual(len(to_process), 1)
+
+
+
+class TestTextCache(unittest.TestCase):
+    """Tests pour le cache de texte brut."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_aller_retour(self):
+        save_text("abcdef", "Marc Durand\nMécanicien à Marseille", self.cache_dir)
+        self.assertEqual(load_text("abcdef", self.cache_dir), "Marc Durand\nMécanicien à Marseille")
+
+    def test_absent_du_cache(self):
+        self.assertIsNone(load_text("inconnu", self.cache_dir))
+
+    def test_reextraction_identique_a_l_ingestion(self):
+        pdf_path = SAMPLE_PDFS[0]
+        content_hash = file_hash(pdf_path)
+        result = process_pdf(pdf_path, content_hash, self.cache_dir)
+
+        entries = {result["fichier"]: {"hash": content_hash}, "absent.pdf": {"hash": "0000"}}
+        reextracted = list(reextract_profiles(entries, self.cache_dir))
+
+        self.assertEqual(reextracted[0]["profil"], result["profil"])
+        self.assertIsNotNone(reextracted[1]["erreur"])
+
+
+if __name__ == "__main__":
+    unittest.main()
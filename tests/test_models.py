@@ -0,0 +1,146 @@
+"""
+Tests unitaires pour les modeles de donnees compacts.
+"""
+import sys
+import os
+import random
+import threading
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.models import vocab
+from aag.models.besoin import Besoin
+from aag.models.compact import (
+    COMPETENCES,
+    CompactBesoin,
+    CompactProfil,
+    competences_to_mask,
+    intern_city,
+    mask_to_competences
+)
+from aag.models.vocab import city_key, city_name
+
+
+PROFIL_JSON = {
+    "nom": "Marc Durand",
+    "ville": "Marseille",
+    "ville_confiance": 0.8,
+    "competences": ["moteur", "electrique", "vul"],
+    "experience_annees": 10,
+    "texte_source": "marc durand mecanicien a marseille",
+    "fichier_source": "CV_Marc.json"
+}
+
+
+class TestMasqueCompetences(unittest.TestCase):
+    """Tests pour la conversion competences <-> masque de bits."""
+
+    def test_aller_retour(self):
+        mask, exact = competences_to_mask(["moteur", "vul"])
+        self.assertTrue(exact)
+        self.assertEqual(mask_to_competences(mask), ["moteur", "vul"])
+
+    def test_un_bit_par_categorie(self):
+        mask, _ = competences_to_mask(COMPETENCES)
+        self.assertEqual(mask, (1 << len(COMPETENCES)) - 1)
+
+    def test_liste_non_canonique(self):
+        self.assertFalse(competences_to_mask(["vul", "moteur"])[1])
+        self.assertFalse(competences_to_mask(["moteur", "moteur"])[1])
+        self.assertFalse(competences_to_mask(["soudure"])[1])
+
+
+class TestCompactProfil(unittest.TestCase):
+    """Tests pour le profil compact."""
+
+    def test_aller_retour_sans_perte(self):
+        self.assertEqual(CompactProfil.from_dict(PROFIL_JSON).to_dict(), PROFIL_JSON)
+
+    def test_champs_absents_non_ajoutes(self):
+        data = {"nom": "A", "ville": "Lyon", "competences": [], "experience_annees": 0}
+        self.assertEqual(CompactProfil.from_dict(data).to_dict(), data)
+
+    def test_competences_hors_masque_conservees(self):
+        data = dict(PROFIL_JSON, competences=["vul", "soudure", "moteur"])
+        profil = CompactProfil.from_dict(data)
+        self.assertEqual(profil.to_dict(), data)
+        self.assertTrue(profil.has_competence("soudure"))
+        self.assertTrue(profil.has_competence("vul"))
+        self.assertFalse(profil.has_competence("pneus"))
+
+    def test_ville_internee(self):
+        a = CompactProfil.from_dict(PROFIL_JSON)
+        b = CompactProfil.from_dict(dict(PROFIL_JSON, nom="Autre"))
+        self.assertEqual(a.ville_id, b.ville_id)
+        self.assertEqual(a.ville_id, intern_city("Marseille"))
+        self.assertNotEqual(intern_city("marseille"), intern_city("Marseille"))
+
+    def test_ville_internee_en_parallele(self):
+        villes = [f"Ville Parallele {i}" for i in range(300)]
+        barrier = threading.Barrier(4)
+        results = []
+
+        def worker(seed):
+            barrier.wait()
+            ids = {}
+            for ville in random.Random(seed).sample(villes, len(villes)):
+                ids[ville] = intern_city(ville)
+            results.append(ids)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(ids == results[0] for ids in results))
+        self.assertEqual(len(set(results[0].values())), len(villes))
+        for ville, city_id in results[0].items():
+            self.assertEqual(city_name(city_id), ville)
+            self.assertEqual(city_name(city_key(city_id)), ville.lower())
+
+    def test_nombre_de_villes_borne(self):
+        limit = vocab.MAX_VILLES
+        vocab.MAX_VILLES = len(vocab._CITY_NAMES) + 1
+        try:
+            intern_city("borne")
+            with self.assertRaises(ValueError):
+                intern_city("Borne Depassee")
+            self.assertEqual(intern_city("borne"), intern_city("borne"))
+        finally:
+            vocab.MAX_VILLES = limit
+
+    def test_pas_de_dict_d_instance(self):
+        self.assertFalse(hasattr(CompactProfil.from_dict(PROFIL_JSON), "__dict__"))
+
+
+class TestCompactBesoin(unittest.TestCase):
+    """Tests pour le besoin compact."""
+
+    def test_aller_retour_sans_perte(self):
+        data = {
+            "id_mission": "B2B-MRS-001",
+            "ville_cible": "Marseille",
+            "competence_requise": "electrique",
+            "experience_min": 3,
+            "type_mission": "B2B",
+            "urgence": "haute",
+            "poids_ville": 50,
+            "poids_competence": 30,
+            "poids_experience": 20
+        }
+        self.assertEqual(CompactBesoin.from_dict(data).to_dict(), data)
+
+    def test_compatible_avec_besoin(self):
+        besoin = Besoin("M1", "Lyon", "pneus", experience_min=2)
+        compact = CompactBesoin.from_dict(besoin.to_dict())
+        self.assertEqual(compact.to_dict(), besoin.to_dict())
+        self.assertEqual(compact.total_poids(), besoin.total_poids())
+
+    def test_masque_competence(self):
+        self.assertEqual(CompactBesoin("M1", "Lyon", "moteur").competence_mask, competences_to_mask(["moteur"])[0])
+        self.assertEqual(CompactBesoin("M1", "Lyon", "soudure").competence_mask, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
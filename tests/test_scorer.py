@@ -3,12 +3,25 @@ Tests unitaires pour le moteur de scoring.
 """
 import sys
 import os
+import random
+import threading
 import unittest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from aag.scoring.scorer import calculate_match, rank_candidates
-from aag.scoring.rules import get_experience_category, get_bonus_competences, is_priority_city
+from aag.models.besoin import Besoin
+from aag.models.compact import CompactBesoin, CompactProfil
+from aag.scoring import rules, scorer
+from aag.scoring.scorer import (
+    calculate_match, explain, explain_result, rank_candidates, rank_missions, rank_page, score_compact_profile,
+    score_profile
+)
+from aag.scoring.rules import (
+    get_bonus_competences, get_bonus_total, get_compiled_rules, get_experience_category, is_priority_city
+)
+from aag.scoring.index import ProfileIndex
+from aag.scoring.vectorized import FACTOR_CACHE_SIZE, ProfileTable
+from factories import COMPETENCES, VILLES, random_besoin, random_profils
 
 
 # Fixtures de test
@@ -71,6 +84,10 @@ class TestRules(unittest.TestCase):
         bonus, details = get_bonus_competences(["vul", "electrique", "climatisation"])
         self.assertEqual(bonus, 18)  # 10 + 5 + 3
 
+    def test_bonus_total(self):
+        for competences in (["vul", "electrique", "climatisation"], ["pneus"], [], ["vul", "vul"]):
+            self.assertEqual(get_bonus_total(competences), get_bonus_competences(competences)[0])
+
     def test_pas_de_bonus(self):
         bonus, details = get_bonus_competences(["pneus", "moteur"])
         self.assertEqual(bonus, 0)
@@ -148,5 +165,365 @@ class TestRankCandidates(unittest.TestCase):
         self.assertEqual(results, [])
 
 
+class TestJustificationsALaDemande(unittest.TestCase):
+    """Tests pour le scoring sans texte et l'explication a la demande."""
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.profils = random_profils(rng, 100)
+        self.besoins = [random_besoin(rng) for _ in range(10)]
+
+    def test_score_profile_identique(self):
+        for besoin in self.besoins:
+            for profil in self.profils:
+                score, raisons = score_profile(profil, besoin)
+                self.assertEqual((score, explain(profil, besoin, raisons)), calculate_match(profil, besoin))
+
+    def test_explain_sans_raisons(self):
+        besoin = self.besoins[0]
+        for profil in self.profils:
+            self.assertEqual(explain(profil, besoin), calculate_match(profil, besoin)[1])
+
+    def test_classement_sans_justifications(self):
+        for besoin in self.besoins:
+            complet = rank_candidates(self.profils, besoin)
+            for profils in (self.profils, ProfileTable(self.profils)):
+                for top_k in (None, 10):
+                    paresseux = rank_candidates(profils, besoin, top_k=top_k, with_justifications=False)
+                    self.assertTrue(all(r["justifications"] is None for r in paresseux))
+                    for result in paresseux:
+                        explain_result(result, besoin)
+                        del result["raisons"], result["profil"]
+                    self.assertEqual(paresseux, complet[:top_k])
+
+
+class TestScoreMatrix(unittest.TestCase):
+    """Tests pour le scoring de plusieurs missions en un appel."""
+
+    def setUp(self):
+        rng = random.Random(19)
+        self.profils = random_profils(rng, 250)
+        self.table = ProfileTable(self.profils)
+        self.besoins = [random_besoin(rng) for _ in range(12)]
+
+    def test_matrice_identique_ligne_par_ligne(self):
+        matrix = self.table.score_matrix(self.besoins, chunk_size=64)
+        self.assertEqual(matrix.shape, (12, 250))
+        for besoin, row in zip(self.besoins, matrix):
+            self.assertEqual(row.tolist(), [calculate_match(p, besoin)[0] for p in self.profils])
+
+    def test_top_k_par_mission_par_blocs(self):
+        for chunk_size in (1, 7, 64, 1000):
+            tops = self.table.top_k_per_mission(self.besoins, 15, chunk_size=chunk_size)
+            for besoin, top in zip(self.besoins, tops):
+                scores = self.table.scores(besoin)
+                expected = self.table.ranked_indices(scores, 15)
+                self.assertEqual([index for index, _ in top], expected)
+                self.assertEqual([score for _, score in top], scores[expected].tolist())
+
+    def test_rank_missions_identique(self):
+        for top_k in (5, None):
+            classements = rank_missions(self.profils, self.besoins, top_k=top_k)
+            for besoin, classement in zip(self.besoins, classements):
+                self.assertEqual(classement, rank_candidates(self.profils, besoin, top_k=top_k))
+
+    def test_objets_besoin(self):
+        besoin = Besoin("M1", "Marseille", "electrique", experience_min=3)
+        matrix = self.table.score_matrix([besoin, besoin.to_dict()])
+        self.assertEqual(matrix[0].tolist(), matrix[1].tolist())
+
+    def test_facteurs_reutilises_quand_seuls_les_poids_changent(self):
+        rng = random.Random(8)
+        profils = random_profils(rng, 200)
+        table = ProfileTable(profils)
+        besoin = {"ville_cible": "Marseille", "competence_requise": "vul", "experience_min": 3}
+        factors = table.criterion_factors("Marseille", "vul")
+        for poids in ((50, 30, 20), (12.5, 45.3, 7.7), (0, 100, 0)):
+            besoin.update(poids_ville=poids[0], poids_competence=poids[1], poids_experience=poids[2])
+            expected = [calculate_match(p, besoin)[0] for p in profils]
+            self.assertEqual(table.scores(besoin).tolist(), expected)
+        self.assertIs(table.criterion_factors("marseille", "vul"), factors)
+
+    def test_cache_borne(self):
+        table = ProfileTable([PROFIL_PARFAIT, PROFIL_MOYEN])
+        for i in range(FACTOR_CACHE_SIZE + 10):
+            table.criterion_factors(f"Ville{i}", "vul")
+            table.experience_factors(i)
+        self.assertEqual(len(table._factors), FACTOR_CACHE_SIZE)
+        self.assertEqual(len(table._experience_factors), FACTOR_CACHE_SIZE)
+
+    def test_table_vide(self):
+        table = ProfileTable([])
+        self.assertEqual(table.score_matrix(self.besoins).shape, (12, 0))
+        self.assertEqual(rank_missions(table, self.besoins[:2]), [[], []])
+
+
+class TestProfileIndex(unittest.TestCase):
+    """Tests pour l'index par ville et competences avec elagage."""
+
+    def setUp(self):
+        rng = random.Random(23)
+        self.profils = random_profils(rng, 400)
+        # Quelques villes hors liste et doublons de competences
+        for i, profil in enumerate(self.profils[::17]):
+            profil["ville"] = f"Ville{i % 5}"
+        self.profils[3]["competences"] = ["vul", "vul"]
+        self.index = ProfileIndex(self.profils)
+        self.besoins = [random_besoin(rng) for _ in range(40)]
+
+    def test_identique_a_rank_candidates(self):
+        for besoin in self.besoins:
+            for top_k in (1, 3, 10, 50, 400, 1000):
+                self.assertEqual(
+                    rank_candidates(self.index, besoin, top_k=top_k),
+                    rank_candidates(self.profils, besoin, top_k=top_k)
+                )
+
+    def test_elagage(self):
+        besoin = {"ville_cible": "Marseille", "competence_requise": "electrique", "experience_min": 3}
+        visited = []
+        original = self.index.by_city
+
+        class Spy(dict):
+            """Enregistre les villes dont les profils sont evalues."""
+            def __getitem__(inner, city):
+                visited.append(city)
+                return original[city]
+
+        self.index.by_city = Spy(original)
+        self.index.search(besoin, 5)
+        self.assertLess(len(visited), len(original))
+        self.assertEqual(visited[0], "marseille")
+
+    def test_poids_negatifs_sans_elagage(self):
+        besoin = {"ville_cible": "Lyon", "competence_requise": "pneus", "experience_min": 3,
+                  "poids_ville": -10, "poids_competence": 30, "poids_experience": 20}
+        self.assertEqual(
+            rank_candidates(self.index, besoin, top_k=10),
+            rank_candidates(self.profils, besoin, top_k=10)
+        )
+
+    def test_objet_besoin(self):
+        besoin = Besoin("M1", "Aubagne", "vul", experience_min=5)
+        self.assertEqual(
+            [index for index, _, _ in self.index.search(besoin, 8)],
+            ProfileTable(self.profils).ranked_indices(ProfileTable(self.profils).scores(besoin), 8)
+        )
+
+
+class TestRankTopK(unittest.TestCase):
+    """Tests pour le classement limite aux k meilleurs."""
+
+    def setUp(self):
+        rng = random.Random(3)
+        # Peu de valeurs distinctes : beaucoup d'egalites de score
+        self.profils = random_profils(rng, 200)
+        self.besoin = random_besoin(rng)
+        self.complet = rank_candidates(self.profils, self.besoin)
+
+    def test_identique_au_debut_du_classement_complet(self):
+        for k in (1, 5, 37, 200, 500):
+            self.assertEqual(rank_candidates(self.profils, self.besoin, top_k=k), self.complet[:k])
+
+    def test_table_identique(self):
+        table = ProfileTable(self.profils)
+        for k in (1, 5, 37, 200, 500, None):
+            self.assertEqual(rank_candidates(table, self.besoin, top_k=k), self.complet[:k])
+
+    def test_iterable_quelconque(self):
+        results = rank_candidates(iter(self.profils), self.besoin, top_k=10)
+        self.assertEqual(results, self.complet[:10])
+
+    def test_top_k_nul(self):
+        self.assertEqual(rank_candidates(self.profils, self.besoin, top_k=0), [])
+        self.assertEqual(rank_candidates(ProfileTable(self.profils), self.besoin, top_k=0), [])
+
+
+class TestProfileTable(unittest.TestCase):
+    """Tests pour le scoring vectorise."""
+
+    def test_scores_identiques_a_calculate_match(self):
+        rng = random.Random(42)
+        profils = random_profils(rng, 300)
+        table = ProfileTable(profils)
+        for _ in range(50):
+            besoin = random_besoin(rng)
+            expected = [calculate_match(p, besoin)[0] for p in profils]
+            self.assertEqual(table.scores(besoin).tolist(), expected)
+
+    def test_besoin_par_defaut(self):
+        table = ProfileTable([PROFIL_PARFAIT, PROFIL_MOYEN, PROFIL_FAIBLE])
+        expected = [calculate_match(p, {})[0] for p in table]
+        self.assertEqual(table.scores({}).tolist(), expected)
+
+    def test_rank_candidates_identique(self):
+        rng = random.Random(7)
+        profils = random_profils(rng, 100)
+        besoin = random_besoin(rng)
+        self.assertEqual(
+            rank_candidates(ProfileTable(profils), besoin),
+            rank_candidates(profils, besoin)
+        )
+
+    def test_rank_page_identique_aux_tranches(self):
+        rng = random.Random(8)
+        # Peu de valeurs distinctes : nombreuses égalités de score
+        profils = random_profils(rng, 120)
+        table = ProfileTable(profils)
+        besoin = random_besoin(rng)
+        expected = rank_candidates(profils, besoin, with_justifications=False)
+        scores = table.scores(besoin)
+        for start, stop in ((0, 20), (20, 40), (100, 120), (110, 200), (0, None), (130, 150)):
+            with self.subTest(start=start, stop=stop):
+                page = rank_page(table, besoin, scores, start, stop, with_justifications=False)
+                self.assertEqual(page, expected[start:stop])
+
+    def test_scoring_concurrent(self):
+        # Plus de couples distincts que FACTOR_CACHE_SIZE : les threads
+        # remplissent et vident les caches en même temps
+        rng = random.Random(9)
+        profils = random_profils(rng, 300)
+        table = ProfileTable(profils)
+        besoins = [
+            {"ville_cible": f"Ville{i}", "competence_requise": rng.choice(COMPETENCES), "experience_min": i,
+             "poids_ville": 50, "poids_competence": 30, "poids_experience": 20}
+            for i in range(FACTOR_CACHE_SIZE * 2)
+        ]
+        expected = [ProfileTable(profils).scores(besoin).tolist() for besoin in besoins]
+        errors = []
+
+        def worker(offset):
+            try:
+                for _ in range(5):
+                    for i in range(len(besoins)):
+                        j = (i + offset) % len(besoins)
+                        if table.scores(besoins[j]).tolist() != expected[j]:
+                            errors.append(j)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(table._factors), FACTOR_CACHE_SIZE)
+        self.assertEqual(len(table._experience_factors), FACTOR_CACHE_SIZE)
+
+    def test_table_vide(self):
+        table = ProfileTable([])
+        self.assertEqual(table.scores(BESOIN_MARSEILLE_ELEC).tolist(), [])
+        self.assertEqual(rank_candidates(table, BESOIN_MARSEILLE_ELEC), [])
+
+    def test_upsert_identique_a_une_nouvelle_table(self):
+        rng = random.Random(5)
+        profils = random_profils(rng, 200)
+        for i, profil in enumerate(profils):
+            profil["fichier_source"] = f"CV_{i}.pdf"
+        table = ProfileTable(profils[:150])
+        besoin = random_besoin(rng)
+        table.scores(besoin)
+
+        modified = [dict(profils[i], ville="Aubagne", competences=["vul", "soudure"]) for i in (3, 70)]
+        self.assertEqual(table.upsert(profils[150:] + modified), (50, 2))
+        merged = profils[:]
+        merged[3], merged[70] = modified
+        self.assertEqual(list(table), merged)
+        self.assertEqual(table.scores(besoin).tolist(), ProfileTable(merged).scores(besoin).tolist())
+        self.assertEqual(rank_candidates(table, besoin, top_k=10), rank_candidates(merged, besoin, top_k=10))
+        self.assertEqual(table.find("CV_199.pdf"), 199)
+        self.assertEqual(table.find("CV_3.pdf"), 3)
+        self.assertIsNone(table.find("absent.pdf"))
+
+    def test_arrondi_a_mi_chemin(self):
+        # np.round(0.15, 1) vaut 0.2 alors que round(0.15, 1) vaut 0.1
+        profil = {"nom": "A", "ville": "Paris", "competences": [], "experience_annees": 0}
+        besoin = {"ville_cible": "Paris", "poids_ville": 0.15, "competence_requise": "x",
+                  "poids_competence": 0, "experience_min": 0, "poids_experience": 0}
+        self.assertEqual(ProfileTable([profil]).scores(besoin).tolist(), [calculate_match(profil, besoin)[0]])
+
+
+class TestCompiledRules(unittest.TestCase):
+    """Tests pour les regles compilees."""
+
+    def test_categorie_par_annee(self):
+        compiled = get_compiled_rules()
+        for years in list(range(-1, 20)) + [2.5, 5.5]:
+            self.assertEqual(compiled.experience_category(years), get_experience_category(years))
+
+    def test_ville_et_bonus_par_liste(self):
+        compiled = get_compiled_rules()
+        for ville in VILLES + ["MARSEILLE", "aubagne"]:
+            self.assertEqual(compiled.is_priority_city(ville), is_priority_city(ville))
+        for competences in ([], ["vul", "vul"], ["electrique", "inconnue", "climatisation"]):
+            self.assertEqual(compiled.bonus_total(competences), get_bonus_total(competences))
+
+    def test_regles_obtenues_une_fois_par_classement(self):
+        rng = random.Random(5)
+        profils = random_profils(rng, 50)
+        besoin = random_besoin(rng)
+        expected = rank_candidates(profils, besoin)
+        calls = []
+
+        def counting_rules():
+            calls.append(1)
+            return get_compiled_rules()
+
+        original = scorer.get_compiled_rules
+        scorer.get_compiled_rules = counting_rules
+        try:
+            self.assertEqual(rank_candidates(profils, besoin), expected)
+        finally:
+            scorer.get_compiled_rules = original
+        self.assertEqual(len(calls), 1)
+
+    def test_recompilation_si_tables_modifiees(self):
+        before = get_compiled_rules()
+        self.assertIs(get_compiled_rules(), before)
+        rules.VILLES_PRIORITAIRES.append("lyon")
+        try:
+            after = get_compiled_rules()
+            self.assertIsNot(after, before)
+            self.assertTrue(after.is_priority_city("Lyon"))
+        finally:
+            rules.VILLES_PRIORITAIRES.remove("lyon")
+        self.assertFalse(get_compiled_rules().is_priority_city("Lyon"))
+
+    def test_table_et_index_suivent_les_regles(self):
+        rng = random.Random(3)
+        profils = random_profils(rng, 200)
+        besoin = random_besoin(rng)
+        table = ProfileTable(profils)
+        index = ProfileIndex(profils)
+        table.scores(besoin)
+        rules.BONUS_COMPETENCES["pneus"] = 7
+        rules.VILLES_PRIORITAIRES.append("toulon")
+        try:
+            expected = [score_profile(p, besoin)[0] for p in profils]
+            self.assertEqual(table.scores(besoin).tolist(), expected)
+            self.assertEqual(table.score_matrix([besoin])[0].tolist(), expected)
+            self.assertEqual(
+                [score for _, score, _ in index.search(besoin, 10)],
+                sorted(expected, reverse=True)[:10]
+            )
+        finally:
+            del rules.BONUS_COMPETENCES["pneus"]
+            rules.VILLES_PRIORITAIRES.remove("toulon")
+
+    def test_score_compact_identique(self):
+        rng = random.Random(11)
+        profils = random_profils(rng, 200)
+        compact = [CompactProfil.from_dict(p) for p in profils]
+        for _ in range(20):
+            besoin = dict(random_besoin(rng), id_mission="M")
+            compact_besoin = CompactBesoin.from_dict(besoin)
+            for profil, compact_profil in zip(profils, compact):
+                self.assertEqual(
+                    score_compact_profile(compact_profil, compact_besoin),
+                    score_profile(profil, besoin)
+                )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,181 @@
+"""
+Tests unitaires pour le service HTTP de matching.
+"""
+import sys
+import os
+import http.client
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.scoring.scorer import calculate_match, rank_candidates
+from aag.service.server import MatchingService, create_server, parse_besoin, parse_profil
+from aag.storage.profile_store import append_profiles
+from factories import profil
+
+
+BESOIN = {
+    "id_mission": "B2B-001",
+    "ville_cible": "Marseille",
+    "competence_requise": "electrique",
+    "experience_min": 3,
+    "poids_ville": 50,
+    "poids_competence": 30,
+    "poids_experience": 20
+}
+
+
+PROFILS = [
+    profil("A", "a.pdf", 1, competences=("electrique",)),
+    profil("B", "b.pdf", 8, ville="Lyon", competences=("moteur", "vul")),
+    profil("C", "c.pdf", 12, competences=("electrique",)),
+    profil("D", "d.pdf", 0, ville="Aubagne", competences=()),
+]
+
+
+class TestParseBesoin(unittest.TestCase):
+    """Tests pour la validation des besoins recus."""
+
+    def test_valeurs_par_defaut(self):
+        besoin = parse_besoin({"ville_cible": "Lyon", "competence_requise": "moteur"})
+        self.assertEqual(besoin["poids_ville"], 50)
+        self.assertEqual(besoin["experience_min"], 0)
+
+    def test_besoin_invalide(self):
+        for data in (None, [], {"ville_cible": 3}, {"poids_ville": "50"}, {"experience_min": True}):
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    parse_besoin(data)
+
+
+class TestParseProfil(unittest.TestCase):
+    """Tests pour la validation des profils recus."""
+
+    def test_valeurs_par_defaut(self):
+        data = parse_profil({"ville": "Lyon", "ville_confiance": 0.8})
+        self.assertEqual(data["competences"], [])
+        self.assertEqual(data["experience_annees"], 0)
+        self.assertEqual(data["ville_confiance"], 0.8)
+
+    def test_profil_invalide(self):
+        invalides = (
+            None, [], {"ville": 3}, {"competences": "moteur"}, {"competences": [1]},
+            {"experience_annees": "5"}, {"experience_annees": True},
+        )
+        for data in invalides:
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    parse_profil(data)
+
+
+class TestMatchingServer(unittest.TestCase):
+    """Tests des routes du service, sur un serveur lance dans un thread."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = os.path.join(self.tmp, "profiles.jsonl")
+        append_profiles(PROFILS, self.store)
+        self.service = MatchingService(
+            os.path.join(self.tmp, "profiles.snap"), self.store, os.path.join(self.tmp, "json")
+        )
+        self.server = create_server(self.service, "127.0.0.1", 0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp)
+
+    def request(self, method, path, body=None, conn=None):
+        own = conn is None
+        if own:
+            conn = http.client.HTTPConnection(*self.server.server_address[:2], timeout=10)
+        data = None if body is None else json.dumps(body)
+        conn.request(method, path, data, {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        payload = json.loads(response.read())
+        if own:
+            conn.close()
+        return response.status, payload
+
+    def test_rank_identique_a_rank_candidates(self):
+        status, payload = self.request("POST", "/rank", {"besoin": BESOIN, "top_k": 3, "justifications": True})
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["total"], len(PROFILS))
+        expected = rank_candidates(PROFILS, BESOIN, top_k=3)
+        self.assertEqual(payload["resultats"], json.loads(json.dumps(expected)))
+
+    def test_rank_sans_justifications(self):
+        _, payload = self.request("POST", "/rank", {"besoin": BESOIN, "top_k": None})
+        self.assertEqual(len(payload["resultats"]), len(PROFILS))
+        for result in payload["resultats"]:
+            self.assertIsNone(result["justifications"])
+            self.assertNotIn("profil", result)
+            self.assertNotIn("raisons", result)
+
+    def test_score(self):
+        score, justifications = calculate_match(PROFILS[1], BESOIN)
+        for body in ({"besoin": BESOIN, "fichier": "b.pdf"}, {"besoin": BESOIN, "profil": PROFILS[1]}):
+            with self.subTest(body=list(body)):
+                status, payload = self.request("POST", "/score", body)
+                self.assertEqual(status, 200)
+                self.assertEqual(payload, {"score": score, "justifications": justifications})
+
+    def test_erreurs(self):
+        self.assertEqual(self.request("POST", "/score", {"besoin": BESOIN, "fichier": "x.pdf"})[0], 404)
+        self.assertEqual(self.request("POST", "/score", {"besoin": BESOIN})[0], 400)
+        for champ, valeur in (("competences", "moteur"), ("experience_annees", "5"), ("ville", None)):
+            body = {"besoin": BESOIN, "profil": dict(PROFILS[0], **{champ: valeur})}
+            self.assertEqual(self.request("POST", "/score", body)[0], 400)
+        self.assertEqual(self.request("POST", "/rank", {"besoin": BESOIN, "top_k": "3"})[0], 400)
+        self.assertEqual(self.request("POST", "/rank", {})[0], 400)
+        self.assertEqual(self.request("POST", "/inconnue", {})[0], 404)
+        self.assertEqual(self.request("GET", "/inconnue")[0], 404)
+
+    def test_content_length_invalide(self):
+        for length in ("-5", "abc"):
+            with self.subTest(length=length):
+                conn = http.client.HTTPConnection(*self.server.server_address[:2], timeout=10)
+                conn.putrequest("POST", "/rank")
+                conn.putheader("Content-Length", length)
+                conn.endheaders()
+                response = conn.getresponse()
+                self.assertEqual(response.status, 400)
+                self.assertIn("Content-Length", json.loads(response.read())["erreur"])
+                conn.close()
+
+    def test_reload(self):
+        append_profiles([profil("E", "e.pdf", 20, competences=("electrique",))], self.store)
+        self.assertEqual(self.request("GET", "/status")[1], {"profils": len(PROFILS)})
+        status, payload = self.request("POST", "/reload")
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["profils"], len(PROFILS) + 1)
+        _, payload = self.request("POST", "/rank", {"besoin": BESOIN, "top_k": None})
+        self.assertIn("e.pdf", [result["fichier"] for result in payload["resultats"]])
+
+    def test_requetes_concurrentes(self):
+        expected = self.request("POST", "/rank", {"besoin": BESOIN})[1]
+        results = []
+
+        def client():
+            conn = http.client.HTTPConnection(*self.server.server_address[:2], timeout=10)
+            for _ in range(20):
+                results.append(self.request("POST", "/rank", {"besoin": BESOIN}, conn))
+            conn.close()
+
+        threads = [threading.Thread(target=client) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 80)
+        self.assertTrue(all(result == (200, expected) for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,298 @@
+"""
+Tests unitaires pour le stockage consolide des profils.
+"""
+import sys
+import os
+import json
+import random
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from aag.config import JSON_DIR
+from aag.scoring import rules
+from aag.scoring.scorer import rank_candidates
+from aag.scoring.vectorized import ProfileTable
+from aag.storage.profile_store import (
+    append_profiles, compact_store, import_json_dir, load_all_profiles, load_json_dir, load_store
+)
+from aag.storage.search_db import index_profiles, open_search_db, search_profiles
+from aag.storage.snapshot import (
+    SNAPSHOT_VERSION, Snapshot, SnapshotTable, load_snapshot_table, source_signature, write_snapshot
+)
+from aag.storage.watcher import ProfileSourceWatcher
+from factories import profil, random_profils
+
+
+class TestProfileStore(unittest.TestCase):
+    """Tests pour le store JSON Lines."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "profiles.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_ajout_et_chargement(self):
+        profils = [profil("Marc Durand", "a.pdf"), profil("Léa Martin", "b.pdf")]
+        self.assertEqual(append_profiles(profils, self.path), 2)
+        self.assertEqual(load_store(self.path), profils)
+
+    def test_derniere_ecriture_gagne(self):
+        append_profiles([profil("A", "a.pdf", 1), profil("B", "b.pdf")], self.path)
+        append_profiles([profil("A", "a.pdf", 9)], self.path)
+        profils = load_store(self.path)
+        self.assertEqual([p["nom"] for p in profils], ["A", "B"])
+        self.assertEqual(profils[0]["experience_annees"], 9)
+
+    def test_compaction(self):
+        append_profiles([profil("A", "a.pdf", 1)], self.path)
+        append_profiles([profil("A", "a.pdf", 2)], self.path)
+        self.assertEqual(compact_store(self.path), 1)
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.assertEqual(load_store(self.path)[0]["experience_annees"], 2)
+
+    def test_ligne_tronquee_ignoree(self):
+        append_profiles([profil("A", "a.pdf")], self.path)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"nom": "B", "vil')
+        self.assertEqual([p["nom"] for p in load_store(self.path)], ["A"])
+
+    def test_store_absent(self):
+        self.assertEqual(load_store(self.path), [])
+
+    def test_import_dossier(self):
+        count = import_json_dir(JSON_DIR, self.path)
+        self.assertEqual(count, len([f for f in os.listdir(JSON_DIR) if f.endswith(".json")]))
+        self.assertEqual(load_store(self.path), load_json_dir(JSON_DIR))
+
+    def test_repli_sur_le_dossier(self):
+        json_dir = os.path.join(self.tmp, "json")
+        os.makedirs(json_dir)
+        with open(os.path.join(json_dir, "CV_A.json"), "w", encoding="utf-8") as f:
+            json.dump({"nom": "A", "ville": "Lyon", "competences": [], "experience_annees": 0}, f)
+        profils = load_all_profiles(self.path, json_dir)
+        self.assertEqual(profils[0]["fichier_source"], "CV_A.json")
+
+        append_profiles([profil("B", "b.pdf")], self.path)
+        self.assertEqual([p["nom"] for p in load_all_profiles(self.path, json_dir)], ["B"])
+
+
+class TestSnapshot(unittest.TestCase):
+    """Tests pour l'instantane binaire des profils."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "profiles.snap")
+        self.store = os.path.join(self.tmp, "profiles.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_profils_reconstruits(self):
+        profils = random_profils(random.Random(1), 200)
+        write_snapshot(profils, self.path)
+        self.assertEqual(list(SnapshotTable(Snapshot(self.path))), profils)
+
+    def test_scores_identiques_a_profile_table(self):
+        rng = random.Random(2)
+        profils = random_profils(rng, 500)
+        write_snapshot(profils, self.path)
+        table = SnapshotTable(Snapshot(self.path))
+        reference = ProfileTable(profils)
+        for ville in ["Marseille", "lyon", "Nice"]:
+            for competence in ["vul", "electrique", "soudure"]:
+                besoin = {"ville_cible": ville, "competence_requise": competence, "experience_min": 3}
+                self.assertEqual(table.scores(besoin).tolist(), reference.scores(besoin).tolist())
+                self.assertEqual(rank_candidates(table, besoin, top_k=5), rank_candidates(profils, besoin, top_k=5))
+
+    def test_bonus_suit_les_regles(self):
+        profils = random_profils(random.Random(3), 100)
+        write_snapshot(profils, self.path)
+        table = SnapshotTable(Snapshot(self.path))
+        rules.BONUS_COMPETENCES["moteur"] = 4
+        try:
+            besoin = {"ville_cible": "Lyon", "competence_requise": "vul"}
+            self.assertEqual(table.scores(besoin).tolist(), ProfileTable(profils).scores(besoin).tolist())
+        finally:
+            del rules.BONUS_COMPETENCES["moteur"]
+
+    def test_upsert_par_dessus_l_instantane(self):
+        rng = random.Random(6)
+        profils = random_profils(rng, 100)
+        write_snapshot(profils[:80], self.path)
+        table = SnapshotTable(Snapshot(self.path))
+        modified = dict(profils[5], competences=["climatisation"], ville="Lyon")
+        self.assertEqual(table.upsert(profils[80:] + [modified]), (20, 1))
+        merged = profils[:]
+        merged[5] = modified
+        self.assertEqual(list(table), merged)
+        besoin = {"ville_cible": "Lyon", "competence_requise": "vul", "experience_min": 3}
+        self.assertEqual(table.scores(besoin).tolist(), ProfileTable(merged).scores(besoin).tolist())
+        rules.BONUS_COMPETENCES["climatisation"] = 8
+        try:
+            self.assertEqual(table.scores(besoin).tolist(), ProfileTable(merged).scores(besoin).tolist())
+        finally:
+            rules.BONUS_COMPETENCES["climatisation"] = 3
+
+    def test_instantane_vide(self):
+        write_snapshot([], self.path)
+        table = SnapshotTable(Snapshot(self.path))
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.scores({}).tolist(), [])
+
+    def test_reconstruction_si_source_modifiee(self):
+        append_profiles(random_profils(random.Random(4), 10), self.store)
+        self.assertEqual(len(load_snapshot_table(self.path, self.store)), 10)
+        append_profiles([profil("Nouveau", "nouveau.pdf")], self.store)
+        table = load_snapshot_table(self.path, self.store)
+        self.assertEqual(len(table), 11)
+        self.assertEqual(table[10]["nom"], "Nouveau")
+
+    def test_reconstruction_si_version_differente(self):
+        append_profiles([profil("A", "a.pdf")], self.store)
+        load_snapshot_table(self.path, self.store)
+        with open(self.path, "r+b") as f:
+            f.seek(8)
+            f.write((SNAPSHOT_VERSION + 1).to_bytes(4, "little"))
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+        self.assertEqual(load_snapshot_table(self.path, self.store)[0]["nom"], "A")
+        Snapshot(self.path)
+
+
+class TestSearchDb(unittest.TestCase):
+    """Tests pour la base de recherche plein texte."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.conn = open_search_db(os.path.join(self.tmp, "profiles.db"))
+        a = dict(profil("Marc", "a.pdf", 10), competences=["electrique", "vul"])
+        b = dict(profil("Léa", "b.pdf", 2), ville="Lyon", competences=["electrique"])
+        c = dict(profil("Paul", "c.pdf", 6), competences=["moteur"], texte_source="paul mecanicien moteur")
+        index_profiles(self.conn, [
+            (a, "technicien vehicules hybrides, habilitation électrique b2l"),
+            (b, "mecanicienne hybride debutante"),
+            (c, None),
+        ])
+
+    def tearDown(self):
+        self.conn.close()
+        shutil.rmtree(self.tmp)
+
+    def noms(self, *args, **kwargs):
+        return [p["nom"] for p in search_profiles(self.conn, *args, **kwargs)]
+
+    def test_requete_booleenne(self):
+        self.assertEqual(self.noms('"hybrides" AND "habilitation"'), ["Marc"])
+        self.assertEqual(sorted(self.noms("hybride*")), ["Léa", "Marc"])
+        self.assertEqual(self.noms("hybride* NOT habilitation"), ["Léa"])
+
+    def test_accents_et_casse_ignores(self):
+        self.assertEqual(self.noms("ELECTRIQUE"), ["Marc"])
+
+    def test_texte_source_par_defaut(self):
+        self.assertEqual(self.noms("moteur"), ["Paul"])
+
+    def test_filtres_structures(self):
+        self.assertEqual(self.noms(ville="marseille"), ["Marc", "Paul"])
+        self.assertEqual(self.noms(competences=["electrique", "vul"]), ["Marc"])
+        self.assertEqual(self.noms(experience_min=5), ["Marc", "Paul"])
+        self.assertEqual(self.noms("hybride*", ville="Lyon", competences=["electrique"]), ["Léa"])
+
+    def test_extrait(self):
+        result = search_profiles(self.conn, "habilitation")[0]
+        self.assertIn("[habilitation]", result["extrait"])
+        self.assertNotIn("extrait", search_profiles(self.conn, ville="Lyon")[0])
+
+    def test_reindexation_remplace(self):
+        index_profiles(self.conn, [(dict(profil("Marc", "a.pdf", 11), competences=["pneus"]), "pneumaticien")])
+        self.assertEqual(self.noms("habilitation"), [])
+        self.assertEqual(self.noms("pneumaticien"), ["Marc"])
+        self.assertEqual(self.noms(competences=["vul"]), [])
+        self.assertEqual(len(search_profiles(self.conn)), 3)
+
+    def test_transaction_annulee_en_cas_d_erreur(self):
+        with self.assertRaises(AttributeError):
+            index_profiles(self.conn, [(profil("Zoé", "z.pdf"), "zoe"), (None, "erreur")])
+        self.assertEqual(self.noms("zoe"), [])
+
+    def test_requete_invalide(self):
+        with self.assertRaises(ValueError):
+            search_profiles(self.conn, 'AND "')
+
+
+class TestProfileSourceWatcher(unittest.TestCase):
+    """Tests pour le suivi incremental de la source des profils."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = os.path.join(self.tmp, "profiles.jsonl")
+        self.json_dir = os.path.join(self.tmp, "json")
+        os.makedirs(self.json_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def watcher(self):
+        return ProfileSourceWatcher(source_signature(self.store, self.json_dir), self.store, self.json_dir)
+
+    def write_json(self, filename, data):
+        with open(os.path.join(self.json_dir, filename), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def test_store_seules_les_nouvelles_lignes(self):
+        append_profiles([profil("A", "a.pdf")], self.store)
+        watcher = self.watcher()
+        self.assertEqual(watcher.poll(), [])
+        append_profiles([profil("B", "b.pdf"), profil("A", "a.pdf", 8)], self.store)
+        self.assertEqual([(p["nom"], p["experience_annees"]) for p in watcher.poll()], [("B", 3), ("A", 8)])
+        self.assertEqual(watcher.poll(), [])
+
+    def test_store_ligne_en_cours_d_ecriture(self):
+        append_profiles([profil("A", "a.pdf")], self.store)
+        watcher = self.watcher()
+        line = json.dumps(profil("B", "b.pdf"))
+        with open(self.store, "a", encoding="utf-8") as f:
+            f.write(line[:10])
+        self.assertEqual(watcher.poll(), [])
+        with open(self.store, "a", encoding="utf-8") as f:
+            f.write(line[10:] + "\n")
+        self.assertEqual([p["nom"] for p in watcher.poll()], ["B"])
+
+    def test_store_reecrit(self):
+        append_profiles([profil("A", "a.pdf"), profil("A", "a.pdf", 5)], self.store)
+        watcher = self.watcher()
+        compact_store(self.store)
+        self.assertIsNone(watcher.poll())
+
+    def test_dossier_fichiers_ajoutes(self):
+        self.write_json("CV_A.json", profil("A", "a.pdf"))
+        watcher = self.watcher()
+        self.assertEqual(watcher.poll(), [])
+        self.write_json("CV_B.json", profil("B", "b.pdf"))
+        # Date nettement posterieure (horloge des fichiers a gros grain)
+        later = os.stat(os.path.join(self.json_dir, "CV_A.json")).st_mtime + 1
+        os.utime(os.path.join(self.json_dir, "CV_B.json"), (later, later))
+        self.assertEqual([p["nom"] for p in watcher.poll()], ["B"])
+
+    def test_dossier_fichier_supprime(self):
+        self.write_json("CV_A.json", profil("A", "a.pdf"))
+        self.write_json("CV_B.json", profil("B", "b.pdf"))
+        watcher = self.watcher()
+        os.remove(os.path.join(self.json_dir, "CV_A.json"))
+        self.assertIsNone(watcher.poll())
+
+    def test_store_cree_apres_le_dossier(self):
+        self.write_json("CV_A.json", profil("A", "a.pdf"))
+        watcher = self.watcher()
+        import_json_dir(self.json_dir, self.store)
+        self.assertIsNone(watcher.poll())
+
+
+if __name__ == "__main__":
+    unittest.main()